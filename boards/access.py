@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from .models import Board, Card, Checklist
+
+def _cache():
+    return caches[settings.BOARD_ACCESS_CACHE]
+
+def _cache_key(user_id):
+    return f'board-access:{user_id}'
+
+def get_accessible_board_ids(user):
+    """Get the ids of every board the user owns or is a member of.
+
+    The set is cached per user and invalidated by the BoardMember and Board
+    signal handlers, so permission checks and queryset filters become a set
+    lookup instead of a join through board memberships.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    board_ids = _cache().get(_cache_key(user.id))
+    if board_ids is None:
+        board_ids = list(Board.objects.filter(
+            Q(owner=user) | Q(board_members__user=user)
+        ).values_list('id', flat=True).distinct())
+        _cache().set(_cache_key(user.id), board_ids, settings.BOARD_ACCESS_CACHE_TIMEOUT)
+    return frozenset(board_ids)
+
+def has_board_access(user, board_id):
+    try:
+        return int(board_id) in get_accessible_board_ids(user)
+    except (TypeError, ValueError):
+        return False
+
+def invalidate_board_access(*user_ids):
+    """Drop the cached sets now and again once the current transaction commits.
+
+    Until the commit, other requests still read the old memberships and
+    may cache them again; the second delete removes those sets.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    _cache().delete_many(keys)
+    transaction.on_commit(lambda: _cache().delete_many(keys))
+
+def get_card_and_board_ids(obj):
+    """The card id and board id of a card child or checklist item.
+
+    Unless the parent card is already loaded they are read with one
+    values_list query and kept on the instance, keyed by its parent, so
+    the permission check and every signal handler of a save share it.
+    """
+    if hasattr(obj, 'checklist_id'):
+        parent = ('checklist', obj.checklist_id)
+    else:
+        parent = ('card', obj.card_id)
+    if parent[1] is None:
+        # e.g. a label that is not attached to a card
+        return None, None
+    cached = obj.__dict__.get('_parent_ids')
+    if cached is not None and cached[0] == parent:
+        return cached[1]
+    model = type(obj)
+    if parent[0] == 'card' and model.card.is_cached(obj):
+        ids = obj.card.id, obj.card.board_id
+    elif parent[0] == 'checklist' and model.checklist.is_cached(obj) and Checklist.card.is_cached(obj.checklist):
+        ids = obj.checklist.card_id, obj.checklist.card.board_id
+    else:
+        if parent[0] == 'card':
+            rows = Card.objects.filter(pk=parent[1]).values_list('id', 'board_id')
+        else:
+            rows = Checklist.objects.filter(pk=parent[1]).values_list('card_id', 'card__board_id')
+        ids = rows.first() or (None, None)
+    obj._parent_ids = (parent, ids)
+    return ids
+
+def get_board_id(obj):
+    """Get the board id of a board or of anything that hangs off a list or card"""
+    if isinstance(obj, Board):
+        return obj.id
+    if hasattr(obj, 'board_id'):
+        return obj.board_id
+    return get_card_and_board_ids(obj)[1]
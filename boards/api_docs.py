@@ -6,6 +6,22 @@ Base URL: http://localhost:8000/api/
 Authentication:
 - All endpoints except auth/register and auth/login require JWT token
 - Add token to request headers: Authorization: Bearer <access_token>
+
+Pagination:
+- Board, comment, label, checklist item and user listings are cursor-paginated
+- Responses look like {"next": <url>, "previous": <url>, "results": [...]}
+- Follow the next/previous URLs; use ?page_size=<n> (max 200, default 50)
+
+Summary view and field selection:
+- GET /api/boards/?view=summary returns title, list_count, card_count, member_count
+  and the first few members of each board instead of the whole tree
+- Board, list and card reads accept ?fields=id,title,lists.title,lists.cards.title to
+  render only those fields (dotted paths select nested fields), and
+  ?expand=lists.cards to include a nested relation in full
+
+Conditional GETs:
+- Board and card reads return an ETag that changes whenever anything on the board changes
+- Send it back as If-None-Match to get an empty 304 Not Modified if nothing changed
 """
 
 # Authentication Examples
@@ -79,6 +95,69 @@ BOARD_ENDPOINTS = {
             "user_id": 2
         },
         "response": "HTTP 200 OK"
+    },
+    "changes": {
+        "endpoint": "/api/boards/{board_id}/changes/?since={cursor}",
+        "method": "GET",
+        "response": {
+            "cursor": "2024-02-20T12:05:00.123456Z",
+            "board": None,
+            "changes": {
+                "lists": [], "cards": [{"id": 3, "title": "Renamed", "list": 1, "order": 1024.0}],
+                "labels": [], "checklists": [], "checklist_items": [], "comments": [], "members": []
+            },
+            "deleted": {
+                "lists": [2], "cards": [], "labels": [], "checklists": [],
+                "checklist_items": [], "comments": [7], "members": []
+            }
+        },
+        "notes": "Pass the returned cursor as the next since. Changes are upserts and may "
+                 "repeat; children of a deleted list or card are not listed separately. "
+                 "400 for an invalid since, 410 when it is older than the tombstone "
+                 "retention and the board must be refetched."
+    },
+    "cache_stats": {
+        "endpoint": "/api/boards/cache_stats/",
+        "method": "GET",
+        "permissions": "Staff users only",
+        "response": {
+            "backend": "boards",
+            "hits": 120,
+            "misses": 8,
+            "hit_rate": 0.9375
+        }
+    },
+    "export": {
+        "endpoint": "/api/boards/{board_id}/export/?format={json|ndjson|csv}",
+        "method": "GET",
+        "response": {
+            "board": {"id": 1, "title": "My Project Board", "background": "#0079bf", "owner": "testuser",
+                      "created_at": "2024-02-20T12:00:00Z", "updated_at": "2024-02-20T12:00:00Z"},
+            "board_members": [{"id": 1, "board": 1, "user": "testuser", "created_at": "2024-02-20T12:00:00Z"}],
+            "lists": [{"id": 1, "board": 1, "title": "To Do", "order": 1024.0, "color": "#ffffff",
+                       "created_at": "2024-02-20T12:00:00Z", "updated_at": "2024-02-20T12:00:00Z"}],
+            "cards": [{"id": 3, "list": 1, "title": "Card Title", "description": "", "order": 1024.0,
+                       "start_date": None, "due_date": None, "due_complete": None, "latitude": None,
+                       "longitude": None, "place_name": None,
+                       "created_at": "2024-02-20T12:00:00Z", "updated_at": "2024-02-20T12:00:00Z"}],
+            "labels": [], "card_members": [], "checklists": [], "checklist_items": [],
+            "comments": [], "attachments": []
+        },
+        "notes": "Streamed as a download. json (the default) is one document as above; ndjson "
+                 "has one record per line with its kind in type (board, board_member, list, "
+                 "card, ...); csv has one row per record with a type column and the columns of "
+                 "every kind. Records refer to their parent by id. Attachments are exported as "
+                 "metadata only. The export is not a snapshot of a board that is being edited."
+    },
+    "import_trello": {
+        "endpoint": "/api/boards/import_trello/",
+        "method": "POST",
+        "request": "multipart/form-data with file (a Trello JSON export) and optional map_members=true",
+        "response": "HTTP 202 Accepted with the import, see BOARD_IMPORT_ENDPOINTS",
+        "notes": "The export is imported as a new board in the background. Closed lists and "
+                 "cards are skipped. With map_members, Trello members whose username matches "
+                 "a user who already shares a board with you are added to the board. Comments "
+                 "are posted as you, with the Trello author's name in the text."
     }
 }
 
@@ -129,6 +208,44 @@ CARD_ENDPOINTS = {
             "updated_at": "2024-02-20T12:00:00Z"
         }
     },
+    "filter": {
+        "endpoint": "/api/cards/?member=me&due_before=now&due_complete=false",
+        "method": "GET",
+        "response": "Card objects on the user's boards matching every filter",
+        "notes": "Filters: label (label titles), member (user ids or me), due_before "
+                 "(ISO 8601 date or datetime, or now), due_complete, "
+                 "has_checklist_incomplete (true/false), list (list ids) and board_id. Separate "
+                 "several values of one filter with commas; they match if any does. "
+                 "Unknown parameters are rejected with 400."
+    },
+    "bulk": {
+        "endpoint": "/api/cards/bulk/ (also /api/labels/bulk/ and /api/checklist-items/bulk/)",
+        "methods": {
+            "POST": {
+                "request": {"items": [{"title": "Imported", "description": "", "list": 1}]},
+                "response": {"created": ["Card objects as in card.created events"]}
+            },
+            "PATCH": {
+                "request": {"items": [{"id": 3, "title": "Renamed"}]},
+                "response": {"updated": ["Card objects as in card.updated events"]}
+            },
+            "DELETE": {
+                "request": {"ids": [3, 4]},
+                "response": {"deleted": [3, 4]}
+            }
+        },
+        "errors": {
+            "errors": [{"index": 1, "errors": {"list": ["Not found on your boards"]}}]
+        },
+        "notes": "Each request is all or nothing: if any item fails nothing is written and "
+                 "the failing items are listed by index. New cards and checklist items are "
+                 "appended to their list or checklist in request order. Labels take title, "
+                 "color and card; checklist items take title, is_completed and checklist. "
+                 "Updates may change titles, descriptions, colors and completion only "
+                 "(use bulk_move to move cards). Deletes of ids that are missing or on "
+                 "other boards return 404 with those ids. At most BULK_MAX_ITEMS "
+                 "(10000) items per request."
+    },
     "move": {
         "endpoint": "/api/cards/{card_id}/move/",
         "method": "POST",
@@ -138,9 +255,158 @@ CARD_ENDPOINTS = {
         },
         "response": "Updated card object"
     },
+    "bulk_move": {
+        "endpoint": "/api/cards/bulk_move/",
+        "method": "POST",
+        "request": {
+            "moves": [
+                {"card": 1, "list": 2, "position": 1},
+                {"card": 3, "list": 2, "position": 2}
+            ]
+        },
+        "response": {
+            "moved": [
+                {"id": 1, "list": 2, "order": 512.0},
+                {"id": 3, "list": 2, "order": 768.0}
+            ]
+        }
+    },
+    "optimize_description": {
+        "endpoint": "/api/cards/{card_id}/optimize-description/",
+        "method": "POST",
+        "request": {
+            "description": "Fix the login bug on the settings page"
+        },
+        "response": {
+            "description": "Optimized description text"
+        },
+        "errors": "503 with {\"error\": ...} when the AI provider is failing or its circuit is open"
+    },
+    "optimize_description_stream": {
+        "endpoint": "/api/cards/{card_id}/optimize-description/stream/",
+        "method": "POST",
+        "request": {
+            "description": "Fix the login bug on the settings page"
+        },
+        "response": "text/event-stream: 'data: {\"token\": ...}' per token, then "
+                    "'event: done' with {\"description\": ...} (or 'event: error')"
+    },
+    "optimize_description_job": {
+        "endpoint": "/api/cards/{card_id}/optimize-description/?mode=job",
+        "method": "POST",
+        "request": {
+            "description": "Fix the login bug on the settings page"
+        },
+        "response": {
+            "job_id": 7,
+            "status": "pending"
+        }
+    },
     "members": 'CARD_MEMBER_ENDPOINTS'
 }
 
+# Batch AI Endpoints (responses stream one JSON object per line)
+BATCH_AI_ENDPOINTS = {
+    "optimize_list": {
+        "endpoint": "/api/lists/{list_id}/optimize_descriptions/",
+        "method": "POST",
+        "response": [
+            {"event": "start", "total": 2},
+            {"event": "card", "card": 4, "description": "...", "done": 1, "total": 2},
+            {"event": "card", "card": 3, "description": "...", "done": 2, "total": 2},
+            {"event": "complete", "updated": 2, "failed": 0}
+        ]
+    },
+    "optimize_board": {
+        "endpoint": "/api/boards/{board_id}/optimize_descriptions/",
+        "method": "POST",
+        "response": "Same stream as optimize_list, for every card on the board"
+    }
+}
+
+# AI Job Endpoints
+AI_JOB_ENDPOINTS = {
+    "retrieve": {
+        "endpoint": "/api/ai-jobs/{job_id}/",
+        "method": "GET",
+        "response": {
+            "id": 7,
+            "card": 1,
+            "status": "done",
+            "result": "Optimized description text",
+            "error": None,
+            "created_at": "2024-02-20T12:00:00Z",
+            "updated_at": "2024-02-20T12:00:03Z"
+        }
+    }
+}
+
+# Board Import Endpoints
+BOARD_IMPORT_ENDPOINTS = {
+    "list": {
+        "endpoint": "/api/board-imports/",
+        "method": "GET",
+        "response": "Cursor-paginated imports of the user, newest first"
+    },
+    "retrieve": {
+        "endpoint": "/api/board-imports/{import_id}/",
+        "method": "GET",
+        "response": {
+            "id": 4,
+            "board": 12,
+            "status": "running",
+            "phase": "cards",
+            "position": 1500,
+            "progress": 0.52,
+            "counts": {"labels": 6, "members": 0, "lists": 8, "cards": 1500},
+            "error": None,
+            "created_at": "2024-02-20T12:00:00Z",
+            "updated_at": "2024-02-20T12:00:09Z"
+        },
+        "notes": "status is pending, running, done or failed; progress runs from 0 to 1. "
+                 "A failed import keeps what it wrote and is resumed with "
+                 "manage.py import_trello --resume {import_id}."
+    }
+}
+
+# Live Board Updates (WebSocket)
+BOARD_WEBSOCKET = {
+    "endpoint": "ws://{host}/ws/boards/{board_id}/?token={access_token}",
+    "close_codes": {
+        4401: "Missing or invalid token",
+        4403: "Not a member of the board, or removed from it"
+    },
+    "events": [
+        "list.created", "list.updated", "list.deleted", "list.rebalanced",
+        "card.created", "card.updated", "card.deleted", "card.rebalanced", "cards.moved",
+        "cards.created", "cards.updated", "cards.deleted",
+        "checklist.created", "checklist.updated", "checklist.deleted",
+        "checklist_item.created", "checklist_item.updated", "checklist_item.deleted",
+        "checklist_item.rebalanced", "checklist_items.created", "checklist_items.updated",
+        "checklist_items.deleted",
+        "comment.created", "comment.updated", "comment.deleted",
+        "board.deleted"
+    ],
+    "message": {
+        "event": "card.updated",
+        "board": 1,
+        "data": {
+            "id": 3,
+            "title": "Card Title",
+            "description": "Card Description",
+            "list": 1,
+            "board": 1,
+            "order": 2048.0,
+            "due_date": None,
+            "due_date_complete": False,
+            "updated_at": "2024-02-20T12:00:00Z"
+        }
+    },
+    "notes": "Plural events from bulk writes carry a list of objects. "
+             "Deletes send {\"id\": ...} only; children removed by a cascade are not "
+             "announced separately. Send {\"type\": \"ping\"} to receive {\"event\": \"pong\"}."
+}
+
 # Checklist Endpoints
 CHECKLIST_ENDPOINTS = {
     "create": {
@@ -306,4 +572,39 @@ CARD_MEMBER_ENDPOINTS = {
             "errors": ["User 3 is already assigned to this card"]
         }
     }
-} 
\ No newline at end of file
+} 
+# Search Endpoints
+SEARCH_ENDPOINTS = {
+    "search": {
+        "endpoint": "/api/search/?q={query}&board={board_id}&limit={limit}",
+        "method": "GET",
+        "response": {
+            "query": "launch plan",
+            "results": [
+                {
+                    "type": "card",
+                    "id": 3,
+                    "card": 3,
+                    "board": 1,
+                    "title": "<mark>Launch</mark> checklist",
+                    "snippet": "Draft the <mark>plan</mark> for the beta…",
+                    "rank": 4.8125
+                },
+                {
+                    "type": "comment",
+                    "id": 12,
+                    "card": 5,
+                    "board": 1,
+                    "title": "",
+                    "snippet": "The <mark>launch</mark> <mark>plan</mark> moved to Friday",
+                    "rank": 1.2031
+                }
+            ]
+        },
+        "notes": "Searches cards (title and description), comments and checklist items on "
+                 "the user's boards, best match first. Every word must match and the last "
+                 "one also matches as a prefix. type is card, comment or checklist_item. "
+                 "title and snippet are HTML-escaped with matches wrapped in <mark>. "
+                 "limit defaults to 20, at most 50; board limits the search to one board."
+    }
+}
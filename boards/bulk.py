@@ -0,0 +1,245 @@
+"""
+Bulk create, update and delete for cards, labels and checklist items.
+
+Each item of a batch is validated on its own, parents are checked against
+the user's boards with one query for the whole batch, and the batch is
+written with bulk_create/bulk_update in one transaction. Nothing is
+written if any item fails; the response lists the failures by index.
+bulk_create and bulk_update skip model signals, so the version bumps,
+live events and search entries the signals would produce are issued
+here, once per batch. Deletes go through the ORM for the cascade, with
+the per-row handlers switched off and their work done once per batch.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from .access import get_accessible_board_ids
+from .models import Card, Checklist, ChecklistItem, Label, List
+from .realtime import broadcast, event_prefix
+from .signals import batched_deletes
+from .search import reindex, unindex
+from .serializers import (
+    CardBulkSerializer, CardDeltaSerializer, ChecklistItemBulkSerializer,
+    ChecklistItemSerializer, LabelBulkSerializer, LabelSerializer
+)
+from .sync import record_tombstones
+from .utils import ORDER_STEP
+from .versions import bump_board_versions
+
+BATCH_SIZE = 500
+
+class BulkError(Exception):
+    """A rejected batch; detail is the response body"""
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+class BulkSpec:
+    """How one model is written in bulk.
+
+    parent is the foreign key new items attach to, board_lookup leads from
+    the model to its board and parent_board_lookup from the parent.
+    Ordered models get order keys appended after their siblings; live
+    models are announced to board websocket groups; searchable models
+    have their search entries rebuilt.
+    """
+    def __init__(self, model, serializer_class, output_serializer_class, parent, parent_model,
+                 board_lookup, parent_board_lookup, update_fields, ordered=False, live=False,
+                 searchable=False):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.output_serializer_class = output_serializer_class
+        self.parent = parent
+        self.parent_model = parent_model
+        self.board_lookup = board_lookup
+        self.parent_board_lookup = parent_board_lookup
+        self.update_fields = update_fields
+        self.ordered = ordered
+        self.live = live
+        self.searchable = searchable
+
+    @property
+    def parent_key(self):
+        return f'{self.parent}_id'
+
+    def parent_boards(self, parent_ids, user):
+        """Board ids of the parents the user can reach, keyed by parent id"""
+        return dict(self.parent_model.objects.filter(
+            pk__in=parent_ids,
+            **{f'{self.parent_board_lookup}__in': get_accessible_board_ids(user)}
+        ).values_list('id', self.parent_board_lookup))
+
+    def accessible(self, user):
+        return self.model.objects.filter(
+            **{f'{self.board_lookup}__in': get_accessible_board_ids(user)}
+        ).annotate(bulk_board_id=F(self.board_lookup))
+
+    def next_orders(self, parent_ids):
+        """The order key after the last existing sibling, per parent"""
+        last = dict(self.model.objects.filter(
+            **{f'{self.parent_key}__in': parent_ids}
+        ).order_by().values(self.parent_key).annotate(last=Max('order')).values_list(self.parent_key, 'last'))
+        return {parent_id: (last.get(parent_id) or 0) + ORDER_STEP for parent_id in parent_ids}
+
+CARDS = BulkSpec(
+    Card, CardBulkSerializer, CardDeltaSerializer, 'list', List,
+    board_lookup='board_id', parent_board_lookup='board_id',
+    update_fields=('title', 'description'), ordered=True, live=True, searchable=True
+)
+LABELS = BulkSpec(
+    Label, LabelBulkSerializer, LabelSerializer, 'card', Card,
+    board_lookup='card__board_id', parent_board_lookup='board_id',
+    update_fields=('title', 'color')
+)
+CHECKLIST_ITEMS = BulkSpec(
+    ChecklistItem, ChecklistItemBulkSerializer, ChecklistItemSerializer, 'checklist', Checklist,
+    board_lookup='checklist__card__board_id', parent_board_lookup='card__board_id',
+    update_fields=('title', 'is_completed'), ordered=True, live=True, searchable=True
+)
+
+def _check_batch(items, name):
+    if not isinstance(items, list) or not items:
+        raise BulkError({'error': f'{name} must be a non-empty list'})
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise BulkError({'error': f'At most {settings.BULK_MAX_ITEMS} {name} per request'})
+
+def _validate(serializer, item):
+    """Validate one item with a shared serializer, returning (data, errors)"""
+    try:
+        return serializer.run_validation(item), None
+    except ValidationError as e:
+        return None, e.detail
+
+def _raise_item_errors(errors):
+    if errors:
+        raise BulkError({'errors': sorted(errors, key=lambda error: error['index'])})
+
+def _written(spec, objects, boards, event):
+    """Do what the skipped signals would have done and return the output data"""
+    bump_board_versions(*set(boards.values()))
+    if spec.searchable:
+        reindex(spec.model, [obj.id for obj in objects])
+
+    data = spec.output_serializer_class(objects, many=True).data
+    if spec.live:
+        by_board = {}
+        for obj, item in zip(objects, data):
+            by_board.setdefault(boards[obj.id], []).append(dict(item))
+        for board_id, items in by_board.items():
+            broadcast(board_id, f'{event_prefix(spec.model)}s.{event}', items)
+    return data
+
+def bulk_create(spec, user, items):
+    _check_batch(items, 'items')
+    # One serializer validates every item, so its fields are only built once
+    serializer = spec.serializer_class()
+    errors = []
+    validated = []
+    for index, item in enumerate(items):
+        data, item_errors = _validate(serializer, item)
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+        validated.append(data)
+
+    parent_boards = spec.parent_boards({data[spec.parent_key] for data in validated if data}, user)
+    for index, data in enumerate(validated):
+        if data and data[spec.parent_key] not in parent_boards:
+            errors.append({'index': index, 'errors': {spec.parent: ['Not found on your boards']}})
+    _raise_item_errors(errors)
+
+    with transaction.atomic():
+        orders = spec.next_orders(set(parent_boards)) if spec.ordered else {}
+        objects = []
+        for data in validated:
+            obj = spec.model(**data)
+            parent_id = data[spec.parent_key]
+            if spec.ordered:
+                obj.order = orders[parent_id]
+                orders[parent_id] += ORDER_STEP
+            if spec.model is Card:
+                obj.board_id = parent_boards[parent_id]
+            objects.append(obj)
+        objects = spec.model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        boards = {obj.id: parent_boards[getattr(obj, spec.parent_key)] for obj in objects}
+        return _written(spec, objects, boards, 'created')
+
+def bulk_update(spec, user, items):
+    _check_batch(items, 'items')
+    serializer = spec.serializer_class(partial=True)
+    errors = []
+    changes = {}
+    for index, item in enumerate(items):
+        item_id = item.get('id') if isinstance(item, dict) else None
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            errors.append({'index': index, 'errors': {'id': ['An integer id is required']}})
+            continue
+        if item_id in changes:
+            errors.append({'index': index, 'errors': {'id': ['Appears more than once']}})
+            continue
+        data, item_errors = _validate(serializer, item)
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+            continue
+        fixed = set(data) - set(spec.update_fields)
+        if fixed:
+            errors.append({'index': index, 'errors': {
+                field.removesuffix('_id'): ['Cannot be changed by a bulk update'] for field in fixed
+            }})
+            continue
+        changes[item_id] = (index, data)
+
+    objects = spec.accessible(user).in_bulk(list(changes))
+    for item_id, (index, _) in changes.items():
+        if item_id not in objects:
+            errors.append({'index': index, 'errors': {'id': ['Not found on your boards']}})
+    _raise_item_errors(errors)
+
+    now = timezone.now()
+    fields = {'updated_at'} if hasattr(spec.model, 'updated_at') else set()
+    for item_id, (_, data) in changes.items():
+        obj = objects[item_id]
+        for field, value in data.items():
+            setattr(obj, field, value)
+            fields.add(field)
+        if 'updated_at' in fields:
+            obj.updated_at = now
+
+    objects = [objects[item_id] for item_id in changes]
+    with transaction.atomic():
+        spec.model.objects.bulk_update(objects, list(fields), batch_size=BATCH_SIZE)
+        boards = {obj.id: obj.bulk_board_id for obj in objects}
+        return _written(spec, objects, boards, 'updated')
+
+def bulk_delete(spec, user, ids):
+    _check_batch(ids, 'ids')
+    if not all(isinstance(item_id, int) and not isinstance(item_id, bool) for item_id in ids):
+        raise BulkError({'error': 'ids must be integers'})
+    ids = set(ids)
+    boards = dict(spec.accessible(user).filter(pk__in=ids).values_list('id', 'bulk_board_id'))
+    found = set(boards)
+    if found != ids:
+        raise BulkError(
+            {'error': 'Not found on your boards', 'ids': sorted(ids - found)},
+            status.HTTP_404_NOT_FOUND
+        )
+    with transaction.atomic():
+        # The per-row delete handlers would write a tombstone, bump a version
+        # and send an event for every object; do it once per batch instead.
+        # Children removed by the cascade are implied by their parent.
+        with batched_deletes():
+            spec.model.objects.filter(pk__in=ids).delete()
+        record_tombstones(spec.model, boards)
+        bump_board_versions(*set(boards.values()))
+        if spec.searchable:
+            unindex(spec.model, ids)
+        if spec.live:
+            by_board = {}
+            for object_id in sorted(ids):
+                by_board.setdefault(boards[object_id], []).append({'id': object_id})
+            for board_id, items in by_board.items():
+                broadcast(board_id, f'{event_prefix(spec.model)}s.deleted', items)
+    return sorted(ids)
@@ -0,0 +1,52 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .access import has_board_access
+from .realtime import board_group
+
+class BoardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams live deltas for one board to a websocket client.
+
+    Connect to ws/boards/<board_id>/?token=<access token>. Each message is
+    {"event": "card.updated", "board": 1, "data": {...}}; deletes carry
+    only the id in data.
+    """
+    # Close codes for rejected connections
+    UNAUTHENTICATED = 4401
+    FORBIDDEN = 4403
+
+    async def connect(self):
+        self.user = self.scope.get('user')
+        self.board_id = self.scope['url_route']['kwargs']['board_id']
+        self.group_name = None
+
+        if self.user is None or not self.user.is_authenticated:
+            await self.close(code=self.UNAUTHENTICATED)
+            return
+        if not await database_sync_to_async(has_board_access)(self.user, self.board_id):
+            await self.close(code=self.FORBIDDEN)
+            return
+
+        self.group_name = board_group(self.board_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('type') == 'ping':
+            await self.send_json({'event': 'pong'})
+
+    async def board_event(self, message):
+        await self.send_json({
+            'event': message['event'],
+            'board': message['board'],
+            'data': message['data'],
+        })
+
+    async def board_access_revoked(self, message):
+        # A member removed from the board stops receiving its updates
+        if message['user'] == self.user.id:
+            await self.close(code=self.FORBIDDEN)
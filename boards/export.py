@@ -0,0 +1,223 @@
+"""
+Streaming board export as JSON, NDJSON or CSV.
+
+A board is exported as flat records (the board, then its members, lists,
+cards, labels, card members, checklists, checklist items, comments and
+attachment metadata), each pointing at its parent by id. Every record
+type is read with one query whose rows are fetched in chunks through
+iterator(), and the output is produced as the rows arrive, so memory use
+does not depend on the size of the board. Attachments are exported as
+metadata only (the stored file name and URL), not their content.
+
+Records are read with separate queries while the board may be changing,
+so an export is not a snapshot.
+"""
+import csv
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+from .models import (
+    Attachment, BoardMember, Card, CardMember, Checklist, ChecklistItem, Comment, Label, List
+)
+
+# Rows fetched from the database per round trip
+CHUNK_SIZE = 2000
+# Output is sent in pieces of about this many characters
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# Record type -> (model, lookup of the board id, ordering, [(column, lookup)])
+RECORDS = {
+    'board_member': (BoardMember, 'board_id', ('id',), (
+        ('id', 'id'), ('board', 'board_id'), ('user', 'user__username'), ('created_at', 'created_at'),
+    )),
+    'list': (List, 'board_id', ('order', 'id'), (
+        ('id', 'id'), ('board', 'board_id'), ('title', 'title'), ('order', 'order'), ('color', 'color'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    )),
+    'card': (Card, 'board_id', ('list_id', 'order', 'id'), (
+        ('id', 'id'), ('list', 'list_id'), ('title', 'title'), ('description', 'description'),
+        ('order', 'order'), ('start_date', 'card_date__start_date'), ('due_date', 'card_date__due_date'),
+        ('due_complete', 'card_date__is_complete'), ('latitude', 'location__latitude'),
+        ('longitude', 'location__longitude'), ('place_name', 'location__place_name'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    )),
+    'label': (Label, 'card__board_id', ('card_id', 'id'), (
+        ('id', 'id'), ('card', 'card_id'), ('title', 'title'), ('color', 'color'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    )),
+    'card_member': (CardMember, 'card__board_id', ('card_id', 'id'), (
+        ('id', 'id'), ('card', 'card_id'), ('user', 'user__username'), ('created_at', 'created_at'),
+    )),
+    'checklist': (Checklist, 'card__board_id', ('card_id', 'id'), (
+        ('id', 'id'), ('card', 'card_id'), ('title', 'title'), ('created_at', 'created_at'),
+    )),
+    'checklist_item': (ChecklistItem, 'checklist__card__board_id', ('checklist_id', 'order', 'id'), (
+        ('id', 'id'), ('checklist', 'checklist_id'), ('title', 'title'), ('is_completed', 'is_completed'),
+        ('order', 'order'), ('created_at', 'created_at'),
+    )),
+    'comment': (Comment, 'card__board_id', ('card_id', 'created_at', 'id'), (
+        ('id', 'id'), ('card', 'card_id'), ('author', 'author__username'), ('content', 'content'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    )),
+    'attachment': (Attachment, 'card__board_id', ('card_id', 'id'), (
+        ('id', 'id'), ('card', 'card_id'), ('title', 'title'), ('file', 'file'), ('url', 'url'),
+        ('created_at', 'created_at'),
+    )),
+}
+
+BOARD_COLUMNS = ('id', 'title', 'background', 'owner', 'created_at', 'updated_at')
+
+# Every column of every record type, for the CSV header
+CSV_COLUMNS = ['type']
+for _, _, _, _columns in RECORDS.values():
+    CSV_COLUMNS += [column for column, _ in _columns if column not in CSV_COLUMNS]
+CSV_COLUMNS += [column for column in BOARD_COLUMNS if column not in CSV_COLUMNS]
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+def board_record(board):
+    return {
+        'id': board.id, 'title': board.title, 'background': board.background,
+        'owner': board.owner.username, 'created_at': board.created_at, 'updated_at': board.updated_at,
+    }
+
+def iter_records(record_type, board_id):
+    """(column, value) tuples of every record of one type on the board"""
+    model, board_lookup, ordering, columns = RECORDS[record_type]
+    names = [column for column, _ in columns]
+    rows = model.objects.filter(**{board_lookup: board_id}).order_by(*ordering).values_list(
+        *[lookup for _, lookup in columns]
+    )
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield zip(names, row)
+
+def _chunked(pieces):
+    """Join small strings into pieces of about OUTPUT_CHUNK_SIZE"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= OUTPUT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+def _dumps(value):
+    return _encoder.encode(value)
+
+def export_json(board):
+    """One JSON object with a list per record type"""
+    yield '{"board": ' + _dumps(board_record(board))
+    for record_type in RECORDS:
+        yield f', "{record_type}s": ['
+        separator = ''
+        for record in iter_records(record_type, board.id):
+            yield separator + _dumps(dict(record))
+            separator = ', '
+        yield ']'
+    yield '}\n'
+
+def export_ndjson(board):
+    """One JSON object per line, with its record type in "type" """
+    yield _dumps({'type': 'board', **board_record(board)}) + '\n'
+    for record_type in RECORDS:
+        for record in iter_records(record_type, board.id):
+            yield _dumps({'type': record_type, **dict(record)}) + '\n'
+
+class Echo:
+    """A file-like object whose write returns what it was given"""
+    def write(self, value):
+        return value
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return value
+    # Dates the same way as the JSON formats
+    return _encoder.default(value)
+
+def export_csv(board):
+    """One row per record with the union of all columns; type says which apply"""
+    writer = csv.writer(Echo())
+    index = {column: position for position, column in enumerate(CSV_COLUMNS)}
+
+    def row(record_type, record):
+        values = [''] * len(CSV_COLUMNS)
+        values[0] = record_type
+        for column, value in record:
+            values[index[column]] = _csv_value(value)
+        return writer.writerow(values)
+
+    yield writer.writerow(CSV_COLUMNS)
+    yield row('board', board_record(board).items())
+    for record_type in RECORDS:
+        for record in iter_records(record_type, board.id):
+            yield row(record_type, record)
+
+EXPORTERS = {
+    'json': export_json,
+    'ndjson': export_ndjson,
+    'csv': export_csv,
+}
+
+def export_board(board, export_format):
+    """The export of board in export_format, as an iterator of strings"""
+    return _chunked(EXPORTERS[export_format](board))
+
+def stream_for(request, chunks):
+    """Hand chunks to the server without buffering them.
+
+    Django buffers a synchronous iterator completely before serving it
+    from an ASGI server, so there each chunk is produced in the sync
+    thread instead and served from an async generator.
+    """
+    if not isinstance(getattr(request, '_request', request), ASGIRequest):
+        return chunks
+    get_next = sync_to_async(lambda: next(chunks, None))
+
+    async def stream():
+        while (chunk := await get_next()) is not None:
+            yield chunk
+    return stream()
+
+class NDJSONRenderer(BaseRenderer):
+    """Lets ?format=ndjson select the export; errors are one JSON line"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (_dumps(data) + '\n').encode()
+
+class CSVRenderer(BaseRenderer):
+    """Lets ?format=csv select the export; errors are a header row and a value row"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        writer = csv.writer(Echo())
+        return (
+            writer.writerow(list(data)) + writer.writerow([str(value) for value in data.values()])
+        ).encode()
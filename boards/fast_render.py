@@ -0,0 +1,165 @@
+"""
+Fast read-only rendering of the full board tree.
+
+BoardSerializer builds a model instance and walks DRF field objects for
+every nested row, which dominates CPU time on big boards. render_board
+reads plain values() rows instead, with one query per relation, and
+assembles the same dicts, key for key, that BoardSerializer returns. Any
+change to the board, list or card serializers' fields must be mirrored
+here; the tests compare both renderers byte for byte.
+"""
+from datetime import timezone as dt_timezone
+from .models import Attachment, BoardMember, Card, CardMember, Checklist, ChecklistItem, Comment, Label, List
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name')
+
+def _datetime(value):
+    # Same output as DRF's DateTimeField with the default ISO 8601 format
+    if not value:
+        return None
+    value = value.astimezone(dt_timezone.utc).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+def _float(value):
+    return None if value is None else float(value)
+
+def _user(row, prefix):
+    return {field: row[prefix + field] for field in USER_FIELDS}
+
+def _group(rows, key):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[key], []).append(row)
+    return grouped
+
+def render_board(board, request=None):
+    """Render a board (fetched with its owner) exactly like BoardSerializer(board).data"""
+    # Orderings match the serializers' prefetches, with id breaking ties
+    user_values = [f'user__{field}' for field in USER_FIELDS]
+    members = BoardMember.objects.filter(board_id=board.id).order_by('id').values(
+        'id', 'created_at', *user_values
+    )
+    lists = List.objects.filter(board_id=board.id).order_by('order', 'id').values(
+        'id', 'title', 'board_id', 'order', 'color', 'created_at', 'updated_at'
+    )
+    cards = Card.objects.filter(list__board_id=board.id).order_by('order', 'id').values(
+        'id', 'title', 'description', 'list_id', 'board_id', 'order', 'created_at', 'updated_at',
+        'card_date__id', 'card_date__start_date', 'card_date__due_date', 'card_date__is_complete',
+        'location__id', 'location__latitude', 'location__longitude', 'location__place_name',
+    )
+    labels = _group(Label.objects.filter(card__list__board_id=board.id).order_by('id').values(
+        'id', 'title', 'color', 'card_id', 'created_at', 'updated_at'
+    ), 'card_id')
+    checklists = _group(Checklist.objects.filter(card__list__board_id=board.id).order_by('id').values(
+        'id', 'title', 'card_id', 'created_at'
+    ), 'card_id')
+    items = _group(ChecklistItem.objects.filter(checklist__card__list__board_id=board.id).order_by('order', 'id').values(
+        'id', 'title', 'is_completed', 'checklist_id', 'order', 'created_at'
+    ), 'checklist_id')
+    attachments = _group(Attachment.objects.filter(card__list__board_id=board.id).order_by('id').values(
+        'id', 'title', 'file', 'url', 'card_id', 'created_at'
+    ), 'card_id')
+    comments = _group(Comment.objects.filter(card__list__board_id=board.id).order_by('-created_at', 'id').values(
+        'id', 'content', 'card_id', 'created_at', 'updated_at', *[f'author__{field}' for field in USER_FIELDS]
+    ), 'card_id')
+    card_members = _group(CardMember.objects.filter(card__board_id=board.id).order_by('id').values(
+        'card_id', *user_values
+    ), 'card_id')
+
+    storage = Attachment._meta.get_field('file').storage
+
+    def file_url(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    cards_by_list = {}
+    for card in cards:
+        card_id = card['id']
+        cards_by_list.setdefault(card['list_id'], []).append({
+            'id': card_id,
+            'title': card['title'],
+            'description': card['description'],
+            'list': card['list_id'],
+            'board': card['board_id'],
+            'order': _float(card['order']),
+            'labels': [{
+                'id': label['id'],
+                'title': label['title'],
+                'color': label['color'],
+                'card': label['card_id'],
+                'created_at': _datetime(label['created_at']),
+                'updated_at': _datetime(label['updated_at']),
+            } for label in labels.get(card_id, ())],
+            'members': [_user(member, 'user__') for member in card_members.get(card_id, ())],
+            'dates': {
+                'id': card['card_date__id'],
+                'start_date': _datetime(card['card_date__start_date']),
+                'due_date': _datetime(card['card_date__due_date']),
+                'is_complete': card['card_date__is_complete'],
+            } if card['card_date__id'] is not None else None,
+            'checklists': [{
+                'id': checklist['id'],
+                'title': checklist['title'],
+                'items': [{
+                    'id': item['id'],
+                    'title': item['title'],
+                    'is_completed': item['is_completed'],
+                    'checklist': item['checklist_id'],
+                    'order': _float(item['order']),
+                    'created_at': _datetime(item['created_at']),
+                } for item in items.get(checklist['id'], ())],
+                'card': checklist['card_id'],
+                'created_at': _datetime(checklist['created_at']),
+            } for checklist in checklists.get(card_id, ())],
+            'location': {
+                'id': card['location__id'],
+                'latitude': _float(card['location__latitude']),
+                'longitude': _float(card['location__longitude']),
+                'place_name': card['location__place_name'],
+            } if card['location__id'] is not None else None,
+            'attachments': [{
+                'id': attachment['id'],
+                'title': attachment['title'],
+                'file': file_url(attachment['file']),
+                'url': attachment['url'],
+                'created_at': _datetime(attachment['created_at']),
+            } for attachment in attachments.get(card_id, ())],
+            'comments': [{
+                'id': comment['id'],
+                'content': comment['content'],
+                'author': _user(comment, 'author__'),
+                'created_at': _datetime(comment['created_at']),
+                'updated_at': _datetime(comment['updated_at']),
+            } for comment in comments.get(card_id, ())],
+            'created_at': _datetime(card['created_at']),
+            'updated_at': _datetime(card['updated_at']),
+        })
+
+    owner = board.owner
+    return {
+        'id': board.id,
+        'title': board.title,
+        'background': board.background,
+        'owner': {field: getattr(owner, field) for field in USER_FIELDS},
+        'members': [{
+            'id': member['id'],
+            'user': _user(member, 'user__'),
+            'created_at': _datetime(member['created_at']),
+        } for member in members],
+        'lists': [{
+            'id': board_list['id'],
+            'title': board_list['title'],
+            'board': board_list['board_id'],
+            'order': _float(board_list['order']),
+            'color': board_list['color'],
+            'cards': cards_by_list.get(board_list['id'], []),
+            'created_at': _datetime(board_list['created_at']),
+            'updated_at': _datetime(board_list['updated_at']),
+        } for board_list in lists],
+        'created_at': _datetime(board.created_at),
+        'updated_at': _datetime(board.updated_at),
+    }
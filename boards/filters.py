@@ -0,0 +1,111 @@
+"""
+Server-side card filters for GET /api/cards/.
+
+Every accepted parameter compiles to a predicate served by an index
+(see the Meta.indexes of the models involved); anything else is
+rejected, so clients cannot build queries that scan. Parameters combine
+with AND, comma separated values within one parameter with OR.
+"""
+from datetime import datetime
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from .models import CardMember, ChecklistItem, Label
+
+# Query parameters that are not filters
+RESERVED_PARAMS = {'fields', 'expand', 'format'}
+
+MAX_VALUES = 50
+
+def _values(param, value):
+    values = [item.strip() for item in value.split(',') if item.strip()]
+    if not values:
+        raise ValidationError({param: 'A value is required'})
+    if len(values) > MAX_VALUES:
+        raise ValidationError({param: f'At most {MAX_VALUES} values are allowed'})
+    return values
+
+def _ids(param, value, request=None):
+    ids = []
+    for item in _values(param, value):
+        if item == 'me' and request is not None:
+            ids.append(request.user.id)
+        elif item.isdigit():
+            ids.append(int(item))
+        else:
+            raise ValidationError({param: f'Invalid id: {item}'})
+    return ids
+
+def _boolean(param, value):
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise ValidationError({param: 'Must be true or false'})
+
+def _datetime(param, value):
+    if value == 'now':
+        return timezone.now()
+    parsed = parse_datetime(value.replace(' ', '+'))
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({param: 'Must be an ISO 8601 date or datetime, or now'})
+        parsed = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def filter_label(param, value, request):
+    return Q(Exists(Label.objects.filter(card=OuterRef('pk'), title__in=_values(param, value))))
+
+def filter_member(param, value, request):
+    return Q(Exists(CardMember.objects.filter(card=OuterRef('pk'), user_id__in=_ids(param, value, request))))
+
+def filter_due_before(param, value, request):
+    return Q(card_date__due_date__lt=_datetime(param, value))
+
+def filter_due_complete(param, value, request):
+    return Q(card_date__is_complete=_boolean(param, value))
+
+def filter_has_checklist_incomplete(param, value, request):
+    incomplete = Q(Exists(ChecklistItem.objects.filter(checklist__card=OuterRef('pk'), is_completed=False)))
+    return incomplete if _boolean(param, value) else ~incomplete
+
+def filter_list(param, value, request):
+    return Q(list_id__in=_ids(param, value))
+
+def filter_board(param, value, request):
+    return Q(board_id__in=_ids(param, value))
+
+# The query-shape allowlist: parameter -> compiler returning a Q
+CARD_FILTERS = {
+    'label': filter_label,
+    'member': filter_member,
+    'due_before': filter_due_before,
+    'due_complete': filter_due_complete,
+    'has_checklist_incomplete': filter_has_checklist_incomplete,
+    'list': filter_list,
+    # Same name as the lists endpoint's board parameter
+    'board_id': filter_board,
+}
+
+def filter_cards(queryset, request):
+    """Apply the card filters in request's query string, rejecting unknown ones"""
+    params = request.query_params
+    unknown = set(params) - set(CARD_FILTERS) - RESERVED_PARAMS
+    if unknown:
+        raise ValidationError({
+            param: f"Unknown filter. Supported filters: {', '.join(CARD_FILTERS)}"
+            for param in sorted(unknown)
+        })
+
+    conditions = Q()
+    for param, compile_filter in CARD_FILTERS.items():
+        values = params.getlist(param)
+        if len(values) > 1:
+            raise ValidationError({param: 'Pass multiple values as one comma separated list'})
+        if values:
+            conditions &= compile_filter(param, values[0], request)
+    return queryset.filter(conditions) if conditions else queryset
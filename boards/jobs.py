@@ -0,0 +1,160 @@
+"""
+Local job queue for AI description optimization and board imports.
+
+Jobs are rows in the AIJob (or BoardImport) table and run on an in-process
+thread pool, so no external broker is needed. Jobs left pending by a
+restart can be picked up again with the process_ai_jobs (or import_trello
+--resume) management command. AI jobs left running by a worker that died,
+and uploaded imports left pending or running, are put back in the queue
+after AI_JOB_STALE_AFTER seconds, when a new worker pool starts or
+process_ai_jobs runs.
+"""
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import AIJob, BoardImport
+from .services.ai_service import AIService
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            return _executor
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.AI_JOB_WORKERS,
+            thread_name_prefix='ai-job'
+        )
+    # A new pool means a new process; rerun what a dead one left running
+    for job_id in recover_stale_jobs():
+        _executor.submit(_run_in_worker, job_id)
+    for import_id in recover_stale_imports():
+        _executor.submit(_import_in_worker, import_id)
+    return _executor
+
+def _event_loop():
+    """The event loop of the current thread, kept for its lifetime.
+
+    Providers keep one client (and connection pool) per loop, so a loop
+    per job would open a new client for every job and never close it.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop
+
+def enqueue_optimization(card, user, prompt):
+    """Queue an optimization of a card description and return its job"""
+    job = AIJob.objects.create(card=card, requested_by=user, prompt=prompt)
+    # Workers use their own connections, so only hand over committed jobs
+    transaction.on_commit(lambda: submit(job.id))
+    return job
+
+def submit(job_id):
+    get_executor().submit(_run_in_worker, job_id)
+
+def _run_in_worker(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+def run_job(job_id):
+    """Run a pending job and write the result to the card"""
+    claimed = AIJob.objects.filter(pk=job_id, status=AIJob.STATUS_PENDING).update(
+        status=AIJob.STATUS_RUNNING,
+        updated_at=timezone.now()
+    )
+    if not claimed:
+        # Already picked up by another worker
+        return
+
+    job = AIJob.objects.select_related('card').get(pk=job_id)
+    try:
+        result = _event_loop().run_until_complete(AIService().optimize_description(job.prompt))
+    except Exception as e:
+        job.status = AIJob.STATUS_FAILED
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        return
+
+    job.card.description = result
+    job.card.save(update_fields=['description', 'updated_at'])
+    job.status = AIJob.STATUS_DONE
+    job.result = result
+    job.save(update_fields=['status', 'result', 'updated_at'])
+
+def recover_stale_jobs():
+    """Return jobs stuck in running (their worker died) to pending, returning their ids"""
+    cutoff = timezone.now() - timedelta(seconds=settings.AI_JOB_STALE_AFTER)
+    job_ids = list(AIJob.objects.filter(
+        status=AIJob.STATUS_RUNNING, updated_at__lt=cutoff
+    ).values_list('id', flat=True))
+    AIJob.objects.filter(pk__in=job_ids, status=AIJob.STATUS_RUNNING).update(
+        status=AIJob.STATUS_PENDING,
+        updated_at=timezone.now()
+    )
+    return job_ids
+
+def process_pending_jobs():
+    """Run every pending job (and every stale running one) in the current thread, oldest first"""
+    recover_stale_jobs()
+    job_ids = list(AIJob.objects.filter(
+        status=AIJob.STATUS_PENDING
+    ).order_by('created_at').values_list('id', flat=True))
+    for job_id in job_ids:
+        run_job(job_id)
+    return len(job_ids)
+
+def enqueue_import(board_import):
+    """Run a Trello import on the worker pool once it is committed"""
+    transaction.on_commit(lambda: get_executor().submit(_import_in_worker, board_import.id))
+
+def _import_in_worker(import_id):
+    from .trello import run_import
+    try:
+        run_import(import_id)
+    except Exception:
+        # The failure is also recorded on the import
+        logger.exception('Board import %s failed', import_id)
+    finally:
+        connection.close()
+
+def recover_stale_imports():
+    """Return uploaded imports a dead worker left pending or running to pending, returning their ids.
+
+    Imports from the management command run in its own process and are
+    resumed with import_trello --resume instead.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.AI_JOB_STALE_AFTER)
+    unfinished = [BoardImport.STATUS_PENDING, BoardImport.STATUS_RUNNING]
+    import_ids = list(BoardImport.objects.filter(
+        status__in=unfinished, source_path='', updated_at__lt=cutoff
+    ).values_list('id', flat=True))
+    BoardImport.objects.filter(pk__in=import_ids, status__in=unfinished).update(
+        status=BoardImport.STATUS_PENDING,
+        updated_at=timezone.now()
+    )
+    return import_ids
+
+def process_stale_imports():
+    """Run every stale uploaded import in the current thread, returning how many finished"""
+    from .trello import run_import
+    finished = 0
+    for import_id in recover_stale_imports():
+        try:
+            run_import(import_id)
+            finished += 1
+        except Exception:
+            logger.exception('Board import %s failed', import_id)
+    return finished
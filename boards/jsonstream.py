@@ -0,0 +1,117 @@
+"""
+Incremental reading of large JSON documents.
+
+JSONObjectStream walks the members of a top-level JSON object read from a
+binary file, yielding array members one element at a time. Only the
+element being decoded is held in memory, so exports of hundreds of
+megabytes are read in constant memory. Each element is decoded by the
+standard library's C decoder.
+"""
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 1 << 16
+# A single value (e.g. one card) larger than this is treated as corrupt
+MAX_VALUE_SIZE = 64 * 1024 * 1024
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+class JSONObjectStream:
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self):
+        """Append the next chunk to the buffer, returning False at the end of the file"""
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+            self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(b'', final=True)
+        else:
+            self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(data)
+        self.pos = 0
+        if len(self.buffer) > MAX_VALUE_SIZE:
+            raise ValueError('JSON value too large or malformed')
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next character ('' at the end)"""
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f'Expected {char!r} at byte {self.bytes_read}')
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number or literal at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _elements(self):
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            char = self._peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f'Expected , or ] at byte {self.bytes_read}')
+
+    def members(self):
+        """Yield (key, value) for each member of the top-level object.
+
+        Array values are yielded as iterators over their elements, which
+        must be consumed (or abandoned) before asking for the next member.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError(f'Expected an object key at byte {self.bytes_read}')
+            self._expect(':')
+            if self._peek() == '[':
+                self.pos += 1
+                elements = self._elements()
+                yield key, elements
+                # Skip whatever the caller did not read
+                for _ in elements:
+                    pass
+            else:
+                yield key, self._value()
+            char = self._peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f'Expected , or }} at byte {self.bytes_read}')
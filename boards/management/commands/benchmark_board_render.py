@@ -0,0 +1,99 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from boards.fast_render import render_board
+from boards.models import (
+    Board, BoardMember, Card, CardDate, CardMember, Checklist, ChecklistItem, Comment, Label, List
+)
+from boards.serializers import BoardSerializer
+from boards.utils import load_board_tree
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic board (rolled back afterwards) and compare rendering it "
+        "with BoardSerializer against the values()-based fast renderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=10000, help='Number of cards on the board')
+        parser.add_argument('--lists', type=int, default=20, help='Number of lists on the board')
+        parser.add_argument('--repeat', type=int, default=3, help='Renders per renderer; the best run is reported')
+
+    def handle(self, *args, **options):
+        if options['cards'] < 1 or options['lists'] < 1 or options['repeat'] < 1:
+            raise CommandError('--cards, --lists and --repeat must be positive')
+        try:
+            with transaction.atomic():
+                board = self.build_board(options['cards'], options['lists'])
+                self.compare(board, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def build_board(self, card_count, list_count):
+        self.stdout.write(f'Building a board with {card_count} cards in {list_count} lists...')
+        user = User.objects.create_user(username='render-benchmark', email='benchmark@example.com')
+        board = Board.objects.create(title='Render benchmark', owner=user)
+        BoardMember.objects.create(board=board, user=user)
+        lists = List.objects.bulk_create(
+            List(title=f'List {i}', board=board, order=i + 1) for i in range(list_count)
+        )
+        cards = Card.objects.bulk_create(
+            Card(title=f'Card {i}', description='Benchmark card', list=lists[i % list_count],
+                 board=board, order=i // list_count + 1)
+            for i in range(card_count)
+        )
+        Label.objects.bulk_create(Label(title='Label', color='#61bd4f', card=card) for card in cards)
+        CardDate.objects.bulk_create(CardDate(card=card) for card in cards[::2])
+        CardMember.objects.bulk_create(CardMember(card=card, user=user) for card in cards[::3])
+        Comment.objects.bulk_create(Comment(card=card, author=user, content='Looks good') for card in cards[::4])
+        checklists = Checklist.objects.bulk_create(Checklist(title='Todo', card=card) for card in cards[::5])
+        ChecklistItem.objects.bulk_create(
+            ChecklistItem(title=f'Item {i}', checklist=checklist, order=i + 1)
+            for checklist in checklists for i in range(3)
+        )
+        return board
+
+    def compare(self, board, repeat):
+        request = APIRequestFactory().get(f'/api/boards/{board.pk}/')
+
+        def serializer_render(board):
+            load_board_tree(board)
+            return JSONRenderer().render(BoardSerializer(board, context={'request': request}).data)
+
+        def fast_render(board):
+            return JSONRenderer().render(render_board(board, request))
+
+        results = {}
+        for name, render in (('serializer', serializer_render), ('fast', fast_render)):
+            timings = []
+            query_counts = []
+            for _ in range(repeat):
+                # A fresh board each run, so the serializer reloads its prefetches
+                board = Board.objects.select_related('owner').get(pk=board.pk)
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    content = render(board)
+                    timings.append(time.perf_counter() - start)
+                query_counts.append(len(queries))
+            results[name] = content
+            self.stdout.write(
+                f'{name:>10}: {min(timings) * 1000:.1f} ms, {max(query_counts)} queries, {len(content)} bytes'
+            )
+
+        if results['serializer'] != results['fast']:
+            raise CommandError('Fast renderer output differs from BoardSerializer')
+        self.stdout.write(self.style.SUCCESS('Outputs are byte-identical'))
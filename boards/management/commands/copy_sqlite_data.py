@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from boards.models import SearchEntry
+
+User = get_user_model()
+
+
+def copy_order():
+    """Users and every boards model, parents before children.
+
+    Search entries are left out; rebuild_search_index writes them from the
+    copied rows, in the target database's own full-text format.
+    """
+    models = [User] + [
+        model for model in apps.get_app_config('boards').get_models(include_auto_created=True)
+        if model is not SearchEntry
+    ]
+    ordered = []
+
+    def add(model):
+        if model in ordered:
+            return
+        for field in model._meta.concrete_fields:
+            parent = field.related_model
+            if field.is_relation and parent in models and parent is not model:
+                add(parent)
+        ordered.append(model)
+
+    for model in models:
+        add(model)
+    return ordered
+
+# Parents before children so foreign keys always point at copied rows
+MODELS = copy_order()
+
+
+@contextmanager
+def preserve_timestamps(models):
+    """Stop auto_now/auto_now_add from overwriting the copied timestamps"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy users and board data from the old SQLite database into the "
+        "configured default database (run migrate on the target first), "
+        "then rebuild the search index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='sqlite_source', help='Database alias to copy from')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        source = options['source']
+        if source not in connections.databases:
+            raise CommandError(
+                f"No '{source}' database configured; set DB_ENGINE=postgresql and SQLITE_SOURCE_PATH"
+            )
+        if source == 'default':
+            raise CommandError('Source and target databases must differ')
+
+        for model in MODELS:
+            if model.objects.using('default').exists():
+                raise CommandError(f'Target table {model._meta.db_table} is not empty')
+
+        batch_size = options['batch_size']
+        with transaction.atomic(using='default'), preserve_timestamps(MODELS):
+            for model in MODELS:
+                copied = 0
+                batch = []
+                for obj in model.objects.using(source).order_by('pk').iterator(chunk_size=batch_size):
+                    batch.append(obj)
+                    if len(batch) >= batch_size:
+                        model.objects.using('default').bulk_create(batch)
+                        copied += len(batch)
+                        batch = []
+                if batch:
+                    model.objects.using('default').bulk_create(batch)
+                    copied += len(batch)
+                self.stdout.write(f'{model._meta.label}: {copied} rows')
+
+            # Continue id sequences after the copied primary keys
+            connection = connections['default']
+            statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        call_command('rebuild_search_index', batch_size=batch_size, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Copy complete'))
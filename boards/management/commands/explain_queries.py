@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from boards.access import get_accessible_board_ids
+from boards.views import (
+    AttachmentViewSet, BoardViewSet, CardLocationViewSet, CardViewSet,
+    ChecklistItemViewSet, ChecklistViewSet, CommentViewSet, LabelViewSet, ListViewSet
+)
+
+User = get_user_model()
+
+VIEWSETS = [
+    BoardViewSet, ListViewSet, CardViewSet, ChecklistViewSet, ChecklistItemViewSet,
+    CommentViewSet, LabelViewSet, AttachmentViewSet, CardLocationViewSet,
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on every query the viewsets' list endpoints issue "
+        "(including prefetches) and flag full table scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to run the querysets as (default: first user)')
+        parser.add_argument('--board', type=int, help='Board id passed to board-scoped listings')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only scans')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if a scan is found')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No user to run the querysets as')
+
+        board_id = options['board']
+        if board_id is None:
+            board_ids = sorted(get_accessible_board_ids(user))
+            board_id = board_ids[0] if board_ids else None
+
+        scans = 0
+        for viewset_class in VIEWSETS:
+            for sql in self.capture_queries(viewset_class, user, board_id):
+                plan = self.explain(sql)
+                flagged = [line for line in plan if self.is_full_scan(line)]
+                scans += len(flagged)
+                if flagged or options['verbose_plans']:
+                    self.stdout.write(f'\n{viewset_class.__name__}: {sql}')
+                    for line in plan:
+                        style = self.style.WARNING if line in flagged else str
+                        self.stdout.write(style(f'    {line}'))
+
+        if scans:
+            message = f'{scans} full scan(s) found'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full scans found'))
+
+    def capture_queries(self, viewset_class, user, board_id):
+        """Evaluate a viewset's first list page and return the SQL it ran"""
+        params = {'board_id': board_id} if board_id else {}
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=user)
+
+        view = viewset_class(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None)
+        view.request = view.initialize_request(request)
+        queryset = view.filter_queryset(view.get_queryset())
+
+        with CaptureQueriesContext(connection) as queries:
+            if view.paginator is not None:
+                view.paginator.paginate_queryset(queryset, view.request, view=view)
+            else:
+                list(queryset[:50])
+        return [query['sql'] for query in queries.captured_queries]
+
+    def explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}')
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+    def is_full_scan(self, line):
+        if connection.vendor == 'sqlite':
+            # "SCAN <table>" without an index; searches and index scans are fine
+            return ' SCAN ' in f' {line} ' and 'USING' not in line and 'INDEX' not in line
+        if connection.vendor == 'postgresql':
+            return 'Seq Scan' in line
+        return False
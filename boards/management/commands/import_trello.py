@@ -0,0 +1,59 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from boards.models import BoardImport
+from boards.trello import TrelloImporter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a Trello board export (JSON) as a new board, or resume an "
+        "interrupted import with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Path to the Trello JSON export')
+        parser.add_argument('--user', help='Username that will own the board')
+        parser.add_argument('--map-members', action='store_true',
+                            help='Add Trello members whose username matches an existing user')
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID', help='Resume a failed or interrupted import')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            board_import = BoardImport.objects.filter(pk=options['resume']).first()
+            if board_import is None:
+                raise CommandError(f"Import {options['resume']} does not exist")
+        else:
+            if not options['path'] or not options['user']:
+                raise CommandError('Pass the export path and --user, or --resume')
+            if not os.path.isfile(options['path']):
+                raise CommandError(f"{options['path']} is not a file")
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist")
+            board_import = BoardImport.objects.create(
+                owner=user,
+                source_path=os.path.abspath(options['path']),
+                map_members=options['map_members'],
+                bytes_total=os.path.getsize(options['path']),
+            )
+            self.stdout.write(f'Started import {board_import.id}')
+
+        try:
+            board_import = TrelloImporter(board_import, progress=self.report).run()
+        except Exception as e:
+            raise CommandError(
+                f'Import {board_import.id} failed: {e}. Run with --resume {board_import.id} to continue.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported board {board_import.board_id}: '
+            + ', '.join(f'{count} {name}' for name, count in board_import.counts.items())
+        ))
+
+    def report(self, board_import):
+        done = board_import.bytes_read / board_import.bytes_total if board_import.bytes_total else 0
+        self.stdout.write(f'  {board_import.phase}: {board_import.position} read ({done:.0%} of the file)')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from boards.jobs import process_pending_jobs, process_stale_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Run AI optimization jobs that are still pending, or were left running "
+        "by a worker that died, e.g. after a restart, and resume uploaded board "
+        "imports such a worker left unfinished."
+    )
+
+    def handle(self, *args, **options):
+        count = process_pending_jobs()
+        self.stdout.write(self.style.SUCCESS(f'Processed {count} pending job(s)'))
+        imports = process_stale_imports()
+        self.stdout.write(self.style.SUCCESS(f'Resumed {imports} board import(s)'))
@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from boards.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete delta sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        count, _ = Tombstone.objects.filter(deleted_at__lt=horizon).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} tombstone(s)'))
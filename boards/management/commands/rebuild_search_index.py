@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from boards.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search entries for every card, comment and checklist item."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Entries written per insert')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} object(s)'))
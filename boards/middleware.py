@@ -1,14 +1,32 @@
+from urllib.parse import parse_qs
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
 from django.http import JsonResponse
 from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 
 class ErrorHandlingMiddleware:
+    # Async-capable so async views are not pushed onto a worker thread
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         response = self.get_response(request)
         return response
 
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return response
+
     def process_exception(self, request, exception):
         # Handle different types of exceptions
         if isinstance(exception, ValueError):
@@ -27,4 +45,40 @@ class ErrorHandlingMiddleware:
         return JsonResponse({
             'error': 'Internal server error',
             'detail': str(exception)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR) 
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR) 
+
+class JWTAuthMiddleware:
+    """
+    Channels middleware that sets scope['user'] from a simplejwt access token.
+
+    Browsers cannot set headers on websocket requests, so the token is read
+    from the ``token`` query parameter, falling back to an Authorization
+    header for other clients.
+    """
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope, user=await database_sync_to_async(self.get_user)(self.get_token(scope)))
+        return await self.inner(scope, receive, send)
+
+    @staticmethod
+    def get_token(scope):
+        query = parse_qs(scope.get('query_string', b'').decode())
+        if query.get('token'):
+            return query['token'][0]
+        headers = dict(scope.get('headers', []))
+        parts = headers.get(b'authorization', b'').decode().split()
+        if len(parts) == 2 and parts[0] == 'Bearer':
+            return parts[1]
+        return None
+
+    @staticmethod
+    def get_user(token):
+        if not token:
+            return AnonymousUser()
+        authentication = JWTAuthentication()
+        try:
+            return authentication.get_user(authentication.get_validated_token(token))
+        except (InvalidToken, AuthenticationFailed):
+            return AnonymousUser()
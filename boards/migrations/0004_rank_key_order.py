@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-17 21:37
+
+from django.db import migrations, models
+
+# Matches boards.utils.ORDER_STEP at the time of this migration
+ORDER_STEP = 1024.0
+
+
+def respace(model, parent_field):
+    """Give every container's items evenly spaced rank keys in their current order"""
+    batch = []
+    current_parent, index = object(), 0
+    rows = model.objects.order_by(parent_field, 'order', 'id').only('id', 'order', parent_field)
+    for item in rows.iterator(chunk_size=2000):
+        parent = getattr(item, parent_field)
+        if parent != current_parent:
+            current_parent, index = parent, 0
+        index += 1
+        item.order = index * ORDER_STEP
+        batch.append(item)
+        if len(batch) >= 1000:
+            model.objects.bulk_update(batch, ['order'])
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, ['order'])
+
+
+def respace_orders(apps, schema_editor):
+    respace(apps.get_model('boards', 'List'), 'board_id')
+    respace(apps.get_model('boards', 'Card'), 'list_id')
+    respace(apps.get_model('boards', 'ChecklistItem'), 'checklist_id')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_board_members'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='card',
+            name='order',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='checklistitem',
+            name='order',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(respace_orders, migrations.RunPython.noop),
+    ]
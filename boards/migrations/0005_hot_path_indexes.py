@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-17 21:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0004_rank_key_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boardmember',
+            index=models.Index(fields=['user', 'board'], name='boards_boar_user_id_f305cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['list', 'order'], name='boards_card_list_id_7b2a1b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'order'], name='boards_card_board_i_3ff490_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['checklist', 'order'], name='boards_chec_checkli_63dc94_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['card', '-created_at'], name='boards_comm_card_id_f624aa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['board', 'order'], name='boards_list_board_i_118c90_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-17 21:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0006_aijob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board_id', models.IntegerField()),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='checklist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='checklistitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board', 'updated_at'], name='boards_card_board_i_e448e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='list',
+            index=models.Index(fields=['board', 'updated_at'], name='boards_list_board_i_ac2dfe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['board_id', 'deleted_at'], name='boards_tomb_board_i_ff66b4_idx'),
+        ),
+    ]
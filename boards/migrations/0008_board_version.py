@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-17 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0007_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1.15 on 2026-10-17 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The inverted index lives next to boards_searchentry and is maintained by
+# the database: an external-content FTS5 table kept in sync by triggers on
+# SQLite, a generated tsvector column with a GIN index on PostgreSQL.
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE boards_searchentry_fts USING fts5(
+        title, body, content='boards_searchentry', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER boards_searchentry_ai AFTER INSERT ON boards_searchentry BEGIN
+        INSERT INTO boards_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER boards_searchentry_ad AFTER DELETE ON boards_searchentry BEGIN
+        INSERT INTO boards_searchentry_fts(boards_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER boards_searchentry_au AFTER UPDATE ON boards_searchentry BEGIN
+        INSERT INTO boards_searchentry_fts(boards_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO boards_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS boards_searchentry_au',
+    'DROP TRIGGER IF EXISTS boards_searchentry_ad',
+    'DROP TRIGGER IF EXISTS boards_searchentry_ai',
+    'DROP TABLE IF EXISTS boards_searchentry_fts',
+]
+POSTGRESQL_FORWARD = [
+    """ALTER TABLE boards_searchentry ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')
+    ) STORED""",
+    'CREATE INDEX boards_searchentry_vector_idx ON boards_searchentry USING GIN (search_vector)',
+]
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS boards_searchentry_vector_idx',
+    'ALTER TABLE boards_searchentry DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0008_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('card', 'Card'), ('comment', 'Comment'), ('checklist_item', 'Checklist item')], max_length=20)),
+                ('object_id', models.IntegerField()),
+                ('board_id', models.IntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='boards.card')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board_id'], name='boards_sear_board_i_da11b5_idx')],
+                'unique_together': {('type', 'object_id')},
+            },
+        ),
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
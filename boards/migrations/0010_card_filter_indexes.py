@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-17 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0009_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carddate',
+            index=models.Index(fields=['due_date'], name='boards_card_due_dat_5811f6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carddate',
+            index=models.Index(fields=['is_complete', 'due_date'], name='boards_card_is_comp_ce1e4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['title', 'card'], name='boards_labe_title_407def_idx'),
+        ),
+    ]
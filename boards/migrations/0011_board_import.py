@@ -0,0 +1,51 @@
+# Generated by Django 5.1.15 on 2026-10-17 22:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0010_card_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, upload_to='imports/')),
+                ('source_path', models.CharField(blank=True, max_length=500)),
+                ('map_members', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('phase', models.CharField(blank=True, max_length=20)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('bytes_total', models.PositiveBigIntegerField(default=0)),
+                ('bytes_read', models.PositiveBigIntegerField(default=0)),
+                ('counts', models.JSONField(blank=True, default=dict)),
+                ('labels', models.JSONField(blank=True, default=dict)),
+                ('members', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('board', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='imports', to='boards.board')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='board_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedObject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_id', models.CharField(max_length=64)),
+                ('model', models.CharField(max_length=30)),
+                ('object_id', models.IntegerField()),
+                ('board_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imported_objects', to='boards.boardimport')),
+            ],
+            options={
+                'unique_together': {('board_import', 'source_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0011_board_import'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['created_at', 'id'], name='boards_labe_created_f1c942_idx'),
+        ),
+    ]
@@ -19,6 +19,10 @@ class List(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['board', 'order']),
+            models.Index(fields=['board', 'updated_at']),
+        ]
 
     def __str__(self):
         return self.title
@@ -31,7 +35,7 @@ class Card(models.Model):
         on_delete=models.CASCADE,
         related_name='cards'
     )
-    order = models.IntegerField(default=0)
+    order = models.FloatField(default=0)
     members = models.ManyToManyField(User, related_name='assigned_cards', blank=True)
     due_date = models.DateTimeField(null=True, blank=True)
     due_date_complete = models.BooleanField(default=False)
@@ -45,6 +49,11 @@ class Card(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['list', 'order']),
+            models.Index(fields=['board', 'order']),
+            models.Index(fields=['board', 'updated_at']),
+        ]
 
     def __str__(self):
         return self.title
@@ -62,6 +71,8 @@ class Board(models.Model):
         through='BoardMember',
         related_name='member_of_boards'
     )
+    # Bumped on every write to the board or anything on it (see versions.py)
+    version = models.PositiveBigIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -83,6 +94,9 @@ class BoardMember(models.Model):
 
     class Meta:
         unique_together = ('board', 'user')
+        indexes = [
+            models.Index(fields=['user', 'board']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.board.title}"
@@ -94,6 +108,13 @@ class Label(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'card']),
+            # Keyset pagination (CreatedAtCursorPagination)
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -101,6 +122,7 @@ class Checklist(models.Model):
     title = models.CharField(max_length=255)
     card = models.ForeignKey('Card', related_name='checklists', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
@@ -115,11 +137,15 @@ class ChecklistItem(models.Model):
     )
     title = models.CharField(max_length=255)
     is_completed = models.BooleanField(default=False)
-    order = models.IntegerField(default=0)
+    order = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['checklist', 'order']),
+        ]
 
     def clean(self):
         if not self.checklist:
@@ -170,6 +196,12 @@ class CardDate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date']),
+            models.Index(fields=['is_complete', 'due_date']),
+        ]
+
     def __str__(self):
         return f"Dates for {self.card.title}"
 
@@ -182,6 +214,129 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['card', '-created_at']),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author.username} on {self.card.title}'
+
+class AIJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    card = models.ForeignKey(Card, related_name='ai_jobs', on_delete=models.CASCADE)
+    requested_by = models.ForeignKey(User, related_name='ai_jobs', on_delete=models.CASCADE)
+    prompt = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.TextField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"AI job {self.id} for {self.card.title} ({self.status})"
+
+class Tombstone(models.Model):
+    """Records a deleted board object so delta sync clients can drop it"""
+    board_id = models.IntegerField()
+    model = models.CharField(max_length=50)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board_id', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.model} {self.object_id} on board {self.board_id}"
+
+class SearchEntry(models.Model):
+    """Searchable text of a card, comment or checklist item (see search.py)"""
+    TYPE_CARD = 'card'
+    TYPE_COMMENT = 'comment'
+    TYPE_CHECKLIST_ITEM = 'checklist_item'
+    TYPE_CHOICES = [
+        (TYPE_CARD, 'Card'),
+        (TYPE_COMMENT, 'Comment'),
+        (TYPE_CHECKLIST_ITEM, 'Checklist item'),
+    ]
+
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    object_id = models.IntegerField()
+    card = models.ForeignKey(Card, related_name='search_entries', on_delete=models.CASCADE)
+    board_id = models.IntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('type', 'object_id')
+        indexes = [
+            models.Index(fields=['board_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.object_id} on board {self.board_id}"
+
+class BoardImport(models.Model):
+    """A Trello export imported in resumable batches (see trello.py)"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    owner = models.ForeignKey(User, related_name='board_imports', on_delete=models.CASCADE)
+    board = models.ForeignKey(Board, related_name='imports', on_delete=models.SET_NULL, null=True, blank=True)
+    # Uploaded exports are stored as file, local ones (management command) read from source_path
+    file = models.FileField(upload_to='imports/', blank=True)
+    source_path = models.CharField(max_length=500, blank=True)
+    map_members = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Checkpoint: the phase being imported and how many of its items are done
+    phase = models.CharField(max_length=20, blank=True)
+    position = models.PositiveIntegerField(default=0)
+    bytes_total = models.PositiveBigIntegerField(default=0)
+    bytes_read = models.PositiveBigIntegerField(default=0)
+    counts = models.JSONField(default=dict, blank=True)
+    # Trello label definitions and member -> user mapping, read in the first phase
+    labels = models.JSONField(default=dict, blank=True)
+    members = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status})"
+
+class ImportedObject(models.Model):
+    """Maps a Trello id to the object an import created for it"""
+    board_import = models.ForeignKey(BoardImport, related_name='imported_objects', on_delete=models.CASCADE)
+    source_id = models.CharField(max_length=64)
+    model = models.CharField(max_length=30)
+    object_id = models.IntegerField()
+
+    class Meta:
+        unique_together = ('board_import', 'source_id')
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} from {self.source_id}"
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+class OrderCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination following the rank-key order of ordered items.
+    """
+    ordering = ('order', 'id')
+
+class UserCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over user ids.
+    """
+    ordering = ('id',)
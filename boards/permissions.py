@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .access import get_accessible_board_ids, get_board_id
 
 class IsBoardMember(permissions.BasePermission):
     """
@@ -6,7 +7,7 @@ class IsBoardMember(permissions.BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         # Check if user is a member of the board
-        return request.user in obj.members.all()
+        return obj.id in get_accessible_board_ids(request.user)
 
 class IsListBoardMember(permissions.BasePermission):
     """
@@ -14,12 +15,13 @@ class IsListBoardMember(permissions.BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         # Check if user is a member of the list's board
-        return request.user in obj.board.members.all()
+        return obj.board_id in get_accessible_board_ids(request.user)
 
 class IsCardBoardMember(permissions.BasePermission):
     """
     Custom permission to only allow members of a card's board to access it.
+    Also covers objects attached to a card, such as attachments and locations.
     """
     def has_object_permission(self, request, view, obj):
         # Check if user is a member of the card's board
-        return request.user in obj.list.board.members.all() 
\ No newline at end of file
+        return get_board_id(obj) in get_accessible_board_ids(request.user)
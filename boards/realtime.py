@@ -0,0 +1,38 @@
+"""
+Live board updates.
+
+Every board has a channel layer group; model signals (and the bulk write
+paths, which bypass signals) publish small deltas to it once the write
+commits, and BoardConsumer relays them to connected websocket clients.
+"""
+import re
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+def board_group(board_id):
+    return f'board-{board_id}'
+
+def event_prefix(model):
+    """Event name prefix for a model, e.g. 'checklist_item' for ChecklistItem"""
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', model.__name__).lower()
+
+def publish(board_id, message):
+    """Send a message to a board's group after the current transaction commits"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    def send():
+        async_to_sync(channel_layer.group_send)(board_group(board_id), message)
+
+    transaction.on_commit(send)
+
+def broadcast(board_id, event, data):
+    """Push a delta such as 'card.updated' to everyone watching the board"""
+    publish(board_id, {
+        'type': 'board.event',
+        'event': event,
+        'board': board_id,
+        'data': data,
+    })
@@ -0,0 +1,56 @@
+"""
+Cache of rendered board JSON.
+
+Entries are keyed by board id and Board.version, which every write to the
+board or anything on it bumps (see signals.py), so a write invalidates all
+cached renderings of the board at once and stale entries are simply never
+read again. The backend is any Django cache alias (settings.BOARD_RENDER_CACHE).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from .versions import representation_variant
+
+HITS_KEY = 'board-render:hits'
+MISSES_KEY = 'board-render:misses'
+
+def _cache():
+    return caches[settings.BOARD_RENDER_CACHE]
+
+def render_key(board, request):
+    # Attachment URLs are absolute, so the host is part of the payload
+    key = f'board-render:{board.pk}:v{board.version}:{request.scheme}:{request.get_host()}'
+    variant = representation_variant(request)
+    return f'{key}:{variant}' if variant else key
+
+def _count(key):
+    try:
+        _cache().incr(key)
+    except ValueError:
+        _cache().add(key, 0, None)
+        _cache().incr(key)
+
+def get_rendered_board(board, request, render):
+    """Return the board's JSON bytes from the cache, calling render() on a miss"""
+    key = render_key(board, request)
+    content = _cache().get(key)
+    if content is not None:
+        _count(HITS_KEY)
+        return content
+    _count(MISSES_KEY)
+    content = render()
+    _cache().set(key, content, settings.BOARD_RENDER_CACHE_TIMEOUT)
+    return content
+
+def cache_stats():
+    counts = _cache().get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'backend': settings.BOARD_RENDER_CACHE,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+    }
+
+def reset_stats():
+    _cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,207 @@
+"""
+Full-text search over cards, comments and checklist items.
+
+The searchable text of every object is copied into a SearchEntry row by
+the signals in signals.py. The database indexes those rows itself (FTS5 on
+SQLite, a tsvector column with a GIN index on PostgreSQL, see migration
+0009), so a search is one indexed query scoped to the user's boards.
+Other database backends fall back to a LIKE scan without ranking.
+"""
+import html
+import re
+from django.db import connection
+from django.db.models import Q
+from .access import get_board_id, get_card_and_board_ids
+from .models import Card, ChecklistItem, Comment, SearchEntry
+
+# Text search configuration of the PostgreSQL search_vector column
+POSTGRES_SEARCH_CONFIG = 'english'
+
+# Highlighted terms are wrapped in control characters by the database and
+# turned into <mark> tags after the rest of the text has been escaped
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SNIPPET_WORDS = 16
+MAX_TERMS = 10
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+def entry_for(instance):
+    """The SearchEntry field values for a card, comment or checklist item"""
+    if isinstance(instance, Card):
+        return {
+            'type': SearchEntry.TYPE_CARD, 'object_id': instance.id, 'card_id': instance.id,
+            'board_id': instance.board_id, 'title': instance.title, 'body': instance.description or '',
+        }
+    if isinstance(instance, Comment):
+        return {
+            'type': SearchEntry.TYPE_COMMENT, 'object_id': instance.id, 'card_id': instance.card_id,
+            'board_id': get_board_id(instance), 'title': '', 'body': instance.content,
+        }
+    if isinstance(instance, ChecklistItem) and instance.checklist_id is not None:
+        card_id, board_id = get_card_and_board_ids(instance)
+        return {
+            'type': SearchEntry.TYPE_CHECKLIST_ITEM, 'object_id': instance.id, 'card_id': card_id,
+            'board_id': board_id, 'title': instance.title, 'body': '',
+        }
+    return None
+
+def _type_of(model):
+    return {
+        Card: SearchEntry.TYPE_CARD,
+        Comment: SearchEntry.TYPE_COMMENT,
+        ChecklistItem: SearchEntry.TYPE_CHECKLIST_ITEM,
+    }[model]
+
+def index_object(instance, created=False):
+    entry = entry_for(instance)
+    if entry is None:
+        return
+    if created:
+        SearchEntry.objects.create(**entry)
+        return
+    updated = SearchEntry.objects.filter(type=entry['type'], object_id=instance.id).update(
+        card_id=entry['card_id'], board_id=entry['board_id'], title=entry['title'], body=entry['body']
+    )
+    if not updated:
+        SearchEntry.objects.create(**entry)
+    if isinstance(instance, Card):
+        # Comments and checklist items follow their card to another board
+        SearchEntry.objects.filter(card_id=instance.id).exclude(board_id=instance.board_id).update(
+            board_id=instance.board_id
+        )
+
+def move_card_entries(card_boards):
+    """Point the entries of moved cards, their comments and checklist items at the cards' new boards"""
+    by_board = {}
+    for card_id, board_id in card_boards.items():
+        by_board.setdefault(board_id, []).append(card_id)
+    for board_id, card_ids in by_board.items():
+        SearchEntry.objects.filter(card_id__in=card_ids).exclude(board_id=board_id).update(board_id=board_id)
+
+def unindex_object(instance):
+    SearchEntry.objects.filter(type=_type_of(type(instance)), object_id=instance.id).delete()
+
+def unindex(model, ids):
+    SearchEntry.objects.filter(type=_type_of(model), object_id__in=list(ids)).delete()
+
+def _indexed_objects(model):
+    """Objects of model with just what entry_for reads"""
+    return {
+        Card: Card.objects.only('id', 'board_id', 'title', 'description'),
+        Comment: Comment.objects.select_related('card').only('id', 'card__board_id', 'content'),
+        ChecklistItem: ChecklistItem.objects.filter(checklist__isnull=False).select_related(
+            'checklist__card'
+        ).only('id', 'title', 'checklist__card__board_id'),
+    }[model]
+
+def reindex(model, ids):
+    """Re-index objects written by bulk operations, which skip the signals"""
+    ids = list(ids)
+    SearchEntry.objects.filter(type=_type_of(model), object_id__in=ids).delete()
+    SearchEntry.objects.bulk_create(
+        SearchEntry(**entry_for(instance)) for instance in _indexed_objects(model).filter(pk__in=ids)
+    )
+
+def rebuild_index(batch_size=1000):
+    """Drop and rebuild every entry, returning how many were written"""
+    SearchEntry.objects.all().delete()
+    count = 0
+    for model in (Card, Comment, ChecklistItem):
+        batch = []
+        for instance in _indexed_objects(model).order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(SearchEntry(**entry_for(instance)))
+            if len(batch) == batch_size:
+                count += len(SearchEntry.objects.bulk_create(batch))
+                batch = []
+        count += len(SearchEntry.objects.bulk_create(batch))
+    return count
+
+def parse_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+def mark(text):
+    """Escape text and turn the database's highlight markers into <mark> tags"""
+    return html.escape(text or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+def search(query, board_ids, limit=PAGE_SIZE):
+    """Best matches for query on the given boards.
+
+    Every term must match; the last one also matches as a prefix, so
+    results update while the user is typing. Card titles and checklist
+    items rank above descriptions and comments.
+    """
+    terms = parse_terms(query)
+    board_ids = list(board_ids)
+    if not terms or not board_ids:
+        return []
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        rows = _search_sqlite(terms, board_ids, limit)
+    elif vendor == 'postgresql':
+        rows = _search_postgresql(terms, board_ids, limit)
+    else:
+        rows = _search_fallback(terms, board_ids, limit)
+
+    return [{
+        'type': entry_type,
+        'id': object_id,
+        'card': card_id,
+        'board': board_id,
+        'title': mark(title),
+        'snippet': mark(snippet),
+        'rank': round(rank, 4),
+    } for entry_type, object_id, card_id, board_id, title, snippet, rank in rows]
+
+def _search_sqlite(terms, board_ids, limit):
+    match = ' '.join(f'"{term}"' for term in terms) + '*'
+    placeholders = ', '.join(['%s'] * len(board_ids))
+    sql = f"""
+        SELECT e.type, e.object_id, e.card_id, e.board_id,
+               highlight(boards_searchentry_fts, 0, %s, %s),
+               snippet(boards_searchentry_fts, 1, %s, %s, '…', {SNIPPET_WORDS}),
+               -bm25(boards_searchentry_fts, 4.0, 1.0) AS rank
+        FROM boards_searchentry_fts
+        JOIN boards_searchentry e ON e.id = boards_searchentry_fts.rowid
+        WHERE boards_searchentry_fts MATCH %s AND e.board_id IN ({placeholders})
+        ORDER BY rank DESC
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MARK_START, MARK_END, MARK_START, MARK_END, match, *board_ids, limit])
+        return cursor.fetchall()
+
+def _search_postgresql(terms, board_ids, limit):
+    tsquery = ' & '.join(terms) + ':*'
+    options = f'StartSel={MARK_START}, StopSel={MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=5'
+    # Headlines are expensive, so only build them for the page of results
+    sql = """
+        SELECT type, object_id, card_id, board_id,
+               ts_headline(%s::regconfig, title, query, %s),
+               CASE WHEN body = '' THEN '' ELSE ts_headline(%s::regconfig, body, query, %s) END,
+               rank
+        FROM (
+            SELECT e.type, e.object_id, e.card_id, e.board_id, e.title, e.body, query,
+                   ts_rank(e.search_vector, query) AS rank
+            FROM boards_searchentry e, to_tsquery(%s::regconfig, %s) query
+            WHERE e.search_vector @@ query AND e.board_id = ANY(%s)
+            ORDER BY rank DESC
+            LIMIT %s
+        ) matches
+        ORDER BY rank DESC
+    """
+    config = POSTGRES_SEARCH_CONFIG
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [config, options, config, options, config, tsquery, board_ids, limit])
+        return cursor.fetchall()
+
+def _search_fallback(terms, board_ids, limit):
+    entries = SearchEntry.objects.filter(board_id__in=board_ids)
+    for term in terms:
+        entries = entries.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    return [
+        (entry.type, entry.object_id, entry.card_id, entry.board_id, entry.title, entry.body[:200], 0.0)
+        for entry in entries.order_by('-id')[:limit]
+    ]
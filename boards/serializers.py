@@ -1,9 +1,162 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Board, List, Card, Label, Checklist, ChecklistItem, Attachment, CardLocation, CardMember, CardDate, Comment, BoardMember
+from django.db import models
+from django.utils.functional import cached_property
+from .models import Board, List, Card, Label, Checklist, ChecklistItem, Attachment, CardLocation, CardMember, CardDate, Comment, BoardMember, AIJob, BoardImport
+from .trello import PHASES as IMPORT_PHASES
 
 User = get_user_model()
 
+class MemberResolver:
+    """
+    Resolves card and board memberships for a whole response.
+
+    Memberships are loaded together with their users in one query per
+    batch of boards or cards, and every nested serializer then reads from
+    the in-memory maps instead of querying per object.
+    """
+    def __init__(self):
+        self._board_members = {}
+        self._card_members = {}
+        self._loaded_boards = set()
+        self._loaded_card_boards = set()
+        self._loaded_cards = set()
+
+    def prime(self, boards=(), lists=(), cards=(), board_members=True, card_members=True):
+        board_ids = {board.id for board in boards} - self._loaded_boards
+        if board_ids and board_members:
+            for board_id in board_ids:
+                self._board_members[board_id] = []
+            for member in BoardMember.objects.filter(
+                board_id__in=board_ids
+            ).select_related('user').order_by('id'):
+                self._board_members[member.board_id].append(member)
+            self._loaded_boards |= board_ids
+
+        if not card_members:
+            return
+
+        # Boards and lists render all of their cards, so load those members by board
+        card_board_ids = (
+            {board.id for board in boards} | {board_list.board_id for board_list in lists}
+        ) - self._loaded_card_boards
+        if card_board_ids:
+            self._load_card_members(card__board_id__in=card_board_ids)
+            self._loaded_card_boards |= card_board_ids
+
+        card_ids = {
+            card.id for card in cards
+            if card.id not in self._loaded_cards
+            and card.board_id not in self._loaded_card_boards
+        }
+        if card_ids:
+            self._load_card_members(card_id__in=card_ids)
+            self._loaded_cards |= card_ids
+
+    def _load_card_members(self, **filters):
+        for member in CardMember.objects.filter(**filters).select_related('user').order_by('id'):
+            self._card_members.setdefault(member.card_id, []).append(member.user)
+
+    def board_members(self, board):
+        if board.id not in self._loaded_boards:
+            self.prime(boards=[board])
+        return self._board_members[board.id]
+
+    def card_members(self, card):
+        if card.board_id not in self._loaded_card_boards and card.id not in self._loaded_cards:
+            self.prime(cards=[card])
+        return self._card_members.get(card.id, [])
+
+def get_member_resolver(serializer):
+    """Return the resolver shared by every serializer rendering this response"""
+    return serializer.context.setdefault('member_resolver', MemberResolver())
+
+def parse_field_spec(fields=None, expand=None):
+    """
+    Turn ?fields= and ?expand= into a nested dict of the fields to render.
+
+    fields=id,title,lists.title keeps those fields at each level; expand=lists
+    brings back a relation left out of fields in full. An empty dict means
+    every field, and None (no fields given) means everything everywhere.
+    """
+    if not fields:
+        return None
+    spec = {}
+    for path in fields.split(','):
+        node = spec
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    for path in (expand or '').split(','):
+        names = [name for name in path.strip().split('.') if name]
+        node = spec
+        for name in names[:-1]:
+            if not node:
+                break
+            node = node.setdefault(name, {})
+        else:
+            if names and node:
+                node[names[-1]] = {}
+    return spec
+
+def get_field_spec(serializer):
+    """The part of the request's field spec that applies to this serializer"""
+    names = []
+    node = serializer
+    while node is not None:
+        if node.field_name:
+            names.append(node.field_name)
+        node = node.parent
+    spec = serializer.context.get('field_spec')
+    for name in reversed(names):
+        if not spec:
+            return None
+        spec = spec.get(name)
+    return spec or None
+
+def has_field_path(serializer, *path):
+    """Whether rendering serializer reaches the nested field at path"""
+    for name in path:
+        fields = serializer.fields
+        if name not in fields:
+            return False
+        serializer = getattr(fields[name], 'child', fields[name])
+    return True
+
+class SparseFieldsMixin:
+    """Renders only the fields selected with ?fields= / ?expand= (see parse_field_spec)"""
+    @cached_property
+    def fields(self):
+        fields = super().fields
+        spec = get_field_spec(self)
+        if spec:
+            for name in list(fields):
+                if name not in spec:
+                    del fields[name]
+        return fields
+
+class MemberPrimingListSerializer(serializers.ListSerializer):
+    """Primes the member resolver with the whole page before rendering it"""
+    # Model -> (prime() argument, path to board members, path to card members)
+    MEMBER_PATHS = {
+        Board: ('boards', ('members',), ('lists', 'cards', 'members')),
+        List: ('lists', None, ('cards', 'members')),
+        Card: ('cards', None, ('members',)),
+    }
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        if items:
+            key, board_path, card_path = self.MEMBER_PATHS[type(items[0])]
+            # Skip loading memberships the selected fields do not render
+            get_member_resolver(self).prime(
+                **{key: items},
+                board_members=bool(board_path) and has_field_path(self.child, *board_path),
+                card_members=has_field_path(self.child, *card_path)
+            )
+        return [self.child.to_representation(item) for item in items]
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -70,7 +223,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'content', 'author', 'created_at', 'updated_at']
         read_only_fields = ['author']
 
-class CardSerializer(serializers.ModelSerializer):
+class CardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     labels = LabelSerializer(many=True, read_only=True)
     members = serializers.SerializerMethodField()
     dates = CardDateSerializer(source='card_date', read_only=True)
@@ -101,24 +254,24 @@ class CardSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = MemberPrimingListSerializer
 
     def get_labels(self, obj):
         return [{'id': label.id, 'title': label.title, 'color': label.color} for label in obj.labels.all()]
 
     def get_members(self, obj):
-        card_members = CardMember.objects.filter(card=obj)
         return [
             {
-                'id': member.user.id,
-                'username': member.user.username,
-                'email': member.user.email,
-                'first_name': member.user.first_name,
-                'last_name': member.user.last_name,
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
             } 
-            for member in card_members
+            for user in get_member_resolver(self).card_members(obj)
         ]
 
-class ListSerializer(serializers.ModelSerializer):
+class ListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     cards = CardSerializer(many=True, read_only=True)
 
     class Meta:
@@ -139,6 +292,7 @@ class ListSerializer(serializers.ModelSerializer):
             'order': {'read_only': True},
             'color': {'required': False, 'default': '#282E33'}  # Default dark color
         }
+        list_serializer_class = MemberPrimingListSerializer
 
     def create(self, validated_data):
         # Set default color if not provided
@@ -154,7 +308,7 @@ class BoardMemberSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'created_at']
         read_only_fields = ['created_at']
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     members = serializers.SerializerMethodField()
     lists = ListSerializer(many=True, read_only=True)
@@ -164,11 +318,63 @@ class BoardSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'background', 'owner', 'members',
                  'lists', 'created_at', 'updated_at')
         read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = MemberPrimingListSerializer
 
     def get_members(self, obj):
-        board_members = BoardMember.objects.filter(board=obj)
+        board_members = get_member_resolver(self).board_members(obj)
         return BoardMemberSerializer(board_members, many=True).data
 
+class BoardSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Dashboard view of a board: counts and a few members instead of the tree"""
+    MEMBER_PREVIEW = 5
+
+    owner = UserSerializer(read_only=True)
+    list_count = serializers.IntegerField(read_only=True)
+    card_count = serializers.IntegerField(read_only=True)
+    member_count = serializers.SerializerMethodField()
+    members = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Board
+        fields = ('id', 'title', 'background', 'owner', 'list_count', 'card_count',
+                  'member_count', 'members', 'updated_at')
+        read_only_fields = fields
+        list_serializer_class = MemberPrimingListSerializer
+
+    def get_member_count(self, obj):
+        return len(get_member_resolver(self).board_members(obj))
+
+    def get_members(self, obj):
+        board_members = get_member_resolver(self).board_members(obj)[:self.MEMBER_PREVIEW]
+        return UserSerializer([member.user for member in board_members], many=True).data
+
+class AIJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AIJob
+        fields = ['id', 'card', 'status', 'result', 'error', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+class BoardImportSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BoardImport
+        fields = [
+            'id', 'board', 'status', 'phase', 'position', 'progress', 'counts', 'error',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        """Share of the import done, from the phase and the bytes read in it"""
+        if obj.status == BoardImport.STATUS_DONE:
+            return 1.0
+        names = [name for name, _ in IMPORT_PHASES]
+        if obj.phase not in names:
+            return 0.0
+        read = obj.bytes_read / obj.bytes_total if obj.bytes_total else 0
+        return round((names.index(obj.phase) + min(read, 1)) / len(names), 3)
+
 # Authentication Serializers
 class RegisterSerializer(serializers.ModelSerializer):
     email = serializers.EmailField()
@@ -222,4 +428,51 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'content', 'author', 'created_at', 'updated_at']
-        read_only_fields = ['author'] 
\ No newline at end of file
+        read_only_fields = ['author'] 
+
+# Compact payloads for live board updates; parents are sent as ids only
+class CardDeltaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Card
+        fields = ['id', 'title', 'description', 'list', 'board', 'order', 'due_date', 'due_date_complete', 'updated_at']
+
+class ListDeltaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = List
+        fields = ['id', 'title', 'board', 'color', 'order', 'updated_at']
+
+class ChecklistDeltaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Checklist
+        fields = ['id', 'title', 'card', 'created_at']
+
+class CommentDeltaSerializer(CommentSerializer):
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['card']
+
+# Bulk writes resolve parents for the whole batch at once (see bulk.py), so
+# their item serializers take plain ids instead of related fields that
+# would run one query per item
+class CardBulkSerializer(serializers.ModelSerializer):
+    list = serializers.IntegerField(source='list_id')
+
+    class Meta:
+        model = Card
+        fields = ['title', 'description', 'list']
+
+class LabelBulkSerializer(serializers.ModelSerializer):
+    card = serializers.IntegerField(source='card_id')
+
+    class Meta:
+        model = Label
+        fields = ['title', 'color', 'card']
+        extra_kwargs = {
+            'color': {'required': False}
+        }
+
+class ChecklistItemBulkSerializer(serializers.ModelSerializer):
+    checklist = serializers.IntegerField(source='checklist_id')
+
+    class Meta:
+        model = ChecklistItem
+        fields = ['title', 'is_completed', 'checklist']
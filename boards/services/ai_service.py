@@ -1,29 +1,211 @@
-from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from django.conf import settings
+from django.core.cache import caches
+from .providers import AIProvider, get_provider
+from .resilience import AIServiceError, CircuitOpenError, retry_with_backoff
+
+# asyncio semaphores belong to the loop that created them, so the
+# per-process AI concurrency cap is kept per running loop. Under ASGI that
+# is a single process-wide limit.
+_loop_semaphores = weakref.WeakKeyDictionary()
+
+def _get_loop_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        _loop_semaphores[loop] = semaphore
+    return semaphore
+
+class ResponseCache:
+    """
+    Cache of model responses keyed by a hash of the normalized prompt, the
+    model and the request parameters.
+
+    Entries live in an in-process LRU with a TTL, or in a Django cache
+    backend when ``alias`` is given (e.g. a file or Redis cache, so results
+    survive restarts and are shared between workers).
+    """
+    def __init__(self, max_entries=1024, ttl=86400, alias=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt, model, params):
+        # Whitespace differences do not change the answer we want; case can
+        # (code, identifiers, acronyms), so it is kept
+        normalized = ' '.join(prompt.split())
+        payload = json.dumps(
+            {'prompt': normalized, 'model': model, 'params': params},
+            sort_keys=True
+        )
+        return 'ai-response:' + hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        value = caches[self.alias].get(key) if self.alias else None
+        with self._lock:
+            if not self.alias:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    expires_at, cached = entry
+                    if expires_at > time.monotonic():
+                        self._entries.move_to_end(key)
+                        value = cached
+                    else:
+                        del self._entries[key]
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if self.alias:
+            caches[self.alias].set(key, value, self.ttl)
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            hits, misses, entries = self.hits, self.misses, len(self._entries)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+_response_cache = None
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            ttl=settings.AI_CACHE_TTL,
+            alias=settings.AI_CACHE_ALIAS,
+        )
+    return _response_cache
 
 class AIService:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    """
+    Entry point for AI features.
+
+    Wraps the configured provider with the response cache, a per-process
+    concurrency cap, the provider's rate limiter, retries with exponential
+    backoff and the provider's circuit breaker, so a slow or failing
+    upstream fails fast instead of piling up requests. Raises
+    AIServiceError when no result can be produced.
+    """
+    def __init__(self, provider=None):
+        self.provider = provider if isinstance(provider, AIProvider) else get_provider(provider)
+
+    def _cache_key(self, cache, prompt):
+        model = f'{self.provider.name}:{self.provider.model}'
+        return cache.make_key(prompt, model, self.provider.params)
 
     async def optimize_description(self, prompt):
+        cache = get_response_cache()
+        cache_key = self._cache_key(cache, prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        breaker = self.provider.circuit_breaker
+        if not breaker.allow():
+            raise CircuitOpenError("The AI service is temporarily unavailable. Please try again later.")
         try:
-            print("Attempting to optimize description with OpenAI")
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{
-                    "role": "user",
-                    "content": f"Please Give me a summary of this task: {prompt}"
-                }],
-                temperature=0.7,
-                max_tokens=150
+            result = await retry_with_backoff(
+                lambda: self._attempt(prompt),
+                attempts=settings.AI_RETRY_ATTEMPTS,
+                base_delay=settings.AI_RETRY_BASE_DELAY,
+                max_delay=settings.AI_RETRY_MAX_DELAY,
+                retry_on=self.provider.retryable_exceptions
             )
-            
-            if response.choices:
-                print("Successfully optimized description")
-                return response.choices[0].message.content
-                
-            return "Could not generate optimized description."
-                
         except Exception as e:
-            print(f"OpenAI Service Error: {str(e)}")
-            return "I'm sorry, I couldn't optimize the description at the moment. Please try again later." 
\ No newline at end of file
+            breaker.record_failure()
+            print(f"AI Service Error: {str(e)}")
+            if isinstance(e, AIServiceError):
+                raise
+            raise AIServiceError("Could not optimize the description at the moment.") from e
+        except BaseException:
+            # Cancelled, e.g. the batch was stopped; says nothing about the provider
+            breaker.release()
+            raise
+        breaker.record_success()
+
+        cache.set(cache_key, result)
+        return result
+
+    async def _attempt(self, prompt):
+        await self.provider.rate_limiter.acquire()
+        # The deadline covers waiting for a free slot as well as the call
+        return await asyncio.wait_for(
+            self._complete(prompt),
+            timeout=settings.AI_REQUEST_TIMEOUT
+        )
+
+    async def _complete(self, prompt):
+        async with _get_loop_semaphore():
+            return await self.provider.complete(prompt)
+
+    async def stream_optimize_description(self, prompt):
+        """Yield the optimized description piece by piece as the model writes it"""
+        cache = get_response_cache()
+        cache_key = self._cache_key(cache, prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        breaker = self.provider.circuit_breaker
+        if not breaker.allow():
+            raise CircuitOpenError("The AI service is temporarily unavailable. Please try again later.")
+        parts = []
+        try:
+            await self.provider.rate_limiter.acquire()
+            async with _get_loop_semaphore():
+                tokens = self.provider.stream(prompt).__aiter__()
+                while True:
+                    # Each token, the first included, must arrive within the timeout
+                    try:
+                        token = await asyncio.wait_for(tokens.__anext__(), timeout=settings.AI_REQUEST_TIMEOUT)
+                    except StopAsyncIteration:
+                        break
+                    parts.append(token)
+                    yield token
+        except Exception as e:
+            breaker.record_failure()
+            print(f"AI Service Error: {str(e)}")
+            if isinstance(e, AIServiceError):
+                raise
+            raise AIServiceError("Could not optimize the description at the moment.") from e
+        except BaseException:
+            # Cancelled, or the client went away and the generator was closed
+            breaker.release()
+            raise
+        breaker.record_success()
+
+        if parts:
+            cache.set(cache_key, ''.join(parts))
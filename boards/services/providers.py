@@ -0,0 +1,148 @@
+"""
+AI providers and their registry.
+
+A provider turns a prompt into text; AIService wraps the configured
+provider (settings.AI_PROVIDER) with caching, rate limiting, retries and a
+circuit breaker. Register new providers with @register_provider('name').
+"""
+import asyncio
+import re
+import threading
+import weakref
+import openai
+from openai import AsyncOpenAI
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .resilience import AIServiceError, CircuitBreaker, RateLimiter
+
+_registry = {}
+_instances = {}
+_lock = threading.Lock()
+
+def register_provider(name):
+    def decorator(cls):
+        cls.name = name
+        _registry[name] = cls
+        return cls
+    return decorator
+
+def get_provider(name=None):
+    """Get the shared instance of a provider, with its own rate limiter and circuit breaker"""
+    name = name or settings.AI_PROVIDER
+    with _lock:
+        if name not in _instances:
+            if name not in _registry:
+                raise ImproperlyConfigured(f"Unknown AI provider '{name}'")
+            provider = _registry[name]()
+            provider.rate_limiter = RateLimiter(settings.AI_RATE_LIMIT, settings.AI_RATE_BURST)
+            provider.circuit_breaker = CircuitBreaker(
+                settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+                settings.AI_CIRCUIT_RESET_TIMEOUT
+            )
+            _instances[name] = provider
+        return _instances[name]
+
+def reset_providers():
+    """Drop provider instances so they are rebuilt from the current settings"""
+    with _lock:
+        _instances.clear()
+
+class AIProvider:
+    name = None
+    model = None
+    params = {}
+    # Errors worth retrying; anything else fails the call immediately
+    retryable_exceptions = (asyncio.TimeoutError, ConnectionError)
+
+    async def complete(self, prompt):
+        raise NotImplementedError
+
+    async def stream(self, prompt):
+        """Yield the completion in pieces; providers without streaming yield it whole"""
+        yield await self.complete(prompt)
+
+@register_provider('openai')
+class OpenAIProvider(AIProvider):
+    retryable_exceptions = (
+        asyncio.TimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+    def __init__(self):
+        self.model = settings.AI_MODEL
+        self.params = {"temperature": 0.7, "max_tokens": 150}
+        # An AsyncOpenAI client and its connection pool belong to the event
+        # loop that first used them, so keep one client per running loop.
+        # Under ASGI that is a single process-wide client.
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=settings.AI_REQUEST_TIMEOUT,
+                # AIService retries with backoff and circuit breaking
+                max_retries=0,
+            )
+            self._clients[loop] = client
+        return client
+
+    def messages(self, prompt):
+        return [{
+            "role": "user",
+            "content": f"Please Give me a summary of this task: {prompt}"
+        }]
+
+    async def complete(self, prompt):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messages(prompt),
+            **self.params
+        )
+        if not response.choices:
+            raise AIServiceError("Could not generate optimized description.")
+        return response.choices[0].message.content
+
+    async def stream(self, prompt):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messages(prompt),
+            stream=True,
+            **self.params
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+@register_provider('local')
+class LocalProvider(AIProvider):
+    """
+    Deterministic offline provider for tests, benchmarks and development.
+    Summarizes by keeping the first sentence, after AI_LOCAL_LATENCY seconds.
+    """
+    model = 'local-summary'
+
+    def __init__(self):
+        self.latency = settings.AI_LOCAL_LATENCY
+
+    def summarize(self, prompt):
+        text = ' '.join(prompt.split())
+        first_sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+        return f"Summary: {first_sentence}"
+
+    async def complete(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.summarize(prompt)
+
+    async def stream(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in re.findall(r'\S+\s*', self.summarize(prompt)):
+            yield token
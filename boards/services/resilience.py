@@ -0,0 +1,105 @@
+import asyncio
+import random
+import threading
+import time
+
+class AIServiceError(Exception):
+    """Raised when the AI provider cannot produce a result"""
+
+class CircuitOpenError(AIServiceError):
+    """Raised without calling the provider while its circuit is open"""
+
+class RateLimiter:
+    """
+    Token bucket allowing ``rate`` calls per second with bursts of ``burst``.
+
+    The bucket is shared by every event loop and thread in the process; a
+    rate of 0 disables limiting.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token, or return how many seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider for ``reset_timeout`` seconds after
+    ``failure_threshold`` consecutive failures, then lets a single trial
+    call through before closing again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a call that was cancelled before it succeeded or failed"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+async def retry_with_backoff(call, attempts, base_delay, max_delay, retry_on):
+    """Await ``call()``, retrying ``retry_on`` errors with exponential backoff and full jitter"""
+    for attempt in range(1, attempts + 1):
+        try:
+            return await call()
+        except retry_on:
+            if attempt >= attempts:
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, delay))
@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from .access import get_accessible_board_ids, get_board_id, invalidate_board_access
+from .models import (
+    Attachment, Board, BoardMember, Card, CardDate, CardLocation, CardMember,
+    Checklist, ChecklistItem, Comment, Label, List
+)
+from .realtime import broadcast, event_prefix, publish
+from .search import index_object, unindex_object
+from .sync import SYNC_MODELS, record_tombstone
+from .versions import bump_board_versions, bump_version_for
+from .serializers import (
+    CardDeltaSerializer, ChecklistDeltaSerializer, ChecklistItemSerializer,
+    CommentDeltaSerializer, ListDeltaSerializer
+)
+
+# Set while a bulk delete runs; it writes the tombstones, version bumps,
+# live events and search updates of the whole batch itself
+_batched_delete = ContextVar('batched_delete', default=False)
+
+@contextmanager
+def batched_deletes():
+    """Skip the per-row delete handlers for board content inside the block"""
+    token = _batched_delete.set(True)
+    try:
+        yield
+    finally:
+        _batched_delete.reset(token)
+
+@receiver(post_save, sender=BoardMember)
+@receiver(post_delete, sender=BoardMember)
+def board_member_changed(sender, instance, **kwargs):
+    invalidate_board_access(instance.user_id)
+
+@receiver(post_delete, sender=BoardMember)
+def board_member_removed(sender, instance, **kwargs):
+    publish(instance.board_id, {'type': 'board.access_revoked', 'user': instance.user_id})
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_changed(sender, instance, **kwargs):
+    # Owners can always reach their boards, even without a membership row
+    invalidate_board_access(instance.owner_id)
+
+# Models whose writes are pushed to board websocket groups, with the
+# serializer used for the delta
+LIVE_MODELS = {
+    List: ListDeltaSerializer,
+    Card: CardDeltaSerializer,
+    Checklist: ChecklistDeltaSerializer,
+    ChecklistItem: ChecklistItemSerializer,
+    Comment: CommentDeltaSerializer,
+}
+
+def board_content_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    event = f"{event_prefix(sender)}.{'created' if created else 'updated'}"
+    broadcast(get_board_id(instance), event, dict(LIVE_MODELS[sender](instance).data))
+
+def is_cascaded(instance, origin):
+    """Whether a delete came from deleting the board, list, card or checklist above it"""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not type(instance) and issubclass(origin_model, (Board, List, Card, Checklist))
+
+def board_content_deleted(sender, instance, origin=None, **kwargs):
+    # Rows removed by a cascade are implied by their parent's delete event
+    if is_cascaded(instance, origin) or _batched_delete.get():
+        return
+    broadcast(get_board_id(instance), f'{event_prefix(sender)}.deleted', {'id': instance.id})
+
+for model in LIVE_MODELS:
+    post_save.connect(board_content_saved, sender=model, dispatch_uid=f'live-save-{model.__name__}')
+    post_delete.connect(board_content_deleted, sender=model, dispatch_uid=f'live-delete-{model.__name__}')
+
+@receiver(post_delete, sender=Board)
+def board_deleted(sender, instance, **kwargs):
+    broadcast(instance.id, 'board.deleted', {'id': instance.id})
+
+def record_deletion(sender, instance, origin=None, **kwargs):
+    if not is_cascaded(instance, origin) and not _batched_delete.get():
+        record_tombstone(instance)
+
+for model, *_ in SYNC_MODELS.values():
+    post_delete.connect(record_deletion, sender=model, dispatch_uid=f'tombstone-{model.__name__}')
+
+# Writes to any of these change what a board read returns
+VERSIONED_MODELS = [
+    List, Card, Label, Checklist, ChecklistItem, Attachment,
+    CardLocation, CardDate, Comment, CardMember, BoardMember,
+]
+
+def board_content_written(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or is_cascaded(instance, origin) or _batched_delete.get():
+        return
+    bump_version_for(instance)
+
+for model in VERSIONED_MODELS:
+    post_save.connect(board_content_written, sender=model, dispatch_uid=f'version-save-{model.__name__}')
+    post_delete.connect(board_content_written, sender=model, dispatch_uid=f'version-delete-{model.__name__}')
+
+@receiver(post_save, sender=Board)
+def board_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        bump_version_for(instance)
+
+@receiver(m2m_changed, sender=Card.members.through)
+def card_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_version_for(instance)
+    elif pk_set:
+        bump_board_versions(*Card.objects.filter(pk__in=pk_set).values_list('board_id', flat=True))
+
+@receiver(post_save, sender=get_user_model())
+def user_saved(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Board payloads embed user details; logins only touch last_login
+    if created or raw or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    bump_board_versions(*get_accessible_board_ids(instance))
+
+# Objects whose text is searchable (see search.py)
+SEARCH_MODELS = [Card, Comment, ChecklistItem]
+
+def search_content_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        index_object(instance, created)
+
+def search_content_deleted(sender, instance, origin=None, **kwargs):
+    # Entries reference their card, so deleting a card (or anything above
+    # it) removes its comments' and items' entries along with its own
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if not issubclass(origin_model, (Board, List, Card)) and not _batched_delete.get():
+        unindex_object(instance)
+
+for model in SEARCH_MODELS:
+    post_save.connect(search_content_saved, sender=model, dispatch_uid=f'search-save-{model.__name__}')
+for model in (Comment, ChecklistItem):
+    post_delete.connect(search_content_deleted, sender=model, dispatch_uid=f'search-delete-{model.__name__}')
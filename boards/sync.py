@@ -0,0 +1,119 @@
+"""
+Delta sync: everything that changed on a board since a cursor.
+
+Changed rows are found by their timestamps and deleted rows by the
+Tombstone records written from post_delete signals (or by bulk deletes,
+which write them in one batch), so a reconnecting
+client only downloads what it is missing. Lists and cards that move to
+another board get a tombstone on the board they left.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from .access import get_board_id
+from .models import BoardMember, Card, Checklist, ChecklistItem, Comment, Label, List, Tombstone
+from .serializers import (
+    BoardMemberSerializer, CardDeltaSerializer, ChecklistDeltaSerializer,
+    ChecklistItemSerializer, CommentDeltaSerializer, LabelSerializer, ListDeltaSerializer
+)
+
+# Response key -> (model, serializer, lookup from the model to its board id,
+# change timestamp, relations the serializer reads)
+SYNC_MODELS = {
+    'lists': (List, ListDeltaSerializer, 'board_id', 'updated_at', []),
+    'cards': (Card, CardDeltaSerializer, 'board_id', 'updated_at', []),
+    'labels': (Label, LabelSerializer, 'card__board_id', 'updated_at', []),
+    'checklists': (Checklist, ChecklistDeltaSerializer, 'card__board_id', 'updated_at', []),
+    'checklist_items': (ChecklistItem, ChecklistItemSerializer, 'checklist__card__board_id', 'updated_at', []),
+    'comments': (Comment, CommentDeltaSerializer, 'card__board_id', 'updated_at', ['author']),
+    # Memberships are only ever added or removed
+    'members': (BoardMember, BoardMemberSerializer, 'board_id', 'created_at', ['user']),
+}
+
+_sync_keys = {model: key for key, (model, *_) in SYNC_MODELS.items()}
+
+def format_cursor(value):
+    return serializers.DateTimeField().to_representation(value)
+
+def record_tombstone(instance):
+    if isinstance(instance, Label) and instance.card_id is None:
+        # Labels that were never attached to a card are not on any board
+        return
+    Tombstone.objects.create(
+        board_id=get_board_id(instance),
+        model=_sync_keys[type(instance)],
+        object_id=instance.id
+    )
+
+def record_tombstones(model, boards):
+    """Tombstones for many deleted objects of one model, given {object_id: board_id}"""
+    Tombstone.objects.bulk_create([
+        Tombstone(board_id=board_id, model=_sync_keys[model], object_id=object_id)
+        for object_id, board_id in boards.items()
+    ], batch_size=500)
+
+def record_board_moves(model, moves):
+    """Delta sync for lists or cards moved to another board.
+
+    moves maps object ids to (old board id, new board id). The old board
+    gets tombstones for them; on the new board everything under them is
+    touched, so clients receive it along with the moved objects.
+    """
+    moves = {object_id: boards for object_id, boards in moves.items() if boards[0] != boards[1]}
+    if not moves:
+        return
+    # Tombstones from an earlier move away would delete them again
+    for new_board_id in {new for _, new in moves.values()}:
+        Tombstone.objects.filter(
+            board_id=new_board_id, model=_sync_keys[model],
+            object_id__in=[object_id for object_id, (_, new) in moves.items() if new == new_board_id]
+        ).delete()
+    record_tombstones(model, {object_id: old for object_id, (old, _) in moves.items()})
+
+    now = timezone.now()
+    if model is List:
+        cards = dict(Card.objects.filter(list_id__in=moves).values_list('id', 'list_id'))
+        Card.objects.filter(pk__in=cards).update(updated_at=now)
+        record_board_moves(Card, {card_id: moves[list_id] for card_id, list_id in cards.items()})
+        return
+    for child in (Label, Checklist, Comment):
+        child.objects.filter(card_id__in=moves).update(updated_at=now)
+    ChecklistItem.objects.filter(checklist__card_id__in=moves).update(updated_at=now)
+
+def is_expired(since):
+    """Whether tombstones older than the cursor may already have been pruned"""
+    return since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+def get_board_changes(board, since):
+    # Rows written by transactions that committed just after the previous
+    # response may carry slightly older timestamps, so look back a little.
+    # Clients must treat changes as upserts; some may repeat.
+    cursor = timezone.now()
+    window = since - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+
+    changes = {}
+    for key, (model, serializer_class, board_lookup, timestamp, related) in SYNC_MODELS.items():
+        queryset = model.objects.filter(**{
+            board_lookup: board.id,
+            f'{timestamp}__gt': window,
+        }).select_related(*related)
+        changes[key] = serializer_class(queryset, many=True).data
+
+    deleted = {key: [] for key in SYNC_MODELS}
+    for key, object_id in Tombstone.objects.filter(
+        board_id=board.id, deleted_at__gt=window
+    ).values_list('model', 'object_id'):
+        deleted[key].append(object_id)
+
+    return {
+        'cursor': format_cursor(cursor),
+        'board': {
+            'id': board.id,
+            'title': board.title,
+            'background': board.background,
+            'updated_at': format_cursor(board.updated_at),
+        } if board.updated_at > window else None,
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -1,3 +1,1832 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, connections
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest import mock
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from .access import get_accessible_board_ids
+from .utils import ORDER_STEP, order_for_position, rebalance_orders
+from . import export, jobs, trello
+from .render_cache import cache_stats
+from .search import reindex
+from .management.commands.copy_sqlite_data import MODELS as COPIED_MODELS
+from .serializers import BoardSummarySerializer
+from .views import batch_cards, save_batch_results, stream_batch_optimization
+from .consumers import BoardConsumer
+from .services import ai_service
+from .services.ai_service import AIService, ResponseCache
+from .services.providers import LocalProvider, get_provider, reset_providers
+from .services.resilience import AIServiceError, CircuitBreaker, CircuitOpenError, RateLimiter
+from .models import (
+    AIJob, Board, BoardMember, List, Card, Label, Checklist, ChecklistItem,
+    Attachment, CardLocation, CardMember, CardDate, Comment, SearchEntry, BoardImport, ImportedObject, Tombstone
+)
+
+from dragonlist_ai.asgi import application
+
+User = get_user_model()
+
+
+def build_board(owner, lists=2, cards_per_list=2):
+    """Create a board where every card has every nested relation populated"""
+    board = Board.objects.create(title='Board', owner=owner)
+    BoardMember.objects.create(board=board, user=owner)
+    board_lists = List.objects.bulk_create(
+        List(title=f'List {i}', board=board, order=i) for i in range(lists)
+    )
+    cards = Card.objects.bulk_create(
+        Card(title=f'Card {j}', list=board_list, board=board, order=j)
+        for board_list in board_lists
+        for j in range(cards_per_list)
+    )
+    Label.objects.bulk_create(Label(title='Bug', color='red', card=card) for card in cards)
+    checklists = Checklist.objects.bulk_create(Checklist(title='Todo', card=card) for card in cards)
+    ChecklistItem.objects.bulk_create(
+        ChecklistItem(title='Item', checklist=checklist, order=1) for checklist in checklists
+    )
+    Attachment.objects.bulk_create(
+        Attachment(title='Spec', file='attachments/spec.pdf', card=card) for card in cards
+    )
+    CardLocation.objects.bulk_create(
+        CardLocation(card=card, latitude=1.0, longitude=2.0, place_name='Office') for card in cards
+    )
+    CardMember.objects.bulk_create(CardMember(card=card, user=owner) for card in cards)
+    CardDate.objects.bulk_create(CardDate(card=card) for card in cards)
+    Comment.objects.bulk_create(Comment(card=card, author=owner, content='Hi') for card in cards)
+    return board
+
+
+class BoardsTestCase(APITestCase):
+    def setUp(self):
+        # Ids are reused between tests, so drop cached access sets and boards
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        reset_providers()
+        self.user = User.objects.create_user(username='owner', password='secret')
+        self.client.force_authenticate(self.user)
+
+
+class BoardQueryCountTests(BoardsTestCase):
+
+    def count_queries(self, url):
+        get_accessible_board_ids(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_board_retrieve_query_count_is_constant(self):
+        small = build_board(self.user, lists=1, cards_per_list=1)
+        large = build_board(self.user, lists=20, cards_per_list=25)
+
+        small_count, _ = self.count_queries(f'/api/boards/{small.id}/')
+        large_count, response = self.count_queries(f'/api/boards/{large.id}/')
+
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(large_count, 10)
+        self.assertEqual(len(response.json()['lists']), 20)
+        self.assertEqual(sum(len(l['cards']) for l in response.json()['lists']), 500)
+
+    def test_board_list_query_count_is_constant(self):
+        build_board(self.user, lists=1, cards_per_list=1)
+        one_board_count, _ = self.count_queries('/api/boards/')
+
+        build_board(self.user, lists=5, cards_per_list=10)
+        build_board(self.user, lists=5, cards_per_list=10)
+        many_boards_count, response = self.count_queries('/api/boards/')
+
+        self.assertEqual(one_board_count, many_boards_count)
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class MemberResolverTests(BoardsTestCase):
+    def test_members_are_resolved_in_one_query_per_scope(self):
+        board = build_board(self.user, lists=3, cards_per_list=10)
+        others = [User.objects.create_user(username=f'user{i}') for i in range(5)]
+        for other in others:
+            BoardMember.objects.create(board=board, user=other)
+            CardMember.objects.bulk_create(
+                CardMember(card=card, user=other) for card in board.board_cards.all()
+            )
+
+        get_accessible_board_ids(self.user)
+        with self.assertNumQueries(10):
+            response = self.client.get(f'/api/boards/{board.id}/')
+
+        self.assertEqual(
+            [m['user']['username'] for m in response.json()['members']],
+            ['owner'] + [u.username for u in others],
+        )
+        card = response.json()['lists'][0]['cards'][0]
+        self.assertEqual(len(card['members']), 6)
+        self.assertEqual(set(card['members'][0]), {'id', 'username', 'email', 'first_name', 'last_name'})
+
+    def test_card_list_members_load_once(self):
+        build_board(self.user, lists=2, cards_per_list=5)
+        build_board(self.user, lists=2, cards_per_list=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/cards/')
+
+        self.assertEqual(len(response.data), 20)
+        member_queries = [q for q in queries if 'boards_cardmember' in q['sql'] and 'FROM "boards_cardmember"' in q['sql']]
+        self.assertEqual(len(member_queries), 1)
+
+
+class RankOrderingTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user)
+        self.list = List.objects.create(title='List', board=self.board, order=ORDER_STEP)
+        self.cards = Card.objects.bulk_create(
+            Card(title=f'Card {i}', list=self.list, board=self.board, order=(i + 1) * ORDER_STEP)
+            for i in range(50)
+        )
+
+    def titles(self):
+        return list(Card.objects.filter(list=self.list).order_by('order', 'id').values_list('title', flat=True))
+
+    def test_move_to_top_writes_one_row(self):
+        last = self.cards[-1]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/cards/{last.id}/', {'order': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        updates = [q for q in queries if q['sql'].startswith('UPDATE "boards_card"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.titles()[0], 'Card 49')
+        self.assertEqual(self.titles()[1], 'Card 0')
+
+    def test_move_between_and_to_end(self):
+        first = self.cards[0]
+        self.client.patch(f'/api/cards/{first.id}/', {'order': 3}, format='json')
+        self.assertEqual(self.titles()[:4], ['Card 1', 'Card 2', 'Card 0', 'Card 3'])
+        self.client.patch(f'/api/cards/{first.id}/', {'order': 999}, format='json')
+        self.assertEqual(self.titles()[-1], 'Card 0')
+
+    def test_dense_keys_are_rebalanced(self):
+        queryset = Card.objects.filter(list=self.list)
+        # Keep inserting right after the first card so the gap halves each time
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for card in reversed(self.cards[1:]):
+                card.order = order_for_position(queryset, card.id, 2)
+                card.save()
+        self.assertTrue(callbacks)
+        orders = list(queryset.order_by('order').values_list('order', flat=True))
+        self.assertEqual(orders, [(i + 1) * ORDER_STEP for i in range(50)])
+        self.assertEqual(self.titles()[:3], ['Card 0', 'Card 1', 'Card 2'])
+
+    def test_rebalance_keeps_order(self):
+        Card.objects.filter(pk=self.cards[10].pk).update(order=ORDER_STEP)
+        rebalance_orders(Card.objects.filter(list=self.list))
+        self.assertEqual(self.titles()[:2], ['Card 0', 'Card 10'])
+
+
+class CommittedRebalanceTests(APITransactionTestCase):
+    """Outside a test transaction on_commit callbacks run immediately"""
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user(username='owner', password='secret')
+        self.client.force_authenticate(self.user)
+        board = Board.objects.create(title='Board', owner=self.user)
+        BoardMember.objects.create(board=board, user=self.user)
+        self.list = List.objects.create(title='List', board=board, order=1)
+        orders = [ORDER_STEP, ORDER_STEP + 1e-7, 2 * ORDER_STEP, 3 * ORDER_STEP]
+        self.cards = Card.objects.bulk_create(
+            Card(title=f'C{i}', list=self.list, board=board, order=order) for i, order in enumerate(orders)
+        )
+
+    def test_move_is_saved_before_the_rebalance(self):
+        response = self.client.patch(f'/api/cards/{self.cards[3].id}/', {'order': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        rows = list(Card.objects.filter(list=self.list).order_by('order').values_list('title', 'order'))
+        self.assertEqual(rows, [
+            ('C0', ORDER_STEP), ('C3', 2 * ORDER_STEP), ('C1', 3 * ORDER_STEP), ('C2', 4 * ORDER_STEP)
+        ])
+
+
+class BulkMoveTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=3, cards_per_list=20)
+        self.lists = list(self.board.lists.order_by('order'))
+
+    def list_titles(self, board_list):
+        return list(board_list.cards.order_by('order', 'id').values_list('title', flat=True))
+
+    def test_bulk_move_uses_one_update(self):
+        source, target = self.lists[0], self.lists[1]
+        cards = list(source.cards.order_by('order'))[:10]
+        moves = [{'card': card.id, 'list': target.id, 'position': i + 1} for i, card in enumerate(cards)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/cards/bulk_move/', {'moves': moves}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "boards_card"')]), 1)
+        self.assertEqual(self.list_titles(target)[:10], [card.title for card in cards])
+        self.assertEqual(len(self.list_titles(target)), 30)
+        self.assertEqual(len(self.list_titles(source)), 10)
+
+    def test_cross_board_move_moves_search_entries(self):
+        target_board = build_board(self.user, lists=1, cards_per_list=1)
+        source_member = User.objects.create_user(username='source-only')
+        BoardMember.objects.create(board=self.board, user=source_member)
+        card = self.lists[0].cards.first()
+        card.title = 'Zebra crossing'
+        card.save()
+        Comment.objects.create(card=card, author=self.user, content='zebra stripes')
+        ChecklistItem.objects.create(title='Paint zebra', checklist=card.checklists.first(), order=2)
+
+        response = self.client.post('/api/cards/bulk_move/', {'moves': [
+            {'card': card.id, 'list': target_board.lists.get().id, 'position': 1}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        results = self.client.get('/api/search/', {'q': 'zebra', 'board': target_board.id}).json()['results']
+        self.assertEqual(len(results), 3)
+        self.client.force_authenticate(source_member)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'zebra'}).json()['results'], [])
+
+    def test_bulk_move_rejects_foreign_boards(self):
+        stranger = User.objects.create_user(username='stranger')
+        other_board = build_board(stranger, lists=1, cards_per_list=1)
+        foreign_card = other_board.board_cards.get()
+        response = self.client.post('/api/cards/bulk_move/', {'moves': [
+            {'card': foreign_card.id, 'list': self.lists[0].id, 'position': 1}
+        ]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        foreign_card.refresh_from_db()
+        self.assertEqual(foreign_card.board_id, other_board.id)
+
+
+class BoardAccessTests(BoardsTestCase):
+    def test_access_follows_membership_changes(self):
+        stranger = User.objects.create_user(username='stranger')
+        board = build_board(stranger, lists=1, cards_per_list=1)
+        card = board.board_cards.get()
+
+        self.assertEqual(self.client.get(f'/api/boards/{board.id}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/cards/{card.id}/').status_code, 404)
+
+        membership = BoardMember.objects.create(board=board, user=self.user)
+        self.assertEqual(self.client.get(f'/api/boards/{board.id}/').status_code, 200)
+        self.assertEqual(self.client.get(f'/api/cards/{card.id}/').status_code, 200)
+
+        membership.delete()
+        self.assertEqual(self.client.get(f'/api/cards/{card.id}/').status_code, 404)
+
+    def test_sets_cached_before_the_commit_are_dropped(self):
+        stranger = User.objects.create_user(username='stranger')
+        board = build_board(stranger, lists=1, cards_per_list=1)
+        stale = list(get_accessible_board_ids(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardMember.objects.create(board=board, user=self.user)
+            # A concurrent request reading the pre-commit memberships
+            caches[settings.BOARD_ACCESS_CACHE].set(f'board-access:{self.user.id}', stale)
+        self.assertIn(board.id, get_accessible_board_ids(self.user))
+
+    def test_access_set_is_cached(self):
+        board = build_board(self.user, lists=1, cards_per_list=1)
+        self.client.get(f'/api/boards/{board.id}/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/boards/{board.id}/')
+        self.assertFalse([q for q in queries if 'boards_boardmember' in q['sql'] and 'owner_id' in q['sql']])
+
+
+class PaginationTests(BoardsTestCase):
+    def test_comments_are_paged_newest_first(self):
+        board = build_board(self.user, lists=1, cards_per_list=1)
+        card = board.board_cards.get()
+        Comment.objects.bulk_create(
+            Comment(card=card, author=self.user, content=f'Comment {i}') for i in range(5)
+        )
+
+        seen = []
+        url = f'/api/cards/{card.id}/comments/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [comment['id'] for comment in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, sorted(card.comments.values_list('id', flat=True), reverse=True))
+
+    def test_all_users_is_paginated(self):
+        for i in range(3):
+            User.objects.create_user(username=f'user{i}')
+        response = self.client.get('/api/users/all_users/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class ExplainQueriesCommandTests(BoardsTestCase):
+    def test_board_tree_queries_use_indexes(self):
+        build_board(self.user, lists=2, cards_per_list=3)
+        out = StringIO()
+        call_command('explain_queries', '--user', 'owner', '--verbose-plans', stdout=out)
+        output = out.getvalue()
+        self.assertIn('CardViewSet', output)
+        self.assertIn('LabelViewSet', output)
+        # A scan that uses no index is printed as a bare "SCAN <table>"
+        self.assertEqual(re.findall(r'SCAN boards_\w+$', output, re.MULTILINE), [])
+        self.assertIn('No full scans found', output)
+
+
+class CopySqliteDataTests(TransactionTestCase):
+    """Copies a populated SQLite file into the emptied test database"""
+
+    @classmethod
+    def setUpClass(cls):
+        # The source alias only exists when DB_ENGINE=postgresql, so it is
+        # added here, after the test runner has set up its databases
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.databases['sqlite_source'] = dict(
+            connections.databases['default'], NAME=f'{cls.directory.name}/old.sqlite3'
+        )
+        cls.databases = {'default', 'sqlite_source'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['sqlite_source'].close()
+        del connections['sqlite_source']
+        del connections.databases['sqlite_source']
+        cls.directory.cleanup()
+
+    def setUp(self):
+        user = User.objects.create_user(username='owner', password='secret')
+        board = build_board(user, lists=2, cards_per_list=3)
+        card = board.board_cards.first()
+        AIJob.objects.create(card=card, requested_by=user, prompt='Tidy')
+        BoardImport.objects.create(owner=user, board=board)
+        board.board_cards.last().delete()
+        self.counts = {model: model.objects.count() for model in COPIED_MODELS}
+
+        # The populated database becomes the old SQLite file, then is emptied
+        source = sqlite3.connect(connections.databases['sqlite_source']['NAME'])
+        connection.ensure_connection()
+        connection.connection.backup(source)
+        source.close()
+        call_command('flush', interactive=False, verbosity=0)
+
+    def test_copies_every_model_and_rebuilds_search(self):
+        call_command('copy_sqlite_data', stdout=StringIO())
+
+        self.assertIn(Tombstone, self.counts)
+        self.assertIn(AIJob, self.counts)
+        self.assertTrue(all(self.counts[model] for model in (Tombstone, AIJob, BoardImport, Comment)))
+        self.assertEqual({model: model.objects.count() for model in COPIED_MODELS}, self.counts)
+        indexed = Card.objects.count() + Comment.objects.count() + ChecklistItem.objects.count()
+        self.assertEqual(SearchEntry.objects.count(), indexed)
+
+
+class StubAIService:
+    """Stands in for AIService so tests never reach the network"""
+    calls = []
+
+    async def optimize_description(self, prompt):
+        StubAIService.calls.append(prompt)
+        return f'Optimized: {prompt}'
+
+
+class OptimizeDescriptionTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.card = build_board(self.user, lists=1, cards_per_list=1).board_cards.get()
+        self.url = f'/api/cards/{self.card.id}/optimize-description/'
+
+    @mock.patch('boards.views.AIService', StubAIService)
+    def test_optimizes_and_saves_description(self):
+        response = self.client.post(self.url, {'description': 'fix login'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'description': 'Optimized: fix login'})
+        self.card.refresh_from_db()
+        self.assertEqual(self.card.description, 'Optimized: fix login')
+
+    @mock.patch('boards.views.AIService', StubAIService)
+    def test_requires_board_access(self):
+        self.client.force_authenticate(User.objects.create_user(username='stranger'))
+        response = self.client.post(self.url, {'description': 'fix login'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, {'description': 'fix login'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    @mock.patch('boards.views.AIService', StubAIService)
+    async def test_runs_on_the_async_handler(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await AsyncClient().post(
+            self.url, {'description': 'ship it'}, content_type='application/json',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'description': 'Optimized: ship it'})
+
+    @override_settings(AI_PROVIDER='local')
+    def test_open_circuit_returns_service_unavailable(self):
+        breaker = get_provider().circuit_breaker
+        breaker.state, breaker._opened_at = CircuitBreaker.OPEN, time.monotonic()
+        response = self.client.post(self.url, {'description': 'fix login'}, format='json')
+        self.assertEqual(response.status_code, 503)
+
+
+class FailingAIService:
+    async def optimize_description(self, prompt):
+        raise RuntimeError('upstream unavailable')
+
+
+class AIJobTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.card = build_board(self.user, lists=1, cards_per_list=1).board_cards.get()
+        self.url = f'/api/cards/{self.card.id}/optimize-description/?mode=job'
+
+    @mock.patch('boards.jobs.AIService', StubAIService)
+    def test_job_mode_returns_immediately_and_worker_writes_description(self):
+        with mock.patch('boards.jobs.submit') as submit, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'description': 'tidy me'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+        submit.assert_called_once_with(job_id)
+
+        status_url = f'/api/ai-jobs/{job_id}/'
+        self.assertEqual(self.client.get(status_url).data['status'], AIJob.STATUS_PENDING)
+
+        jobs.run_job(job_id)
+
+        data = self.client.get(status_url).data
+        self.assertEqual(data['status'], AIJob.STATUS_DONE)
+        self.assertEqual(data['result'], 'Optimized: tidy me')
+        self.card.refresh_from_db()
+        self.assertEqual(self.card.description, 'Optimized: tidy me')
+
+    @mock.patch('boards.jobs.AIService', FailingAIService)
+    def test_failed_job_reports_error(self):
+        job = AIJob.objects.create(card=self.card, requested_by=self.user, prompt='x')
+        self.assertEqual(jobs.process_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AIJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'upstream unavailable')
+
+    def test_jobs_in_a_thread_share_one_event_loop(self):
+        loops = []
+
+        class LoopRecordingService:
+            async def optimize_description(self, prompt):
+                loops.append(asyncio.get_running_loop())
+                return prompt
+
+        for prompt in ('one', 'two'):
+            AIJob.objects.create(card=self.card, requested_by=self.user, prompt=prompt)
+        with mock.patch('boards.jobs.AIService', LoopRecordingService):
+            self.assertEqual(jobs.process_pending_jobs(), 2)
+        self.assertEqual(len(loops), 2)
+        self.assertIs(loops[0], loops[1])
+        self.assertFalse(loops[0].is_closed())
+
+    @mock.patch('boards.jobs.AIService', StubAIService)
+    def test_jobs_left_running_by_a_dead_worker_are_rerun(self):
+        stale = AIJob.objects.create(card=self.card, requested_by=self.user, prompt='stale')
+        busy = AIJob.objects.create(card=self.card, requested_by=self.user, prompt='busy')
+        AIJob.objects.filter(pk__in=[stale.id, busy.id]).update(status=AIJob.STATUS_RUNNING)
+        AIJob.objects.filter(pk=stale.id).update(
+            updated_at=timezone.now() - timedelta(seconds=settings.AI_JOB_STALE_AFTER + 1)
+        )
+        self.assertEqual(jobs.process_pending_jobs(), 1)
+        stale.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual(stale.status, AIJob.STATUS_DONE)
+        # Possibly still being worked on by a live worker
+        self.assertEqual(busy.status, AIJob.STATUS_RUNNING)
+
+    def test_new_worker_pool_requeues_stale_jobs(self):
+        job = AIJob.objects.create(card=self.card, requested_by=self.user, prompt='x')
+        AIJob.objects.filter(pk=job.id).update(
+            status=AIJob.STATUS_RUNNING,
+            updated_at=timezone.now() - timedelta(seconds=settings.AI_JOB_STALE_AFTER + 1)
+        )
+        with mock.patch('boards.jobs._executor', None), \
+                mock.patch('boards.jobs.ThreadPoolExecutor') as executor_class:
+            jobs.get_executor()
+        executor_class.return_value.submit.assert_called_once_with(jobs._run_in_worker, job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AIJob.STATUS_PENDING)
+
+    def test_jobs_are_private(self):
+        job = AIJob.objects.create(card=self.card, requested_by=self.user, prompt='x')
+        self.client.force_authenticate(User.objects.create_user(username='stranger'))
+        self.assertEqual(self.client.get(f'/api/ai-jobs/{job.id}/').status_code, 404)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def test_key_ignores_whitespace_but_not_case(self):
+        params = {'temperature': 0.7}
+        self.assertEqual(
+            ResponseCache.make_key('Fix  the\nLogin bug', 'gpt', params),
+            ResponseCache.make_key('Fix the Login bug ', 'gpt', params),
+        )
+        self.assertNotEqual(
+            ResponseCache.make_key('Rename getURL to getUrl', 'gpt', params),
+            ResponseCache.make_key('rename geturl to geturl', 'gpt', params),
+        )
+        self.assertNotEqual(
+            ResponseCache.make_key('fix the login bug', 'gpt', params),
+            ResponseCache.make_key('fix the login bug', 'other-model', params),
+        )
+
+    def test_lru_eviction_ttl_and_counters(self):
+        cache = ResponseCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+        expired = ResponseCache(ttl=0)
+        expired.set('a', 1)
+        self.assertIsNone(expired.get('a'))
+
+    def test_counters_are_exact_across_threads(self):
+        cache = ResponseCache()
+        cache.set('a', 1)
+
+        def lookup():
+            for _ in range(500):
+                cache.get('a')
+                cache.get('b')
+
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.stats()['hits'], 4000)
+        self.assertEqual(cache.stats()['misses'], 4000)
+
+    def test_service_only_calls_model_on_miss(self):
+        provider = CountingProvider()
+        cache = ResponseCache()
+        with mock.patch.object(ai_service, '_response_cache', cache):
+            first = async_to_sync(AIService(provider).optimize_description)('Write docs')
+            second = async_to_sync(AIService(provider).optimize_description)('Write   docs ')
+
+        self.assertEqual(first, second)
+        self.assertEqual(provider.calls, ['Write docs'])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+
+class CountingProvider(LocalProvider):
+    """Local provider that records prompts and can fail its first calls"""
+    def __init__(self, failures=0, error=ConnectionError):
+        super().__init__()
+        self.calls = []
+        self.failures = failures
+        self.error = error
+        self.rate_limiter = RateLimiter(0, 1)
+        self.circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    async def complete(self, prompt):
+        self.calls.append(prompt)
+        if len(self.calls) <= self.failures:
+            raise self.error('upstream unavailable')
+        return await super().complete(prompt)
+
+
+class SlowProvider(LocalProvider):
+    """Local provider whose calls hang until they are cancelled"""
+    def __init__(self):
+        super().__init__()
+        self.rate_limiter = RateLimiter(0, 1)
+
+    async def complete(self, prompt):
+        await asyncio.sleep(60)
+
+    async def stream(self, prompt):
+        yield 'first '
+        await asyncio.sleep(60)
+
+
+@override_settings(AI_RETRY_ATTEMPTS=3, AI_RETRY_BASE_DELAY=0, AI_RETRY_MAX_DELAY=0)
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        ai_service._response_cache = ResponseCache()
+
+    def tearDown(self):
+        ai_service._response_cache = None
+        reset_providers()
+
+    def test_retries_transient_errors(self):
+        provider = CountingProvider(failures=2)
+        result = async_to_sync(AIService(provider).optimize_description)('Ship it. Then rest.')
+        self.assertEqual(result, 'Summary: Ship it.')
+        self.assertEqual(len(provider.calls), 3)
+        self.assertEqual(provider.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    def test_does_not_retry_other_errors(self):
+        provider = CountingProvider(failures=1, error=ValueError)
+        with self.assertRaises(AIServiceError):
+            async_to_sync(AIService(provider).optimize_description)('Ship it')
+        self.assertEqual(len(provider.calls), 1)
+
+    def test_open_circuit_fails_fast(self):
+        provider = CountingProvider(failures=100)
+        service = AIService(provider)
+        for prompt in ['one', 'two']:
+            with self.assertRaises(AIServiceError):
+                async_to_sync(service.optimize_description)(prompt)
+        self.assertEqual(provider.circuit_breaker.state, CircuitBreaker.OPEN)
+
+        calls = len(provider.calls)
+        with self.assertRaises(CircuitOpenError):
+            async_to_sync(service.optimize_description)('three')
+        self.assertEqual(len(provider.calls), calls)
+
+    def test_circuit_closes_after_successful_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_cancelled_trial_frees_the_circuit(self):
+        provider = SlowProvider()
+        provider.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        provider.circuit_breaker.record_failure()
+        service = AIService(provider)
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(service.optimize_description('trial'))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        async def close_stream():
+            tokens = service.stream_optimize_description('stream')
+            await tokens.__anext__()
+            await tokens.aclose()
+
+        for abandon in (cancel_trial, close_stream):
+            async_to_sync(abandon)()
+            self.assertEqual(provider.circuit_breaker.state, CircuitBreaker.HALF_OPEN)
+            # The next call is let through as the trial
+            self.assertTrue(provider.circuit_breaker.allow())
+            provider.circuit_breaker.release()
+
+    @override_settings(AI_PROVIDER='local')
+    def test_local_provider_is_deterministic(self):
+        reset_providers()
+        service = AIService()
+        self.assertIsInstance(service.provider, LocalProvider)
+        prompt = 'Plan the launch.  Invite everyone!'
+        self.assertEqual(async_to_sync(service.optimize_description)(prompt), 'Summary: Plan the launch.')
+
+        async def collect():
+            return [token async for token in LocalProvider().stream(prompt)]
+        self.assertEqual(async_to_sync(collect)(), ['Summary: ', 'Plan ', 'the ', 'launch.'])
+
+
+class FakeModelServer:
+    """A local OpenAI-compatible chat completions endpoint"""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.in_flight -= 1
+                prompt = body['messages'][-1]['content'].rsplit(': ', 1)[-1]
+                if body.get('stream'):
+                    return self.stream(body['model'], f'Tidy: {prompt}')
+                payload = json.dumps({
+                    'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                    'choices': [{
+                        'index': 0, 'finish_reason': 'stop',
+                        'message': {'role': 'assistant', 'content': f'Tidy: {prompt}'},
+                    }],
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def stream(self, model, content):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                for word in content.split(' '):
+                    chunk = {
+                        'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk', 'created': 0, 'model': model,
+                        'choices': [{'index': 0, 'delta': {'content': word + ' '}, 'finish_reason': None}],
+                    }
+                    self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+                    self.wfile.flush()
+                self.wfile.write(b'data: [DONE]\n\n')
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/v1'
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class BatchOptimizeTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=6)
+        for card in self.board.board_cards.all():
+            card.description = f'card {card.id} notes'
+            card.save()
+        ai_service._response_cache = ResponseCache()
+
+    def tearDown(self):
+        ai_service._response_cache = None
+
+    async def stream(self, url):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await AsyncClient().post(url, headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_saving_results_does_not_query_per_card(self):
+        cards = list(batch_cards(board_id=self.board.id))
+        for card in cards:
+            card.description = 'Tidy'
+        with CaptureQueriesContext(connection) as queries:
+            save_batch_results(cards)
+        # One bulk update, the version bump and the search reindex
+        self.assertLessEqual(len(queries), 6)
+        self.assertEqual(self.board.board_cards.filter(description='Tidy').count(), 12)
+
+    @override_settings(AI_BATCH_CONCURRENCY=3, OPENAI_API_KEY='test')
+    async def test_list_batch_streams_progress_and_bulk_updates(self):
+        board_list = await self.board.lists.afirst()
+        with FakeModelServer() as server, override_settings(OPENAI_BASE_URL=server.url):
+            events = await self.stream(f'/api/lists/{board_list.id}/optimize_descriptions/')
+
+        self.assertEqual(events[0], {'event': 'start', 'total': 6})
+        self.assertEqual([e['event'] for e in events[1:-1]], ['card'] * 6)
+        self.assertEqual(events[-1], {'event': 'complete', 'updated': 6, 'failed': 0})
+        self.assertLessEqual(server.max_in_flight, 3)
+        self.assertGreater(server.max_in_flight, 1)
+        async for card in board_list.cards.all():
+            self.assertEqual(card.description, f'Tidy: card {card.id} notes')
+
+    @override_settings(OPENAI_API_KEY='test')
+    async def test_board_batch_covers_every_list(self):
+        with FakeModelServer(delay=0) as server, override_settings(OPENAI_BASE_URL=server.url):
+            events = await self.stream(f'/api/boards/{self.board.id}/optimize_descriptions/')
+        self.assertEqual(events[-1]['updated'], 12)
+
+    async def test_disconnect_keeps_finished_results(self):
+        cards = await sync_to_async(lambda: list(batch_cards(board_id=self.board.id)))()
+        hanging = {card.description for card in cards[6:]}
+
+        async def optimize_description(service, description):
+            if description in hanging:
+                await asyncio.sleep(60)
+            return 'Tidy'
+
+        with mock.patch.object(AIService, 'optimize_description', optimize_description):
+            stream = stream_batch_optimization(cards)
+            events = [json.loads(await anext(stream)) for _ in range(7)]
+            # The client stops reading while six cards are still running
+            await stream.aclose()
+
+        self.assertEqual([e['event'] for e in events], ['start'] + ['card'] * 6)
+        saved = await self.board.board_cards.filter(description='Tidy').acount()
+        self.assertEqual(saved, 6)
+
+    async def test_batch_requires_board_access(self):
+        stranger = await sync_to_async(User.objects.create_user)(username='stranger')
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(stranger).access_token))()
+        response = await AsyncClient().post(
+            f'/api/boards/{self.board.id}/optimize_descriptions/',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class StreamDescriptionTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.card = build_board(self.user, lists=1, cards_per_list=1).board_cards.get()
+        ai_service._response_cache = ResponseCache()
+
+    def tearDown(self):
+        ai_service._response_cache = None
+
+    @override_settings(OPENAI_API_KEY='test')
+    async def test_streams_tokens_and_saves_final_text(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        with FakeModelServer(delay=0) as server, override_settings(OPENAI_BASE_URL=server.url):
+            response = await AsyncClient().post(
+                f'/api/cards/{self.card.id}/optimize-description/stream/',
+                {'description': 'ship the beta'}, content_type='application/json',
+                headers={'Authorization': f'Bearer {token}'}
+            )
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        events = [block for block in body.split('\n\n') if block]
+        tokens = [json.loads(e[len('data: '):])['token'] for e in events if e.startswith('data: ')]
+        self.assertEqual(tokens, ['Tidy: ', 'ship ', 'the ', 'beta '])
+        self.assertTrue(events[-1].startswith('event: done'))
+        await self.card.arefresh_from_db()
+        self.assertEqual(self.card.description, 'Tidy: ship the beta ')
+
+
+class LiveBoardTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=2)
+        self.card = self.board.board_cards.first()
+
+    def tearDown(self):
+        async_to_sync(get_channel_layer().flush)()
+
+    async def connect(self, user=None, token=None):
+        if token is None:
+            token = await sync_to_async(lambda: str(RefreshToken.for_user(user or self.user).access_token))()
+        communicator = WebsocketCommunicator(
+            application, f'/ws/boards/{self.board.id}/?token={token}',
+            headers=[(b'origin', b'http://localhost')]
+        )
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    def committed(self, write):
+        """Run a write and its on_commit broadcasts"""
+        with self.captureOnCommitCallbacks(execute=True):
+            return write()
+
+    async def test_rejects_missing_token_and_strangers(self):
+        _, connected, code = await self.connect(token='')
+        self.assertFalse(connected)
+        self.assertEqual(code, BoardConsumer.UNAUTHENTICATED)
+
+        stranger = await sync_to_async(User.objects.create_user)(username='stranger')
+        _, connected, code = await self.connect(user=stranger)
+        self.assertFalse(connected)
+        self.assertEqual(code, BoardConsumer.FORBIDDEN)
+
+    async def test_pushes_card_updates(self):
+        communicator, connected, _ = await self.connect()
+        self.assertTrue(connected)
+
+        def rename():
+            self.card.title = 'Renamed'
+            self.card.save()
+        await sync_to_async(self.committed)(rename)
+
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['event'], 'card.updated')
+        self.assertEqual(message['board'], self.board.id)
+        self.assertEqual(message['data']['id'], self.card.id)
+        self.assertEqual(message['data']['title'], 'Renamed')
+        await communicator.disconnect()
+
+    async def test_cascaded_deletes_send_only_the_parent_event(self):
+        communicator, _, _ = await self.connect()
+        board_list = await self.board.lists.afirst()
+        list_id = board_list.id
+        await sync_to_async(self.committed)(board_list.delete)
+
+        message = await communicator.receive_json_from()
+        self.assertEqual(message, {'event': 'list.deleted', 'board': self.board.id, 'data': {'id': list_id}})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+    async def test_bulk_move_is_announced(self):
+        communicator, _, _ = await self.connect()
+        target = await self.board.lists.order_by('-order').afirst()
+        response = await sync_to_async(self.committed)(lambda: self.client.post(
+            '/api/cards/bulk_move/',
+            {'moves': [{'card': self.card.id, 'list': target.id, 'position': 1}]},
+            format='json'
+        ))
+        self.assertEqual(response.status_code, 200)
+
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['event'], 'cards.moved')
+        self.assertEqual(message['data'], response.json()['moved'])
+        await communicator.disconnect()
+
+    def lookups_after_write(self, url, data, table):
+        """SELECTs a PATCH runs once it has written its row, and the total query count"""
+        get_accessible_board_ids(self.user)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'] for query in queries.captured_queries]
+        written = next(i for i, query in enumerate(sql) if query.startswith(f'UPDATE "{table}"'))
+        after = sql[written:]
+        # The board's version is bumped by primary key, not through a join
+        bump = next(query for query in after if query.startswith('UPDATE "boards_board"'))
+        self.assertNotIn('JOIN', bump)
+        return [query for query in after if query.startswith('SELECT')], len(sql)
+
+    def test_edits_look_up_their_board_once(self):
+        # One lookup serves the live event, the version bump and the search entry
+        item = ChecklistItem.objects.filter(checklist__card__board=self.board).first()
+        lookups, total = self.lookups_after_write(
+            f'/api/checklist-items/{item.id}/', {'title': 'Renamed'}, 'boards_checklistitem'
+        )
+        self.assertEqual(len(lookups), 1)
+        self.assertNotIn('"boards_card"."title"', lookups[0])
+        self.assertLessEqual(total, 9)
+
+        comment = Comment.objects.filter(card=self.card).first()
+        lookups, total = self.lookups_after_write(
+            f'/api/comments/{comment.id}/update_content/', {'content': 'Edited'}, 'boards_comment'
+        )
+        self.assertEqual(len(lookups), 1)
+        self.assertNotIn('"boards_card"."title"', lookups[0])
+        self.assertLessEqual(total, 7)
+
+    async def test_removed_member_is_disconnected(self):
+        member = await sync_to_async(User.objects.create_user)(username='member')
+        membership = await BoardMember.objects.acreate(board=self.board, user=member)
+        communicator, connected, _ = await self.connect(user=member)
+        self.assertTrue(connected)
+
+        await sync_to_async(self.committed)(membership.delete)
+        output = await communicator.receive_output()
+        self.assertEqual(output, {'type': 'websocket.close', 'code': BoardConsumer.FORBIDDEN})
+
+
+@override_settings(SYNC_CURSOR_OVERLAP=0)
+class DeltaSyncTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=2)
+        self.url = f'/api/boards/{self.board.id}/changes/'
+
+    def changes(self, since):
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_changes_and_tombstones_since_cursor(self):
+        first = self.changes((timezone.now() - timedelta(hours=1)).isoformat())
+        self.assertEqual(len(first['changes']['cards']), 4)
+        self.assertEqual(first['board']['id'], self.board.id)
+
+        doomed_list, kept_list = self.board.lists.all()
+        card = kept_list.cards.first()
+        card.title = 'Renamed'
+        card.save()
+        item = ChecklistItem.objects.filter(checklist__card=card).first()
+        item.is_completed = True
+        item.save()
+        comment = card.comments.first()
+        comment_id, list_id = comment.id, doomed_list.id
+        comment.delete()
+        doomed_list.delete()
+
+        second = self.changes(first['cursor'])
+        self.assertIsNone(second['board'])
+        self.assertEqual([c['title'] for c in second['changes']['cards']], ['Renamed'])
+        self.assertEqual([i['id'] for i in second['changes']['checklist_items']], [item.id])
+        self.assertEqual(second['changes']['lists'], [])
+        self.assertEqual(second['deleted']['comments'], [comment_id])
+        # Cards, labels and comments of the deleted list are implied by its tombstone
+        self.assertEqual(second['deleted']['lists'], [list_id])
+        self.assertEqual(second['deleted']['cards'], [])
+
+        self.assertEqual(self.changes(second['cursor'])['changes']['cards'], [])
+
+    def test_label_edits_are_synced(self):
+        cursor = self.changes(timezone.now().isoformat())['cursor']
+        label = Label.objects.filter(card__board=self.board).first()
+        response = self.client.patch(f'/api/labels/{label.id}/', {'color': 'green'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        labels = self.changes(cursor)['changes']['labels']
+        self.assertEqual([(l['id'], l['color']) for l in labels], [(label.id, 'green')])
+
+    def test_cross_board_moves_are_synced(self):
+        other = build_board(self.user, lists=1, cards_per_list=0)
+        target = other.lists.get()
+        moved, patched = self.board.board_cards.order_by('id')[:2]
+        since = self.changes(timezone.now().isoformat())['cursor']
+        other_since = self.client.get(f'/api/boards/{other.id}/changes/', {'since': since}).json()['cursor']
+
+        response = self.client.post('/api/cards/bulk_move/', {
+            'moves': [{'card': moved.id, 'list': target.id, 'position': 1}]
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(
+            f'/api/cards/{patched.id}/', {'list': target.id, 'board': other.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # The old board drops both cards; the new one gets them with everything on them
+        self.assertEqual(sorted(self.changes(since)['deleted']['cards']), [moved.id, patched.id])
+        changes = self.client.get(f'/api/boards/{other.id}/changes/', {'since': other_since}).json()['changes']
+        self.assertEqual(sorted(c['id'] for c in changes['cards']), [moved.id, patched.id])
+        for key in ('labels', 'checklists', 'checklist_items', 'comments'):
+            self.assertEqual(len(changes[key]), 2, key)
+
+        # Moving a card back clears the tombstone its first move left
+        response = self.client.post('/api/cards/bulk_move/', {
+            'moves': [{'card': moved.id, 'list': self.board.lists.first().id, 'position': 1}]
+        }, format='json')
+        self.assertEqual(self.changes(since)['deleted']['cards'], [patched.id])
+
+    def test_list_moved_to_another_board_takes_its_cards(self):
+        other = build_board(self.user, lists=1, cards_per_list=0)
+        board_list = self.board.lists.first()
+        card_ids = sorted(board_list.cards.values_list('id', flat=True))
+        since = self.changes(timezone.now().isoformat())['cursor']
+
+        response = self.client.patch(f'/api/lists/{board_list.id}/', {'board': other.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(set(Card.objects.filter(pk__in=card_ids).values_list('board_id', flat=True)), {other.id})
+        deleted = self.changes(since)['deleted']
+        self.assertEqual((deleted['lists'], sorted(deleted['cards'])), ([board_list.id], card_ids))
+        changes = self.client.get(f'/api/boards/{other.id}/changes/', {'since': since}).json()['changes']
+        self.assertEqual(sorted(c['id'] for c in changes['cards']), card_ids)
+        self.assertEqual(len(changes['checklist_items']), len(card_ids))
+
+    def test_cannot_move_to_a_board_without_access(self):
+        stranger = User.objects.create_user(username='stranger')
+        foreign = build_board(stranger, lists=1, cards_per_list=0)
+        board_list = self.board.lists.first()
+        response = self.client.patch(f'/api/lists/{board_list.id}/', {'board': foreign.id}, format='json')
+        self.assertEqual(response.status_code, 403)
+        card = board_list.cards.first()
+        response = self.client.patch(f'/api/cards/{card.id}/', {'board': foreign.id}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_rejects_bad_and_expired_cursors(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        expired = (timezone.now() - timedelta(days=365)).isoformat()
+        self.assertEqual(self.client.get(self.url, {'since': expired}).status_code, 410)
+
+    def test_requires_board_access(self):
+        self.client.force_authenticate(User.objects.create_user(username='stranger'))
+        response = self.client.get(self.url, {'since': timezone.now().isoformat()})
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=2)
+        self.card = self.board.board_cards.first()
+        get_accessible_board_ids(self.user)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_board_costs_one_query(self):
+        url = f'/api/boards/{self.board.id}/'
+        etag = self.etag(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_child_writes_change_the_etag(self):
+        url = f'/api/boards/{self.board.id}/'
+        writes = [
+            lambda: Comment.objects.create(card=self.card, author=self.user, content='New'),
+            lambda: ChecklistItem.objects.filter(checklist__card=self.card).first().save(),
+            lambda: self.card.members.add(User.objects.create_user(username='helper')),
+            lambda: self.card.labels.first().delete(),
+            lambda: self.client.post('/api/cards/bulk_move/', {'moves': [
+                {'card': self.card.id, 'list': self.card.list_id, 'position': 2}
+            ]}, format='json'),
+        ]
+        etag = self.etag(url)
+        for write in writes:
+            write()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_card_etag_follows_its_board(self):
+        url = f'/api/cards/{self.card.id}/'
+        etag = self.etag(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.card.checklists.first().items.create(title='Another')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_is_not_shared_with_strangers(self):
+        url = f'/api/boards/{self.board.id}/'
+        etag = self.etag(url)
+        self.client.force_authenticate(User.objects.create_user(username='stranger'))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+
+class RenderCacheTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=3)
+        self.url = f'/api/boards/{self.board.id}/'
+        get_accessible_board_ids(self.user)
+
+    def test_repeat_reads_come_from_the_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(cache_stats()['hits'], 1)
+        self.assertEqual(cache_stats()['misses'], 1)
+
+    def test_writes_to_nested_objects_invalidate(self):
+        card = self.board.board_cards.first()
+
+        def complete():
+            card.card_date.is_complete = True
+            card.card_date.save()
+
+        writes = [
+            complete,
+            lambda: CardLocation.objects.get(card=card).delete(),
+            lambda: Attachment.objects.filter(card=card).first().delete(),
+            lambda: CardMember.objects.filter(card=card).delete(),
+            lambda: BoardMember.objects.create(board=self.board, user=User.objects.create_user(username='new')),
+        ]
+        previous = self.client.get(self.url).content
+        for write in writes:
+            write()
+            content = self.client.get(self.url).content
+            self.assertTrue(content != previous)
+            previous = content
+        self.assertEqual(cache_stats()['hits'], 0)
+
+    def test_hosts_are_cached_separately(self):
+        self.client.get(self.url)
+        self.client.get(self.url, HTTP_HOST='localhost')
+        self.assertEqual(cache_stats()['misses'], 2)
+
+    def test_stats_are_admin_only(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get('/api/boards/cache_stats/').status_code, 403)
+        self.client.force_authenticate(User.objects.create_superuser(username='admin'))
+        response = self.client.get('/api/boards/cache_stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['misses'], 1)
+
+
+class BoardSummaryAndFieldsTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.boards = [build_board(self.user, lists=3, cards_per_list=4) for _ in range(3)]
+        self.board = self.boards[0]
+        for i in range(7):
+            BoardMember.objects.create(board=self.board, user=User.objects.create_user(username=f'member{i}'))
+        get_accessible_board_ids(self.user)
+
+    def test_summary_view_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/boards/', {'view': 'summary'})
+        boards = {board['id']: board for board in response.json()['results']}
+        summary = boards[self.board.id]
+        self.assertEqual(summary['list_count'], 3)
+        self.assertEqual(summary['card_count'], 12)
+        self.assertEqual(summary['member_count'], 8)
+        self.assertEqual(len(summary['members']), BoardSummarySerializer.MEMBER_PREVIEW)
+        self.assertNotIn('lists', summary)
+
+    def test_top_level_fields_skip_the_tree(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/boards/', {'fields': 'id,title'})
+        for board in response.json()['results']:
+            self.assertEqual(set(board), {'id', 'title'})
+
+    def test_nested_fields_load_only_what_is_rendered(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                f'/api/boards/{self.board.id}/', {'fields': 'id,lists.title,lists.cards.title'}
+            )
+        data = response.json()
+        self.assertEqual(set(data), {'id', 'lists'})
+        self.assertEqual(set(data['lists'][0]), {'title', 'cards'})
+        self.assertEqual(set(data['lists'][0]['cards'][0]), {'title'})
+
+    def test_expand_brings_back_a_whole_relation(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/', {'fields': 'id', 'expand': 'lists'})
+        card = response.json()['lists'][0]['cards'][0]
+        self.assertIn('comments', card)
+        self.assertEqual(len(card['members']), 1)
+
+    def test_card_fields_and_etags_per_representation(self):
+        card = self.board.board_cards.first()
+        response = self.client.get(f'/api/cards/{card.id}/', {'fields': 'id,title,labels'})
+        self.assertEqual(set(response.json()), {'id', 'title', 'labels'})
+
+        url = f'/api/boards/{self.board.id}/'
+        full = self.client.get(url)
+        summary = self.client.get(url, {'view': 'summary'})
+        self.assertNotEqual(full['ETag'], summary['ETag'])
+        self.assertIn('card_count', summary.json())
+        self.assertIn('lists', self.client.get(url).json())
+
+
+class FastRenderTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=3, cards_per_list=4)
+        card = self.board.board_cards.first()
+        # Cards without dates or a location, and a second member and comment
+        Card.objects.create(title='Bare', description='No extras', list=card.list, board=self.board, order=9)
+        other = User.objects.create_user(username='other', email='other@example.com', first_name='Ann')
+        BoardMember.objects.create(board=self.board, user=other)
+        CardMember.objects.create(card=card, user=other)
+        Comment.objects.create(card=card, author=other, content='Later')
+        ChecklistItem.objects.create(title='First', checklist=card.checklists.first(), order=0.5)
+
+    def render(self, fast):
+        caches[settings.BOARD_RENDER_CACHE].clear()
+        with override_settings(FAST_BOARD_RENDER=fast):
+            response = self.client.get(f'/api/boards/{self.board.id}/')
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_output_is_byte_identical_to_the_serializer(self):
+        self.assertEqual(self.render(fast=True), self.render(fast=False))
+
+    def test_field_selection_still_uses_the_serializer(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/', {'fields': 'id,title'})
+        self.assertEqual(set(response.json()), {'id', 'title'})
+
+
+class SearchTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        BoardMember.objects.create(board=self.board, user=self.user)
+        board_list = List.objects.create(title='Todo', board=self.board)
+        self.card = Card.objects.create(
+            title='Launch checklist', description='Draft the <b>plan</b> for the beta',
+            list=board_list, board=self.board
+        )
+        self.comment = Comment.objects.create(card=self.card, author=self.user, content='Launch moved to Friday')
+        checklist = Checklist.objects.create(title='Steps', card=self.card)
+        self.item = ChecklistItem.objects.create(title='Book the launch venue', checklist=checklist)
+
+        stranger = User.objects.create_user(username='stranger')
+        hidden = Board.objects.create(title='Hidden', owner=stranger)
+        Card.objects.create(
+            title='Launch secret', list=List.objects.create(title='x', board=hidden), board=hidden
+        )
+
+    def search(self, q, **params):
+        response = self.client.get('/api/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_finds_cards_comments_and_items_on_own_boards(self):
+        results = self.search('launch')
+        self.assertEqual(
+            {(r['type'], r['id']) for r in results},
+            {('card', self.card.id), ('comment', self.comment.id), ('checklist_item', self.item.id)}
+        )
+        # Title matches outrank body text
+        self.assertEqual(results[-1]['type'], 'comment')
+        card = next(r for r in results if r['type'] == 'card')
+        self.assertEqual(card['title'], '<mark>Launch</mark> checklist')
+
+    def test_prefix_stemming_and_escaped_snippets(self):
+        [result] = self.search('drafting pla')
+        self.assertEqual(result['id'], self.card.id)
+        self.assertIn('&lt;b&gt;<mark>plan</mark>&lt;/b&gt;', result['snippet'])
+
+    def test_index_follows_writes(self):
+        self.card.title = 'Renamed'
+        self.card.save()
+        self.assertEqual([r['type'] for r in self.search('renamed')], ['card'])
+
+        self.comment.delete()
+        self.assertNotIn('comment', [r['type'] for r in self.search('launch')])
+
+        self.card.delete()
+        self.assertEqual(self.search('launch'), [])
+        self.assertFalse(SearchEntry.objects.filter(board_id=self.board.id).exists())
+
+    def test_rebuild_command_and_validation(self):
+        SearchEntry.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('launch')), 3)
+
+        self.assertEqual(self.client.get('/api/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'limit': 'many'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'board': 999}).status_code, 404)
+        self.assertEqual(len(self.search('launch', board=self.board.id, limit=1)), 1)
+
+
+class CardFilterTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = User.objects.create_user(username='other')
+        self.boards = [build_board(self.user, lists=1, cards_per_list=3) for _ in range(2)]
+        cards = list(Card.objects.filter(board__in=self.boards).order_by('id'))
+        self.overdue, self.done, self.later = cards[0], cards[1], cards[3]
+        past = timezone.now() - timedelta(days=1)
+        CardDate.objects.filter(card=self.overdue).update(due_date=past)
+        CardDate.objects.filter(card=self.done).update(due_date=past, is_complete=True)
+        CardDate.objects.filter(card=self.later).update(due_date=timezone.now() + timedelta(days=1))
+        CardMember.objects.filter(card=cards[2]).update(user=self.other)
+        Label.objects.filter(card=self.later).update(title='Urgent')
+        ChecklistItem.objects.filter(checklist__card__in=cards[1:]).update(is_completed=True)
+
+        stranger = User.objects.create_user(username='stranger')
+        build_board(stranger, lists=1, cards_per_list=1)
+
+    def ids(self, **params):
+        response = self.client.get('/api/cards/', params)
+        self.assertEqual(response.status_code, 200)
+        return {card['id'] for card in response.json()}
+
+    def test_my_overdue_cards_across_boards_is_one_query(self):
+        get_accessible_board_ids(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            ids = self.ids(member='me', due_before='now', due_complete='false')
+        self.assertEqual(ids, {self.overdue.id})
+        self.assertEqual(sum('boards_carddate' in q['sql'] for q in queries), 1)
+
+    def test_filters_combine(self):
+        self.assertEqual(self.ids(label='Urgent,Nope'), {self.later.id})
+        self.assertEqual(self.ids(has_checklist_incomplete='true'), {self.overdue.id})
+        self.assertEqual(len(self.ids(has_checklist_incomplete='false')), 5)
+        self.assertEqual(len(self.ids(member=self.other.id)), 1)
+        board_list = self.boards[1].lists.get()
+        self.assertEqual(self.ids(list=board_list.id, due_before=timezone.now().date().isoformat()), set())
+        self.assertEqual(self.ids(list=board_list.id, due_before='2999-01-01'), {self.later.id})
+        self.assertEqual(len(self.ids(board_id=self.boards[0].id)), 3)
+
+    def test_rejects_unknown_and_malformed_filters(self):
+        for params in ({'title': 'x'}, {'due_before': 'soon'}, {'due_complete': 'maybe'}, {'list': 'a'}):
+            response = self.client.get('/api/cards/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
+
+
+class BulkWriteTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user, lists=2, cards_per_list=1)
+        self.lists = list(self.board.lists.order_by('id'))
+        stranger = User.objects.create_user(username='stranger')
+        self.foreign_list = build_board(stranger, lists=1, cards_per_list=1).lists.get()
+        get_accessible_board_ids(self.user)
+
+    def test_create_cards_in_a_fixed_number_of_queries(self):
+        items = [
+            {'title': f'Imported {i}', 'list': self.lists[i % 2].id}
+            for i in range(1000)
+        ]
+        version = self.board.version
+        with mock.patch('boards.bulk.broadcast') as broadcast_mock:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/cards/bulk/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 1000)
+        self.assertLess(len(queries), 30)
+
+        # Appended after the existing card, in request order
+        orders = list(Card.objects.filter(list=self.lists[0]).values_list('title', 'order'))
+        self.assertEqual(orders[0][0], 'Card 0')
+        self.assertEqual([title for title, _ in orders[1:3]], ['Imported 0', 'Imported 2'])
+        self.assertEqual(len({order for _, order in orders}), 501)
+
+        self.board.refresh_from_db()
+        self.assertGreater(self.board.version, version)
+        broadcast_mock.assert_called_once()
+        self.assertEqual(broadcast_mock.call_args.args[1], 'cards.created')
+        self.assertEqual(len(self.client.get('/api/search/', {'q': 'imported'}).json()['results']), 20)
+
+    def test_invalid_items_are_reported_and_nothing_is_written(self):
+        items = [
+            {'title': 'Fine', 'list': self.lists[0].id},
+            {'list': self.lists[0].id},
+            {'title': 'Not mine', 'list': self.foreign_list.id},
+        ]
+        response = self.client.post('/api/cards/bulk/', {'items': items}, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2])
+        self.assertIn('title', errors[0]['errors'])
+        self.assertIn('list', errors[1]['errors'])
+        self.assertFalse(Card.objects.filter(title='Fine').exists())
+
+        response = self.client.post('/api/cards/bulk/', {'items': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_and_delete(self):
+        cards = list(Card.objects.filter(board=self.board).order_by('id'))
+        response = self.client.patch('/api/cards/bulk/', {'items': [
+            {'id': cards[0].id, 'title': 'Renamed'},
+            {'id': cards[1].id, 'description': 'Details'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Card.objects.get(pk=cards[0].id).title, 'Renamed')
+        self.assertEqual(Card.objects.get(pk=cards[1].id).description, 'Details')
+
+        response = self.client.patch('/api/cards/bulk/', {'items': [
+            {'id': cards[0].id, 'list': self.lists[1].id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('list', response.json()['errors'][0]['errors'])
+
+        foreign_card = self.foreign_list.cards.get()
+        response = self.client.delete('/api/cards/bulk/', {'ids': [cards[0].id, foreign_card.id]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['ids'], [foreign_card.id])
+
+        response = self.client.delete('/api/cards/bulk/', {'ids': [card.id for card in cards]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Card.objects.filter(board=self.board).exists())
+
+    def test_delete_cards_in_a_fixed_number_of_queries(self):
+        other_board = build_board(self.user, lists=1, cards_per_list=1)
+        Card.objects.bulk_create(
+            Card(title=f'Doomed {i}', list=self.lists[i % 2], board=self.board, order=i) for i in range(1000)
+        )
+        reindex(Card, Card.objects.filter(title__startswith='Doomed').values_list('id', flat=True))
+        ids = list(Card.objects.filter(board__in=[self.board, other_board]).values_list('id', flat=True))
+        self.board.refresh_from_db()
+        version = self.board.version
+        get_accessible_board_ids(self.user)
+
+        with mock.patch('boards.bulk.broadcast') as broadcast_mock:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete('/api/cards/bulk/', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # The cascade collects and deletes in chunks; nothing is done per card
+        self.assertLess(len(queries), 100)
+        self.assertFalse(Card.objects.filter(pk__in=ids).exists())
+
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.version, version + 1)
+        self.assertEqual(Tombstone.objects.filter(model='cards', object_id__in=ids).count(), len(ids))
+        # Cascaded children are implied by their card's tombstone
+        self.assertEqual(Tombstone.objects.count(), len(ids))
+        self.assertEqual(
+            sorted((call.args[0], call.args[1], len(call.args[2])) for call in broadcast_mock.call_args_list),
+            sorted([(self.board.id, 'cards.deleted', 1002), (other_board.id, 'cards.deleted', 1)])
+        )
+        self.assertFalse(SearchEntry.objects.filter(card_id__in=ids).exists())
+
+    def test_delete_checklist_items_unindexes_them(self):
+        item = ChecklistItem.objects.filter(checklist__card__board=self.board).first()
+        item.title = 'Findable step'
+        item.save()
+        response = self.client.delete('/api/checklist-items/bulk/', {'ids': [item.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'findable'}).json()['results'], [])
+        self.assertTrue(Tombstone.objects.filter(model='checklist_items', object_id=item.id).exists())
+
+    def test_labels_and_checklist_items(self):
+        card = Card.objects.filter(board=self.board).first()
+        checklist = card.checklists.get()
+        response = self.client.post('/api/labels/bulk/', {'items': [
+            {'title': 'Bug', 'color': 'red', 'card': card.id},
+            {'title': 'Later', 'card': card.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(card.labels.count(), 3)
+
+        response = self.client.post('/api/checklist-items/bulk/', {'items': [
+            {'title': 'Second', 'checklist': checklist.id},
+            {'title': 'Third', 'checklist': checklist.id, 'is_completed': True},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(checklist.items.values_list('title', flat=True)), ['Item', 'Second', 'Third']
+        )
+
+        item_ids = [item['id'] for item in response.json()['created']]
+        response = self.client.patch('/api/checklist-items/bulk/', {'items': [
+            {'id': item_id, 'is_completed': True} for item_id in item_ids
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(checklist.items.filter(is_completed=True).count(), 2)
+
+
+
+def trello_export(cards=6):
+    """A small Trello export; keys are not in dependency order, like real ones"""
+    return {
+        'id': 'b1',
+        'name': 'From Trello',
+        'prefs': {'backgroundColor': '#519839'},
+        'actions': [
+            {'id': f'a{i}', 'type': 'commentCard', 'date': '2020-01-0%dT10:00:00.000Z' % (i + 1),
+             'memberCreator': {'id': 'm2', 'fullName': 'Ann Other', 'username': 'ann'},
+             'data': {'text': f'Comment {i}', 'card': {'id': f'c{i}'}}}
+            for i in range(3)
+        ] + [{'id': 'a9', 'type': 'updateCard', 'data': {'card': {'id': 'c0'}}}],
+        'cards': [
+            {'id': f'c{i}', 'name': f'Card {i}', 'desc': 'Imported', 'idList': f'l{i % 2}', 'pos': 100 - i,
+             'closed': i == 5, 'idLabels': ['lb1'], 'idMembers': ['m1'],
+             'due': '2030-01-01T00:00:00.000Z' if i == 0 else None, 'dueComplete': False}
+            for i in range(cards)
+        ],
+        'labels': [{'id': 'lb1', 'name': 'Bug', 'color': 'red'}],
+        'lists': [
+            {'id': 'l0', 'name': 'Todo', 'pos': 1},
+            {'id': 'l1', 'name': 'Done', 'pos': 2},
+            {'id': 'l2', 'name': 'Archived', 'pos': 3, 'closed': True},
+        ],
+        'checklists': [
+            {'id': 'k1', 'name': 'Steps', 'idCard': 'c0', 'checkItems': [
+                {'id': 'i1', 'name': 'One', 'state': 'complete', 'pos': 1},
+                {'id': 'i2', 'name': 'Two', 'state': 'incomplete', 'pos': 2},
+            ]},
+        ],
+        'members': [{'id': 'm1', 'username': 'owner', 'fullName': 'Owner'}],
+    }
+
+
+class TrelloImportTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.path = f'{self.tempdir.name}/export.json'
+        with open(self.path, 'w') as f:
+            json.dump(trello_export(), f)
+
+    def test_command_imports_the_whole_board(self):
+        out = StringIO()
+        call_command('import_trello', self.path, '--user', 'owner', '--map-members', stdout=out)
+        board = Board.objects.get(title='From Trello')
+        self.assertEqual(board.owner, self.user)
+        self.assertEqual(board.background, '#519839')
+        self.assertEqual(list(board.lists.values_list('title', flat=True)), ['Todo', 'Done'])
+        # Trello positions become the order
+        self.assertEqual(
+            list(board.lists.get(title='Todo').cards.values_list('title', flat=True)),
+            ['Card 4', 'Card 2', 'Card 0']
+        )
+        self.assertEqual(board.board_cards.count(), 5)
+        card = board.board_cards.get(title='Card 0')
+        self.assertEqual(card.labels.get().title, 'Bug')
+        self.assertEqual(card.card_members.get().user, self.user)
+        self.assertEqual(card.card_date.due_date.year, 2030)
+        self.assertEqual(
+            list(card.checklists.get().items.values_list('title', 'is_completed')),
+            [('One', True), ('Two', False)]
+        )
+        comment = card.comments.get()
+        self.assertEqual(comment.content, 'Ann Other: Comment 0')
+        self.assertEqual(comment.created_at.day, 1)
+        self.assertIn('Imported board', out.getvalue())
+        self.assertEqual(self.client.get(f'/api/boards/{board.id}/').status_code, 200)
+        self.assertEqual(len(self.client.get('/api/search/', {'q': 'card'}).json()['results']), 5)
+
+    def test_interrupted_import_resumes_without_duplicates(self):
+        original = trello.TrelloImporter.import_cards
+        calls = []
+
+        def fail_on_second_batch(importer, items):
+            calls.append(len(items))
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return original(importer, items)
+
+        with mock.patch.object(trello, 'BATCH_SIZE', 2), \
+                mock.patch.object(trello.TrelloImporter, 'import_cards', fail_on_second_batch):
+            with self.assertRaises(Exception):
+                call_command('import_trello', self.path, '--user', 'owner', stdout=StringIO())
+        board_import = BoardImport.objects.get()
+        self.assertEqual(board_import.status, BoardImport.STATUS_FAILED)
+        self.assertEqual((board_import.phase, board_import.position), ('cards', 2))
+
+        with mock.patch.object(trello, 'BATCH_SIZE', 2):
+            call_command('import_trello', '--resume', board_import.id, stdout=StringIO())
+        board_import.refresh_from_db()
+        self.assertEqual(board_import.status, BoardImport.STATUS_DONE)
+        self.assertEqual(Board.objects.filter(title='From Trello').count(), 1)
+        self.assertEqual(Card.objects.filter(board=board_import.board).count(), 5)
+        self.assertEqual(board_import.counts['cards'], 5)
+        self.assertEqual(ImportedObject.objects.filter(model='card').count(), 5)
+
+    def test_upload_is_queued_and_reports_progress(self):
+        with override_settings(MEDIA_ROOT=self.tempdir.name), \
+                mock.patch('boards.jobs.get_executor') as get_executor, \
+                self.captureOnCommitCallbacks(execute=True):
+            with open(self.path, 'rb') as f:
+                upload = SimpleUploadedFile('export.json', f.read(), content_type='application/json')
+            response = self.client.post('/api/boards/import_trello/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        import_id = response.json()['id']
+        get_executor.return_value.submit.assert_called_once()
+
+        with override_settings(MEDIA_ROOT=self.tempdir.name):
+            trello.run_import(import_id)
+        data = self.client.get(f'/api/board-imports/{import_id}/').json()
+        self.assertEqual((data['status'], data['progress']), ('done', 1.0))
+        self.assertEqual(data['counts']['comments'], 3)
+        # Members are not matched unless asked
+        board = Board.objects.get(pk=data['board'])
+        self.assertFalse(CardMember.objects.filter(card__board=board).exists())
+
+        self.assertEqual(self.client.post('/api/boards/import_trello/', {}, format='multipart').status_code, 400)
+
+    def test_imports_left_by_a_dead_worker_are_resumed(self):
+        stale_at = timezone.now() - timedelta(seconds=settings.AI_JOB_STALE_AFTER + 1)
+        with override_settings(MEDIA_ROOT=self.tempdir.name):
+            with open(self.path, 'rb') as f:
+                upload = SimpleUploadedFile('export.json', f.read(), content_type='application/json')
+            stale = BoardImport.objects.create(owner=self.user, file=upload)
+            busy = BoardImport.objects.create(owner=self.user, file=stale.file.name)
+            local = BoardImport.objects.create(owner=self.user, source_path=self.path)
+            BoardImport.objects.filter(pk__in=[stale.id, busy.id, local.id]).update(
+                status=BoardImport.STATUS_RUNNING
+            )
+            BoardImport.objects.filter(pk__in=[stale.id, local.id]).update(updated_at=stale_at)
+
+            with mock.patch('boards.jobs._executor', None), \
+                    mock.patch('boards.jobs.ThreadPoolExecutor') as executor_class:
+                jobs.get_executor()
+            executor_class.return_value.submit.assert_called_once_with(jobs._import_in_worker, stale.id)
+
+            BoardImport.objects.filter(pk=stale.id).update(updated_at=stale_at)
+            out = StringIO()
+            call_command('process_ai_jobs', stdout=out)
+        self.assertIn('Resumed 1 board import(s)', out.getvalue())
+        statuses = dict(BoardImport.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[stale.id], BoardImport.STATUS_DONE)
+        # Possibly still running, or resumed with import_trello --resume
+        self.assertEqual(statuses[busy.id], BoardImport.STATUS_RUNNING)
+        self.assertEqual(statuses[local.id], BoardImport.STATUS_RUNNING)
+
+    def test_failed_upload_is_logged(self):
+        board_import = BoardImport.objects.create(owner=self.user, source_path=f'{self.tempdir.name}/missing.json')
+        with self.assertLogs('boards.jobs', level='ERROR') as logs, mock.patch('boards.jobs.connection'):
+            jobs._import_in_worker(board_import.id)
+        self.assertIn(f'Board import {board_import.id} failed', logs.output[0])
+        board_import.refresh_from_db()
+        self.assertEqual(board_import.status, BoardImport.STATUS_FAILED)
+
+    def test_upload_cannot_add_or_impersonate_strangers(self):
+        stranger = User.objects.create_user(username='ann')
+        colleague = User.objects.create_user(username='bob')
+        shared = Board.objects.create(title='Shared', owner=colleague)
+        BoardMember.objects.create(board=shared, user=self.user)
+        export = trello_export()
+        export['members'] += [
+            {'id': 'm2', 'username': 'ann', 'fullName': 'Ann Other'},
+            {'id': 'm3', 'username': 'bob', 'fullName': 'Bob'},
+        ]
+        export['cards'][0]['idMembers'] = ['m1', 'm2', 'm3']
+        export['actions'][1]['memberCreator'] = {'id': 'm3', 'fullName': 'Bob', 'username': 'bob'}
+
+        with override_settings(MEDIA_ROOT=self.tempdir.name), \
+                mock.patch('boards.jobs.get_executor'), self.captureOnCommitCallbacks(execute=True):
+            upload = SimpleUploadedFile('export.json', json.dumps(export).encode(), content_type='application/json')
+            response = self.client.post(
+                '/api/boards/import_trello/', {'file': upload, 'map_members': 'true'}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 202)
+        with override_settings(MEDIA_ROOT=self.tempdir.name):
+            trello.run_import(response.json()['id'])
+
+        board = Board.objects.get(title='From Trello')
+        # Only users who already share a board with the uploader are added
+        self.assertEqual(
+            set(board.board_members.values_list('user__username', flat=True)), {'owner', 'bob'}
+        )
+        self.assertFalse(CardMember.objects.filter(card__board=board, user=stranger).exists())
+        # and nobody else is set as a comment author
+        comments = Comment.objects.filter(card__board=board).order_by('content')
+        self.assertEqual({comment.author_id for comment in comments}, {self.user.id})
+        self.assertEqual(
+            [comment.content for comment in comments],
+            ['Ann Other: Comment 0', 'Ann Other: Comment 2', 'Bob: Comment 1']
+        )
+
+
+
+class BoardExportTests(BoardsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.board = build_board(self.user)
+
+    def export(self, export_format, board=None):
+        response = self.client.get(f'/api/boards/{(board or self.board).id}/export/', {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson_has_one_record_per_line(self):
+        response, content = self.export('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="board-{self.board.id}.ndjson"')
+        records = [json.loads(line) for line in content.splitlines()]
+        types = [record['type'] for record in records]
+        self.assertEqual(types[:4], ['board', 'board_member', 'list', 'list'])
+        for record_type in ('card', 'label', 'card_member', 'checklist', 'checklist_item', 'comment', 'attachment'):
+            self.assertEqual(types.count(record_type), 4)
+        card = next(record for record in records if record['type'] == 'card')
+        self.assertEqual(card['place_name'], 'Office')
+        self.assertIn(card['list'], [record['id'] for record in records if record['type'] == 'list'])
+        attachment = next(record for record in records if record['type'] == 'attachment')
+        self.assertEqual(attachment['file'], 'attachments/spec.pdf')
+
+    def test_json_is_one_document(self):
+        response, content = self.export('json')
+        data = json.loads(content)
+        self.assertEqual(data['board']['owner'], 'owner')
+        self.assertEqual(len(data['lists']), 2)
+        self.assertEqual([card['title'] for card in data['cards']], ['Card 0', 'Card 1'] * 2)
+        self.assertEqual(data['comments'][0]['author'], 'owner')
+        # No format defaults to JSON too
+        self.assertEqual(self.client.get(f'/api/boards/{self.board.id}/export/')['Content-Type'],
+                         'application/json; charset=utf-8')
+
+    def test_csv_has_a_row_per_record(self):
+        response, content = self.export('csv')
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual(list(rows[0]), export.CSV_COLUMNS)
+        self.assertEqual(len(rows), 32)
+        item = next(row for row in rows if row['type'] == 'checklist_item')
+        self.assertEqual((item['title'], item['is_completed'], item['due_date']), ('Item', 'false', ''))
+
+    def test_query_count_does_not_grow_with_the_board(self):
+        large = build_board(self.user, lists=5, cards_per_list=20)
+        counts = []
+        for board in (self.board, large):
+            get_accessible_board_ids(self.user)
+            with CaptureQueriesContext(connection) as queries:
+                self.export('ndjson', board)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_requires_board_access_and_a_known_format(self):
+        other = build_board(User.objects.create_user(username='other', password='secret'))
+        self.assertEqual(self.client.get(f'/api/boards/{other.id}/export/').status_code, 404)
+        response = self.client.get(f'/api/boards/{other.id}/export/', {'format': 'csv'})
+        self.assertEqual((response.status_code, response['Content-Type']), (404, 'text/csv; charset=utf-8'))
+        self.assertEqual(self.client.get(f'/api/boards/{self.board.id}/export/', {'format': 'xml'}).status_code, 404)
+
+    async def test_streams_on_the_async_handler(self):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await AsyncClient().get(
+            f'/api/boards/{self.board.id}/export/', {'format': 'ndjson'},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 32)
@@ -0,0 +1,304 @@
+"""
+Import of Trello board exports (the JSON from Menu > Print and export).
+
+The export is read with JSONObjectStream, so memory use does not grow
+with its size. Trello does not fix the order of the top-level keys, so the
+import runs in phases (board, lists, cards, checklists, comments), each a
+pass over the file that reads one array. Every batch is written with
+bulk_create in its own transaction together with the import's checkpoint
+and the Trello id -> object mapping the later phases resolve references
+with. An interrupted import resumes from its last committed batch.
+
+Trello members are only matched to existing users by username when the
+import asks for it. An uploaded export is written by whoever uploads it,
+so it is only matched to users who already share a board with them, and
+its comments are always attributed to the importing user; only a local
+file imported with the management command sets other users as comment
+authors. Other comments are prefixed with the Trello author's name.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from .access import get_accessible_board_ids
+from .jsonstream import JSONObjectStream
+from .models import (
+    Board, BoardImport, BoardMember, Card, CardDate, CardMember, Checklist,
+    ChecklistItem, Comment, ImportedObject, Label, List
+)
+from .search import reindex
+from .versions import bump_board_versions
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+# Phase -> top-level key it reads; 'board' reads several small keys at once
+PHASES = [
+    ('board', None),
+    ('lists', 'lists'),
+    ('cards', 'cards'),
+    ('checklists', 'checklists'),
+    ('comments', 'actions'),
+]
+
+def _text(value, length=None):
+    value = value if isinstance(value, str) else ''
+    return value[:length] if length else value
+
+def _order(item):
+    try:
+        return float(item.get('pos') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _date(value):
+    return parse_datetime(value) if isinstance(value, str) else None
+
+class TrelloImporter:
+    def __init__(self, board_import, progress=None):
+        self.job = board_import
+        self.progress = progress
+
+    def open(self):
+        if self.job.source_path:
+            return open(self.job.source_path, 'rb')
+        self.job.file.open('rb')
+        return self.job.file
+
+    def run(self):
+        job = self.job
+        if job.status == BoardImport.STATUS_DONE:
+            return job
+        job.status = BoardImport.STATUS_RUNNING
+        job.error = None
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        try:
+            names = [name for name, _ in PHASES]
+            start = names.index(job.phase) if job.phase else 0
+            for name, key in PHASES[start:]:
+                if job.phase != name:
+                    job.phase = name
+                    job.position = 0
+                    job.bytes_read = 0
+                    job.save(update_fields=['phase', 'position', 'bytes_read', 'updated_at'])
+                if key is None:
+                    self.import_board()
+                else:
+                    self.run_phase(key, getattr(self, f'import_{name}'))
+        except Exception as e:
+            job.status = BoardImport.STATUS_FAILED
+            job.error = str(e) or type(e).__name__
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            raise
+        job.status = BoardImport.STATUS_DONE
+        job.phase = ''
+        job.position = 0
+        job.save(update_fields=['status', 'phase', 'position', 'updated_at'])
+        bump_board_versions(job.board_id)
+        return job
+
+    def report(self):
+        if self.progress:
+            self.progress(self.job)
+
+    def import_board(self):
+        """Create the board and read the label definitions and members"""
+        job = self.job
+        title, background, labels, members = 'Imported board', None, {}, []
+        with self.open() as fp:
+            stream = JSONObjectStream(fp)
+            for key, value in stream.members():
+                if key == 'name':
+                    title = _text(value, 200) or title
+                elif key == 'prefs' and isinstance(value, dict):
+                    background = _text(value.get('backgroundColor'), 50) or None
+                elif key == 'labels':
+                    labels = {
+                        label['id']: [_text(label.get('name'), 100), _text(label.get('color'), 50)]
+                        for label in value if isinstance(label, dict) and 'id' in label
+                    }
+                elif key == 'members':
+                    members = [member for member in value if isinstance(member, dict) and 'id' in member]
+            job.bytes_total = stream.bytes_read
+
+        with transaction.atomic():
+            if job.board_id is None:
+                job.board = Board.objects.create(
+                    title=title, owner=job.owner, **({'background': background} if background else {})
+                )
+                BoardMember.objects.create(board=job.board, user=job.owner)
+            job.labels = labels
+            job.members = {}
+            if job.map_members:
+                users = User.objects.filter(username__in=[_text(member.get('username')) for member in members])
+                if not job.source_path:
+                    shared = get_accessible_board_ids(job.owner) - {job.board_id}
+                    users = users.filter(
+                        Q(owned_boards__in=shared) | Q(member_boards__board__in=shared)
+                    ).distinct()
+                users = dict(users.values_list('username', 'id'))
+                for member in members:
+                    user_id = users.get(member.get('username'))
+                    if user_id is not None:
+                        job.members[member['id']] = user_id
+                        BoardMember.objects.get_or_create(board=job.board, user_id=user_id)
+            job.counts = {'labels': len(labels), 'members': len(job.members)}
+            job.bytes_read = job.bytes_total
+            job.save()
+        self.report()
+
+    def run_phase(self, key, handler):
+        job = self.job
+        skip = job.position
+        batch = []
+        with self.open() as fp:
+            stream = JSONObjectStream(fp)
+            for name, value in stream.members():
+                if name != key:
+                    continue
+                if not hasattr(value, '__next__'):
+                    # Not an array
+                    break
+                for index, item in enumerate(value):
+                    if index < skip:
+                        continue
+                    batch.append(item)
+                    if len(batch) == BATCH_SIZE:
+                        self.commit(handler, batch, stream.bytes_read)
+                        batch = []
+                break
+            self.commit(handler, batch, stream.bytes_read)
+
+    def commit(self, handler, batch, bytes_read):
+        job = self.job
+        with transaction.atomic():
+            if batch:
+                handler([item for item in batch if isinstance(item, dict) and isinstance(item.get('id'), str)])
+            job.position += len(batch)
+            job.bytes_read = bytes_read
+            job.save(update_fields=['position', 'bytes_read', 'counts', 'updated_at'])
+        self.report()
+
+    def count(self, name, number):
+        self.job.counts[name] = self.job.counts.get(name, 0) + number
+
+    def remember(self, model, items, objects):
+        ImportedObject.objects.bulk_create([
+            ImportedObject(board_import=self.job, source_id=item['id'], model=model, object_id=obj.id)
+            for item, obj in zip(items, objects)
+        ])
+
+    def lookup(self, source_ids):
+        return dict(ImportedObject.objects.filter(
+            board_import=self.job, source_id__in=set(source_ids)
+        ).values_list('source_id', 'object_id'))
+
+    def import_lists(self, items):
+        # Dragonlist has no archive, so closed lists and cards are left out
+        items = [item for item in items if not item.get('closed')]
+        lists = List.objects.bulk_create([
+            List(title=_text(item.get('name'), 200), board_id=self.job.board_id, order=_order(item))
+            for item in items
+        ])
+        self.remember('list', items, lists)
+        self.count('lists', len(lists))
+
+    def import_cards(self, items):
+        list_ids = self.lookup(item.get('idList') for item in items)
+        items = [item for item in items if not item.get('closed') and item.get('idList') in list_ids]
+        cards = Card.objects.bulk_create([
+            Card(
+                title=_text(item.get('name'), 200),
+                description=_text(item.get('desc')),
+                list_id=list_ids[item['idList']],
+                board_id=self.job.board_id,
+                order=_order(item),
+            )
+            for item in items
+        ])
+        self.remember('card', items, cards)
+
+        labels, members, dates = [], [], []
+        for item, card in zip(items, cards):
+            for label_id in item.get('idLabels') or []:
+                if label_id in self.job.labels:
+                    name, color = self.job.labels[label_id]
+                    labels.append(Label(title=name or color, color=color, card=card))
+            for member_id in item.get('idMembers') or []:
+                if member_id in self.job.members:
+                    members.append(CardMember(card=card, user_id=self.job.members[member_id]))
+            if item.get('due') or item.get('start'):
+                dates.append(CardDate(
+                    card=card,
+                    start_date=_date(item.get('start')),
+                    due_date=_date(item.get('due')),
+                    is_complete=bool(item.get('dueComplete')),
+                ))
+        Label.objects.bulk_create(labels)
+        CardMember.objects.bulk_create(members, ignore_conflicts=True)
+        CardDate.objects.bulk_create(dates)
+        reindex(Card, [card.id for card in cards])
+        self.count('cards', len(cards))
+
+    def import_checklists(self, items):
+        card_ids = self.lookup(item.get('idCard') for item in items)
+        items = [item for item in items if item.get('idCard') in card_ids]
+        checklists = Checklist.objects.bulk_create([
+            Checklist(title=_text(item.get('name'), 255), card_id=card_ids[item['idCard']])
+            for item in items
+        ])
+        self.remember('checklist', items, checklists)
+        checklist_items = ChecklistItem.objects.bulk_create([
+            ChecklistItem(
+                title=_text(check_item.get('name'), 255),
+                is_completed=check_item.get('state') == 'complete',
+                order=_order(check_item),
+                checklist=checklist,
+            )
+            for item, checklist in zip(items, checklists)
+            for check_item in item.get('checkItems') or []
+            if isinstance(check_item, dict)
+        ])
+        reindex(ChecklistItem, [item.id for item in checklist_items])
+        self.count('checklists', len(checklists))
+        self.count('checklist_items', len(checklist_items))
+
+    def import_comments(self, actions):
+        actions = [
+            action for action in actions
+            if action.get('type') == 'commentCard' and isinstance(action.get('data'), dict)
+        ]
+        card_ids = self.lookup((action['data'].get('card') or {}).get('id') for action in actions)
+        comments, dates = [], []
+        for action in actions:
+            card_id = card_ids.get((action['data'].get('card') or {}).get('id'))
+            if card_id is None:
+                continue
+            creator = action.get('memberCreator') or {}
+            author_id = None
+            if self.job.source_path:
+                author_id = self.job.members.get(creator.get('id') or action.get('idMemberCreator'))
+            content = _text(action['data'].get('text'))
+            if author_id is None:
+                author_id = self.job.owner_id
+                name = _text(creator.get('fullName')) or _text(creator.get('username'))
+                if name:
+                    content = f'{name}: {content}'
+            comments.append(Comment(card_id=card_id, author_id=author_id, content=content))
+            dates.append(_date(action.get('date')))
+        comments = Comment.objects.bulk_create(comments)
+
+        # Keep Trello's timestamps; auto_now_add only applies on insert
+        dated = []
+        for comment, date in zip(comments, dates):
+            if date is not None:
+                comment.created_at = comment.updated_at = date
+                dated.append(comment)
+        Comment.objects.bulk_update(dated, ['created_at', 'updated_at'])
+        reindex(Comment, [comment.id for comment in comments])
+        self.count('comments', len(comments))
+
+def run_import(import_id, progress=None):
+    """Run (or resume) an import in the current thread"""
+    return TrelloImporter(BoardImport.objects.get(pk=import_id), progress).run()
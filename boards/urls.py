@@ -6,7 +6,8 @@ from .views import (
     UserViewSet, remove_card_dates,
     add_card_member, remove_card_member, add_card_dates,
     ChecklistItemViewSet, AttachmentViewSet, CardLocationViewSet, CommentViewSet,
-    BoardViewSet
+    BoardViewSet, AIJobViewSet, BoardImportViewSet, optimize_card_description, stream_card_description,
+    optimize_list_descriptions, optimize_board_descriptions, search_view
 )
 
 router = DefaultRouter()
@@ -20,6 +21,8 @@ router.register(r'card-locations', CardLocationViewSet, basename='card-location'
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'boards', BoardViewSet, basename='board')
+router.register(r'ai-jobs', AIJobViewSet, basename='ai-job')
+router.register(r'board-imports', BoardImportViewSet, basename='board-import')
 urlpatterns = [
     path('', include(router.urls)),
     path('cards/<int:card_pk>/members/add_member/', add_card_member, name='add-card-member'),
@@ -34,6 +37,13 @@ urlpatterns = [
     path('checklist-items/', ChecklistItemViewSet.as_view({'get': 'list'}), name='get-checklist-items'),
     path('cards/<int:card_pk>/comments/', CommentViewSet.as_view({'get': 'list' ,'post': 'create'}), name='get-comments'),
     path('cards/<int:card_pk>/labels/<int:label_pk>/', CardViewSet.as_view({'delete': 'remove_label'}), name='remove-card-label'),
-    path('cards/<int:pk>/optimize-description/', CardViewSet.as_view({'post': 'optimize_description'}), 
+    path('cards/<int:pk>/optimize-description/', optimize_card_description,
          name='card-optimize-description'),
+    path('cards/<int:pk>/optimize-description/stream/', stream_card_description,
+         name='card-optimize-description-stream'),
+    path('lists/<int:pk>/optimize_descriptions/', optimize_list_descriptions,
+         name='list-optimize-descriptions'),
+    path('boards/<int:pk>/optimize_descriptions/', optimize_board_descriptions,
+         name='board-optimize-descriptions'),
+    path('search/', search_view, name='search'),
 ]   
\ No newline at end of file
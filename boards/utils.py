@@ -1,28 +1,162 @@
-from django.db.models import Max
+from django.db import transaction
+from django.db.models import Count, IntegerField, Max, OuterRef, Prefetch, Subquery, prefetch_related_objects
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .access import get_board_id
+from .models import Card, Comment, List
+from .realtime import broadcast, event_prefix
+from .versions import bump_board_versions
+
+# Rank keys are spaced ORDER_STEP apart so that a move can always pick a key
+# between its new neighbours and write a single row. When two neighbours get
+# closer than MIN_ORDER_GAP the whole container is respaced.
+ORDER_STEP = 1024.0
+MIN_ORDER_GAP = 1e-6
 
 def get_next_order(queryset):
-    """Get the next order number for a new item"""
+    """Get the order key for a new item appended at the end"""
     max_order = queryset.aggregate(Max('order'))['order__max']
-    return (max_order or 0) + 1
-
-def reorder_items(queryset, item_id, new_order):
-    """Reorder items when an item is moved"""
-    items = list(queryset.order_by('order'))
-    item_to_move = next(item for item in items if item.id == item_id)
-    old_order = item_to_move.order
-    
-    if old_order < new_order:
-        # Moving down
-        for item in items:
-            if old_order < item.order <= new_order:
-                item.order -= 1
-                item.save()
+    return (max_order or 0) + ORDER_STEP
+
+def rank_between(before, after):
+    """Return a key that sorts between two neighbouring keys (either may be None)"""
+    if before is None and after is None:
+        return ORDER_STEP
+    if before is None:
+        return after - ORDER_STEP
+    if after is None:
+        return before + ORDER_STEP
+    return (before + after) / 2
+
+def order_for_position(queryset, item_id, position):
+    """Get the key that places an item at a 1-based position among the others.
+
+    Only the keys of the two new neighbours are read, so moving an item
+    never touches any other row. If the neighbours are too close together a
+    rebalance of the container is scheduled for when the transaction
+    commits, so call this in the same atomic block that saves the item;
+    outside one the rebalance would run before the save.
+    """
+    position = max(int(position), 1)
+    others = queryset.exclude(pk=item_id).order_by('order', 'id').values_list('order', flat=True)
+    neighbours = list(others[max(position - 2, 0):position])
+
+    if position == 1:
+        before, after = None, (neighbours[0] if neighbours else None)
+    elif len(neighbours) == 2:
+        before, after = neighbours
+    elif neighbours:
+        before, after = neighbours[0], None
     else:
-        # Moving up
-        for item in items:
-            if new_order <= item.order < old_order:
-                item.order += 1
-                item.save()
-    
-    item_to_move.order = new_order
-    item_to_move.save() 
\ No newline at end of file
+        # Past the end of the container
+        before, after = others.aggregate(Max('order'))['order__max'], None
+
+    if before is not None and after is not None and after - before < MIN_ORDER_GAP:
+        schedule_rebalance(queryset)
+    return rank_between(before, after)
+
+def plan_moves(existing_keys, moves):
+    """Allocate rank keys for many moves into one or more containers at once.
+
+    ``existing_keys`` maps a container id to the sorted keys of the items
+    that stay in it, and ``moves`` is a sequence of (item_id, container_id,
+    position) tuples with 1-based positions. Moves into the same container
+    are applied in position order, so each item ends up at the position it
+    asked for. Returns the {item_id: key} plan and the ids of containers
+    whose keys became too dense.
+    """
+    plan = {}
+    dense = set()
+    for item_id, container_id, position in sorted(moves, key=lambda move: move[2]):
+        keys = existing_keys.setdefault(container_id, [])
+        index = min(max(position, 1), len(keys) + 1) - 1
+        before = keys[index - 1] if index > 0 else None
+        after = keys[index] if index < len(keys) else None
+        if before is not None and after is not None and after - before < MIN_ORDER_GAP:
+            dense.add(container_id)
+        key = rank_between(before, after)
+        keys.insert(index, key)
+        plan[item_id] = key
+    return plan, dense
+
+def rebalance_orders(queryset):
+    """Respace the keys of a container evenly, keeping the current order"""
+    items = list(queryset.order_by('order', 'id').only('id', 'order'))
+    # Touch updated_at so delta sync clients pick up the new keys
+    now = timezone.now()
+    for index, item in enumerate(items, start=1):
+        item.order = index * ORDER_STEP
+        item.updated_at = now
+    queryset.model.objects.bulk_update(items, ['order', 'updated_at'], batch_size=500)
+    if items:
+        board_id = get_board_id(items[0])
+        bump_board_versions(board_id)
+        # Clients holding the old keys would misplace later inserts
+        broadcast(board_id, f'{event_prefix(queryset.model)}.rebalanced', {
+            'orders': {item.id: item.order for item in items}
+        })
+
+def schedule_rebalance(queryset):
+    """Rebalance a container once the current transaction has committed"""
+    transaction.on_commit(lambda: rebalance_orders(queryset))
+
+def _wanted(fields, name):
+    """Whether a field spec (see serializers.parse_field_spec) renders name"""
+    return not fields or name in fields
+
+def _nested(fields, name):
+    return fields.get(name) if fields else None
+
+def prefetch_card_tree(queryset, fields=None):
+    """Load everything CardSerializer renders for a set of cards.
+
+    Issues a fixed number of queries per relation, regardless of how many
+    cards are in the queryset. Memberships are resolved separately by the
+    serializers' MemberResolver. With a field spec only the rendered
+    relations are loaded.
+    """
+    select = [relation for name, relation in (('dates', 'card_date'), ('location', 'location'))
+              if _wanted(fields, name)]
+    prefetch = [relation for name, relation in (
+        ('labels', 'labels'),
+        ('attachments', 'attachments'),
+        ('checklists', 'checklists__items'),
+        ('comments', Prefetch('comments', queryset=Comment.objects.select_related('author'))),
+    ) if _wanted(fields, name)]
+    return queryset.select_related(*select).prefetch_related(*prefetch)
+
+def prefetch_list_tree(queryset, fields=None):
+    """Load lists together with their full card tree"""
+    if not _wanted(fields, 'cards'):
+        return queryset
+    return queryset.prefetch_related(
+        Prefetch('cards', queryset=prefetch_card_tree(Card.objects.all(), _nested(fields, 'cards')))
+    )
+
+def _board_prefetch(fields):
+    if not _wanted(fields, 'lists'):
+        return []
+    return [Prefetch('lists', queryset=prefetch_list_tree(List.objects.all(), _nested(fields, 'lists')))]
+
+def prefetch_board_tree(queryset, fields=None):
+    """Load a board and its whole list/card tree in a bounded number of queries"""
+    if _wanted(fields, 'owner'):
+        queryset = queryset.select_related('owner')
+    return queryset.prefetch_related(*_board_prefetch(fields))
+
+def load_board_tree(board, fields=None):
+    """Load the list/card tree onto a board fetched without it"""
+    prefetch_related_objects([board], *_board_prefetch(fields))
+
+def _count_subquery(model, field):
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+def annotate_board_counts(queryset):
+    """Add list_count and card_count as correlated subqueries, without joining the tree"""
+    return queryset.annotate(
+        list_count=_count_subquery(List, 'board'),
+        card_count=_count_subquery(Card, 'board'),
+    )
@@ -0,0 +1,61 @@
+"""
+Per-board version counters.
+
+Board.version is bumped in the same transaction as any write to the board
+or to anything on it, so a response tagged with a version never carries
+older data than that version. Conditional reads compare it against
+If-None-Match and answer 304 without serializing anything.
+"""
+import hashlib
+from django.db.models import F
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from .access import get_board_id
+from .models import Board
+
+def bump_board_versions(*board_ids):
+    board_ids = {board_id for board_id in board_ids if board_id is not None}
+    if board_ids:
+        Board.objects.filter(pk__in=board_ids).update(version=F('version') + 1)
+
+def bump_version_for(instance):
+    """Bump the board a list, card or card child belongs to"""
+    bump_board_versions(get_board_id(instance))
+
+# Query parameters that change what a read returns (summary view, sparse fields)
+REPRESENTATION_PARAMS = ('view', 'fields', 'expand')
+
+def representation_variant(request):
+    """A short stable id for the selected view and fields, '' for the full payload"""
+    params = '&'.join(
+        f'{name}={request.query_params[name]}'
+        for name in REPRESENTATION_PARAMS if request.query_params.get(name)
+    )
+    return hashlib.sha1(params.encode()).hexdigest()[:12] if params else ''
+
+def make_etag(kind, object_id, version, request):
+    # The renderer is part of the representation (JSON vs browsable API)
+    renderer = getattr(request, 'accepted_renderer', None)
+    suffix = f'-{renderer.format}' if renderer else ''
+    variant = representation_variant(request)
+    if variant:
+        suffix += f'-{variant}'
+    return f'"{kind}-{object_id}-v{version}{suffix}"'
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison
+    etags = [tag.removeprefix('W/') for tag in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+def not_modified(etag):
+    return tag_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+def tag_response(response, etag):
+    response['ETag'] = etag
+    # Let clients keep a copy but make them revalidate it on every use
+    response['Cache-Control'] = 'private, no-cache'
+    return response
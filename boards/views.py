@@ -6,26 +6,92 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
 from django.shortcuts import get_object_or_404
-from .models import Board, List, Card, Label, Checklist, ChecklistItem, Attachment, CardLocation, CardMember, CardDate, Comment, BoardMember
+from .models import Board, List, Card, Label, Checklist, ChecklistItem, Attachment, CardLocation, CardMember, CardDate, Comment, BoardMember, AIJob, BoardImport
 from .serializers import (
     BoardSerializer, ListSerializer, CardSerializer, LabelSerializer, 
     ChecklistSerializer, ChecklistItemSerializer, AttachmentSerializer, 
     CardLocationSerializer, RegisterSerializer, LoginSerializer, UserSerializer,
-    CardMemberSerializer, CardDateSerializer, CommentSerializer, BoardMemberSerializer
+    CardMemberSerializer, CardDateSerializer, CommentSerializer, BoardMemberSerializer,
+    AIJobSerializer, BoardImportSerializer, CardDeltaSerializer, BoardSummarySerializer, parse_field_spec
 )
 from .permissions import IsBoardMember, IsListBoardMember, IsCardBoardMember
-from .utils import get_next_order, reorder_items
+from .access import get_accessible_board_ids, has_board_access
+from .pagination import CreatedAtCursorPagination, OrderCursorPagination, UserCursorPagination
+from .utils import (
+    get_next_order, order_for_position, plan_moves, schedule_rebalance, annotate_board_counts,
+    load_board_tree, prefetch_board_tree, prefetch_card_tree, prefetch_list_tree
+)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from .services.ai_service import AIService
+from .services.resilience import AIServiceError
+from .jobs import enqueue_import, enqueue_optimization
+from .realtime import broadcast
+from .sync import get_board_changes, is_expired, record_board_moves
+from .versions import bump_board_versions, etag_matches, make_etag, not_modified, tag_response
+from .render_cache import cache_stats, get_rendered_board
+from .fast_render import render_board
+from .export import FORMATS as EXPORT_FORMATS, CSVRenderer, NDJSONRenderer, export_board, stream_for
+from . import bulk
+from .filters import filter_cards
+from .search import (
+    MAX_PAGE_SIZE as SEARCH_MAX_PAGE_SIZE, PAGE_SIZE as SEARCH_PAGE_SIZE, move_card_entries, reindex, search
+)
+from rest_framework.renderers import JSONRenderer
 import asyncio
-from django.db import models
-from django.db.models import Q
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from django.db import models, transaction
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 User = get_user_model()
 
 # Create your views here.
 
+class FieldSelectionMixin:
+    """Lets GET requests pick fields with ?fields= and ?expand= (see parse_field_spec)"""
+    def get_field_spec(self):
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_field_spec'):
+            self._field_spec = parse_field_spec(
+                self.request.query_params.get('fields'),
+                self.request.query_params.get('expand')
+            )
+        return self._field_spec
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['field_spec'] = self.get_field_spec()
+        return context
+
+class BulkWriteMixin:
+    """POST, PATCH and DELETE <collection>/bulk/ with a batch of items (see bulk.py)"""
+    bulk_spec = None
+
+    @action(detail=False, methods=['POST', 'PATCH', 'DELETE'])
+    def bulk(self, request):
+        data = request.data if hasattr(request.data, 'get') else {}
+        try:
+            if request.method == 'POST':
+                created = bulk.bulk_create(self.bulk_spec, request.user, data.get('items'))
+                return Response({'created': created}, status=status.HTTP_201_CREATED)
+            if request.method == 'PATCH':
+                updated = bulk.bulk_update(self.bulk_spec, request.user, data.get('items'))
+                return Response({'updated': updated})
+            deleted = bulk.bulk_delete(self.bulk_spec, request.user, data.get('ids'))
+            return Response({'deleted': deleted})
+        except bulk.BulkError as e:
+            return Response(e.detail, status=e.status_code)
+
 class AuthViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []  # Add this line to disable authentication for login
@@ -74,7 +140,7 @@ class AuthViewSet(viewsets.ViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ListViewSet(viewsets.ModelViewSet):
+class ListViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = ListSerializer
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'post', 'patch', 'delete']
@@ -83,72 +149,204 @@ class ListViewSet(viewsets.ModelViewSet):
         # For list-specific operations (update, delete), we need to check board membership
         if self.action in ['update', 'partial_update', 'destroy']:
             return List.objects.filter(
-                board__board_members__user=self.request.user
+                board_id__in=get_accessible_board_ids(self.request.user)
             )
         
         # For list operations (get all lists)
         board_id = self.request.query_params.get('board_id')
-        if not board_id:
+        if not board_id or not has_board_access(self.request.user, board_id):
             return List.objects.none()
-        return List.objects.filter(
-            board_id=board_id,
-            board__board_members__user=self.request.user
-        ).order_by('order')
+        return prefetch_list_tree(List.objects.filter(
+            board_id=board_id
+        ).order_by('order'), self.get_field_spec())
 
     def perform_update(self, serializer):
         instance = self.get_object()
         # Ensure user has access to the board
-        if not instance.board.board_members.filter(user=self.request.user).exists():
+        if not has_board_access(self.request.user, instance.board_id):
             raise PermissionDenied("You don't have access to this board")
-        serializer.save()
+        board = serializer.validated_data.get('board')
+        if board is not None and not has_board_access(self.request.user, board.id):
+            raise PermissionDenied("You don't have access to this board")
+        # The save must precede the rebalance order_for_position may schedule
+        with transaction.atomic():
+            if 'order' in self.request.data:
+                order = order_for_position(
+                    List.objects.filter(board_id=instance.board_id),
+                    instance.id,
+                    self.request.data['order']
+                )
+                serializer.save(order=order)
+            else:
+                serializer.save()
+            new_board_id = serializer.instance.board_id
+            if new_board_id != instance.board_id:
+                # The list's cards go with it
+                card_ids = list(Card.objects.filter(list=instance).values_list('id', flat=True))
+                Card.objects.filter(pk__in=card_ids).update(board_id=new_board_id)
+                move_card_entries(dict.fromkeys(card_ids, new_board_id))
+                record_board_moves(List, {instance.id: (instance.board_id, new_board_id)})
+                bump_board_versions(instance.board_id)
 
     def perform_create(self, serializer):
         board_id = self.request.data.get('board')
         if not board_id:
             raise ValidationError("Board ID is required")
         
-        board = Board.objects.get(id=board_id)
-        if not board.board_members.filter(user=self.request.user).exists():
+        if not has_board_access(self.request.user, board_id):
             raise PermissionDenied("You don't have access to this board")
             
-        last_order = List.objects.filter(board_id=board_id).aggregate(
-            models.Max('order'))['order__max'] or 0
-        serializer.save(order=last_order + 1)
+        serializer.save(order=get_next_order(List.objects.filter(board_id=board_id)))
 
-class CardViewSet(viewsets.ModelViewSet):
+class CardViewSet(FieldSelectionMixin, BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = CardSerializer
+    bulk_spec = bulk.CARDS
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Card.objects.filter(
-            board__board_members__user=self.request.user
-        ).select_related('list')
+        queryset = prefetch_card_tree(Card.objects.filter(
+            board_id__in=get_accessible_board_ids(self.request.user)
+        ).select_related('list'), self.get_field_spec())
+        if self.action == 'list':
+            queryset = filter_cards(queryset, self.request)
+        if self.action == 'retrieve':
+            # The ETag is built from the board version
+            queryset = queryset.select_related('board')
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.headers.get('If-None-Match'):
+            # One indexed lookup decides whether the card needs rendering at all
+            version = Card.objects.filter(
+                pk=kwargs['pk'], board_id__in=get_accessible_board_ids(request.user)
+            ).values_list('board__version', flat=True).first()
+            etag = make_etag('card', kwargs['pk'], version, request)
+            if version is not None and etag_matches(request, etag):
+                return not_modified(etag)
+
+        card = self.get_object()
+        response = Response(self.get_serializer(card).data)
+        return tag_response(response, make_etag('card', card.pk, card.board.version, request))
 
     def perform_create(self, serializer):
         list_obj = serializer.validated_data['list']
         board = serializer.validated_data['board']
         
         # Ensure the user has access to the board
-        if not board.board_members.filter(user=self.request.user).exists():
+        if not has_board_access(self.request.user, board.id):
             raise PermissionDenied("You don't have access to this board")
             
         # Get the next order value for the card
-        last_order = Card.objects.filter(list=list_obj).aggregate(
-            models.Max('order'))['order__max'] or 0
-        next_order = last_order + 1
-        
-        serializer.save(order=next_order)
+        serializer.save(order=get_next_order(Card.objects.filter(list=list_obj)))
 
     def perform_update(self, serializer):
-        if 'order' in self.request.data:
-            list_obj = self.get_object().list
-            reorder_items(
-                Card.objects.filter(list=list_obj), 
-                self.get_object().id, 
-                int(self.request.data['order'])
+        card = serializer.instance
+        old_board_id = card.board_id
+        board = serializer.validated_data.get('board')
+        if board is not None and not has_board_access(self.request.user, board.id):
+            raise PermissionDenied("You don't have access to this board")
+        with transaction.atomic():
+            if 'order' in self.request.data:
+                # 'order' is the 1-based position in the (possibly new) list;
+                # only the moved card is written
+                list_obj = serializer.validated_data.get('list', card.list)
+                order = order_for_position(
+                    Card.objects.filter(list=list_obj),
+                    card.id,
+                    self.request.data['order']
+                )
+                serializer.save(order=order)
+            else:
+                serializer.save()
+            if card.board_id != old_board_id:
+                record_board_moves(Card, {card.id: (old_board_id, card.board_id)})
+                bump_board_versions(old_board_id)
+
+    @action(detail=False, methods=['POST'])
+    def bulk_move(self, request):
+        """Move many cards to (list, position) targets in one transaction"""
+        moves = request.data.get('moves')
+        if not isinstance(moves, list) or not moves:
+            return Response(
+                {'error': 'moves must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        else:
-            serializer.save()
+        try:
+            moves = [(int(move['card']), int(move['list']), int(move['position'])) for move in moves]
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                {'error': 'Each move needs integer card, list and position values'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        card_ids = {card_id for card_id, _, _ in moves}
+        if len(card_ids) != len(moves):
+            return Response(
+                {'error': 'A card can only be moved once per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        list_ids = {list_id for _, list_id, _ in moves}
+
+        # Validate board membership once for every card and target list
+        board_ids = get_accessible_board_ids(request.user)
+        card_boards = dict(Card.objects.filter(
+            pk__in=card_ids, board_id__in=board_ids
+        ).values_list('id', 'board_id'))
+        list_boards = dict(List.objects.filter(
+            pk__in=list_ids, board_id__in=board_ids
+        ).values_list('id', 'board_id'))
+        if set(card_boards) != card_ids or set(list_boards) != list_ids:
+            return Response(
+                {'error': 'Cards and lists must exist on boards you are a member of'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        with transaction.atomic():
+            existing_keys = {}
+            for list_id, order in Card.objects.filter(
+                list_id__in=list_ids
+            ).exclude(pk__in=card_ids).order_by('list_id', 'order', 'id').values_list('list_id', 'order'):
+                existing_keys.setdefault(list_id, []).append(order)
+            plan, dense = plan_moves(existing_keys, moves)
+
+            targets = {card_id: list_id for card_id, list_id, _ in moves}
+            Card.objects.filter(pk__in=card_ids).update(
+                list_id=Case(
+                    *[When(pk=card_id, then=Value(list_id)) for card_id, list_id in targets.items()],
+                    output_field=IntegerField()
+                ),
+                board_id=Case(
+                    *[When(pk=card_id, then=Value(list_boards[list_id])) for card_id, list_id in targets.items()],
+                    output_field=IntegerField()
+                ),
+                order=Case(
+                    *[When(pk=card_id, then=Value(order)) for card_id, order in plan.items()],
+                    output_field=FloatField()
+                ),
+                updated_at=timezone.now()
+            )
+            # The UPDATE skips the signals that keep search entries on the card's board
+            board_moves = {
+                card_id: (card_boards[card_id], list_boards[list_id]) for card_id, list_id in targets.items()
+                if list_boards[list_id] != card_boards[card_id]
+            }
+            move_card_entries({card_id: new for card_id, (_, new) in board_moves.items()})
+            record_board_moves(Card, board_moves)
+            for list_id in dense:
+                schedule_rebalance(Card.objects.filter(list_id=list_id))
+            bump_board_versions(*card_boards.values(), *list_boards.values())
+
+            # The single UPDATE skips model signals, so announce the moves here
+            moved = [
+                {'id': card_id, 'list': targets[card_id], 'order': order}
+                for card_id, order in plan.items()
+            ]
+            for board_id in set(list_boards.values()):
+                broadcast(board_id, 'cards.moved', [
+                    move for move in moved if list_boards[move['list']] == board_id
+                ])
+
+        return Response({'moved': moved})
 
     @action(detail=True, methods=['GET'])
     def members(self, request, pk=None):
@@ -166,7 +364,7 @@ class CardViewSet(viewsets.ModelViewSet):
         try:
             user = User.objects.get(id=user_id)
             # Check if user is a member of the board
-            if user not in card.list.board.members.all():
+            if not has_board_access(user, card.board_id):
                 return Response(
                     {'error': 'User must be a board member first'}, 
                     status=status.HTTP_400_BAD_REQUEST
@@ -225,11 +423,14 @@ class CardViewSet(viewsets.ModelViewSet):
         
         added_users = []
         errors = []
+        board_member_ids = set(
+            BoardMember.objects.filter(board_id=card.board_id).values_list('user_id', flat=True)
+        )
         
         for user_id in user_ids:
             try:
                 user = User.objects.get(id=user_id)
-                if user in card.list.board.members.all():
+                if user.id in board_member_ids:
                     if user not in card.members.all():
                         card.members.add(user)
                         added_users.append(user_id)
@@ -258,6 +459,8 @@ class CardViewSet(viewsets.ModelViewSet):
         serializer = LabelSerializer(data=label_data)
         if serializer.is_valid():
             serializer.save()
+            # Re-fetch so the prefetched labels include the new one
+            card = self.get_object()
             return Response(CardSerializer(card).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -275,37 +478,12 @@ class CardViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    @action(detail=True, methods=['POST'])
-    def optimize_description(self, request, pk=None):
-        try:
-            card = self.get_object()
-            prompt = request.data.get('description', '')
-            
-            # Create AI service instance
-            ai_service = AIService()
-            
-            # Get optimized description
-            optimized_description = asyncio.run(
-                ai_service.optimize_description(prompt)
-            )
-            
-            # Update card description
-            card.description = optimized_description
-            card.save()
-            
-            return Response({
-                'description': optimized_description
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            return Response({
-                'error': str(e)
-            }, status=status.HTTP_400_BAD_REQUEST)
-
-class LabelViewSet(viewsets.ModelViewSet):
+class LabelViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     queryset = Label.objects.all()
     serializer_class = LabelSerializer
+    bulk_spec = bulk.LABELS
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return Label.objects.all()
@@ -320,8 +498,9 @@ class LabelViewSet(viewsets.ModelViewSet):
             if 'color' in request.data:
                 instance.color = request.data['color']
             
-            # Save only the changed fields
-            instance.save(update_fields=['title', 'color'] if 'color' in request.data else ['title'])
+            # Save only the changed fields; updated_at is what delta sync looks at
+            fields = ['title', 'color'] if 'color' in request.data else ['title']
+            instance.save(update_fields=fields + ['updated_at'])
             
             # Return the full serialized instance
             serializer = self.get_serializer(instance)
@@ -357,8 +536,8 @@ class ChecklistViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return Checklist.objects.filter(
-            card__list__board__members=self.request.user
-        )
+            card__board_id__in=get_accessible_board_ids(self.request.user)
+        ).select_related('card')
 
     def perform_create(self, serializer):
         card = get_object_or_404(Card, pk=self.request.data.get('card'))
@@ -369,7 +548,7 @@ class ChecklistViewSet(viewsets.ModelViewSet):
             checklist = self.get_object()  # This gets a single Checklist instance
             print(f"Found checklist: {checklist.id}")
             
-            if checklist.card.list.board.members.filter(id=request.user.id).exists():
+            if has_board_access(request.user, checklist.card.board_id):
                 # Get all items for this specific checklist
                 items = ChecklistItem.objects.filter(checklist=checklist)
                 print(f"Found {items.count()} items to delete")
@@ -395,20 +574,38 @@ class ChecklistViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class ChecklistItemViewSet(viewsets.ModelViewSet):
+class ChecklistItemViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = ChecklistItemSerializer
+    bulk_spec = bulk.CHECKLIST_ITEMS
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
-        return ChecklistItem.objects.filter(
-            checklist__card__list__board__members=self.request.user
+        queryset = ChecklistItem.objects.filter(
+            checklist__card__board_id__in=get_accessible_board_ids(self.request.user)
         )
+        if 'checklist_pk' in self.kwargs:
+            queryset = queryset.filter(checklist_id=self.kwargs['checklist_pk'])
+        return queryset
 
     def perform_create(self, serializer):
         checklist = get_object_or_404(Checklist, pk=self.request.data.get('checklist'))
         order = get_next_order(ChecklistItem.objects.filter(checklist=checklist))
         serializer.save(checklist=checklist, order=order)
 
+    def perform_update(self, serializer):
+        if 'order' in self.request.data:
+            item = serializer.instance
+            with transaction.atomic():
+                order = order_for_position(
+                    ChecklistItem.objects.filter(checklist_id=item.checklist_id),
+                    item.id,
+                    self.request.data['order']
+                )
+                serializer.save(order=order)
+        else:
+            serializer.save()
+
     def partial_update(self, request, *args, **kwargs):
         instance = self.get_object()
         if 'is_completed' in request.data:
@@ -460,8 +657,8 @@ class AttachmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return Attachment.objects.filter(
-            card__list__board__members=self.request.user
-        )
+            card__board_id__in=get_accessible_board_ids(self.request.user)
+        ).select_related('card')
 
     def perform_create(self, serializer):
         card = get_object_or_404(Card, pk=self.request.data.get('card'))
@@ -473,8 +670,8 @@ class CardLocationViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         return CardLocation.objects.filter(
-            card__list__board__members=self.request.user
-        )
+            card__board_id__in=get_accessible_board_ids(self.request.user)
+        ).select_related('card')
 
     def perform_create(self, serializer):
         card = get_object_or_404(Card, pk=self.request.data.get('card'))
@@ -484,13 +681,14 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserCursorPagination
 
     @action(detail=False, methods=['GET'])
     def all_users(self, request):
-        """Get all users in the system"""
-        users = User.objects.all()
-        serializer = self.get_serializer(users, many=True)
-        return Response(serializer.data)
+        """Get all users in the system, one page at a time"""
+        page = self.paginate_queryset(User.objects.all())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -590,14 +788,292 @@ def remove_card_dates(request, card_pk):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_view(request):
+    """Full-text search over cards, comments and checklist items on the user's boards"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response(
+            {'error': 'q is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = min(int(request.query_params.get('limit', SEARCH_PAGE_SIZE)), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response(
+            {'error': 'limit must be an integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if limit < 1:
+        return Response(
+            {'error': 'limit must be positive'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    board_ids = get_accessible_board_ids(request.user)
+    board_id = request.query_params.get('board')
+    if board_id is not None:
+        if not board_id.isdigit() or int(board_id) not in board_ids:
+            return Response(
+                {'error': 'Board not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        board_ids = {int(board_id)}
+
+    return Response({'query': query, 'results': search(query, board_ids, limit)})
+
+def authenticate_request(request):
+    """Authenticate a plain Django request with the REST framework authenticators"""
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        return None
+    return user if user.is_authenticated else None
+
+async def get_request_card(request, pk):
+    """Resolve the authenticated user and a card on one of their boards.
+
+    Returns (user, card, None), or (user, None, error_response) on failure.
+    """
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return None, None, JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    board_ids = await sync_to_async(get_accessible_board_ids)(user)
+    try:
+        card = await Card.objects.aget(pk=pk, board_id__in=board_ids)
+    except Card.DoesNotExist:
+        return user, None, JsonResponse({'error': 'Card not found'}, status=status.HTTP_404_NOT_FOUND)
+    return user, card, None
+
+@csrf_exempt
+async def optimize_card_description(request, pk):
+    """
+    Optimize a card description with the AI service.
+
+    Runs as an async view so the worker is free while the model responds.
+    With ?mode=job the work is queued instead and a job id is returned
+    immediately; poll /api/ai-jobs/<id>/ for the result.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    user, card, error = await get_request_card(request, pk)
+    if error:
+        return error
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+    prompt = data.get('description', '')
+
+    if request.GET.get('mode') == 'job':
+        job = await sync_to_async(enqueue_optimization)(card, user, prompt)
+        return JsonResponse({
+            'job_id': job.id,
+            'status': job.status,
+        }, status=status.HTTP_202_ACCEPTED)
+
+    try:
+        optimized_description = await AIService().optimize_description(prompt)
+
+        # Update card description
+        card.description = optimized_description
+        await card.asave(update_fields=['description', 'updated_at'])
+
+        return JsonResponse({
+            'description': optimized_description
+        }, status=status.HTTP_200_OK)
+
+    except AIServiceError as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as e:
+        return JsonResponse({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+def sse_event(data, event=None):
+    """Format one server-sent event"""
+    prefix = f'event: {event}\n' if event else ''
+    return f'{prefix}data: {json.dumps(data)}\n\n'
+
+@csrf_exempt
+async def stream_card_description(request, pk):
+    """
+    Optimize a card description and stream the tokens as server-sent events.
+
+    Each token arrives as a data event; the final text is saved to the card
+    and sent in a 'done' event, or an 'error' event is sent instead.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    user, card, error = await get_request_card(request, pk)
+    if error:
+        return error
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+    prompt = data.get('description', '')
+
+    async def events():
+        parts = []
+        try:
+            async for token in AIService().stream_optimize_description(prompt):
+                parts.append(token)
+                yield sse_event({'token': token})
+        except Exception as e:
+            yield sse_event({'error': str(e)}, event='error')
+            return
+
+        card.description = ''.join(parts)
+        await card.asave(update_fields=['description', 'updated_at'])
+        yield sse_event({'description': card.description}, event='done')
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Ask reverse proxies not to buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def batch_cards(**card_filters):
+    """Cards with a description to optimize, with the fields the saved results need"""
+    # Everything CardDeltaSerializer renders is loaded up front; a deferred
+    # field would cost a query per card when the results are broadcast
+    return Card.objects.filter(**card_filters).exclude(
+        description__isnull=True
+    ).exclude(description='').only(*CardDeltaSerializer.Meta.fields)
+
+def save_batch_results(cards):
+    Card.objects.bulk_update(cards, ['description', 'updated_at'], batch_size=500)
+    bump_board_versions(*{card.board_id for card in cards})
+    reindex(Card, [card.id for card in cards])
+    # bulk_update skips model signals, so push the new descriptions here
+    for card in cards:
+        broadcast(card.board_id, 'card.updated', dict(CardDeltaSerializer(card).data))
+
+async def stream_batch_optimization(cards):
+    """
+    Optimize many card descriptions concurrently and yield NDJSON progress.
+
+    At most AI_BATCH_CONCURRENCY requests per batch are in flight. Results
+    are written with one bulk update once every card has finished, or once
+    the client goes away, so finished cards are kept either way.
+    """
+    semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+    service = AIService()
+
+    async def optimize(card):
+        async with semaphore:
+            try:
+                return card, await service.optimize_description(card.description), None
+            except Exception as e:
+                return card, None, str(e)
+
+    def event(data):
+        return json.dumps(data) + '\n'
+
+    total = len(cards)
+    yield event({'event': 'start', 'total': total})
+
+    tasks = [asyncio.ensure_future(optimize(card)) for card in cards]
+    updated = []
+    try:
+        for done, future in enumerate(asyncio.as_completed(tasks), start=1):
+            card, description, error = await future
+            if error:
+                yield event({'event': 'error', 'card': card.id, 'error': error, 'done': done, 'total': total})
+                continue
+            card.description = description
+            card.updated_at = timezone.now()
+            updated.append(card)
+            yield event({'event': 'card', 'card': card.id, 'description': description, 'done': done, 'total': total})
+    finally:
+        # Stop outstanding requests if the client goes away
+        for task in tasks:
+            task.cancel()
+        if updated:
+            # Shielded so a cancelled response still writes what finished
+            await asyncio.shield(sync_to_async(save_batch_results)(updated))
+
+    yield event({'event': 'complete', 'updated': len(updated), 'failed': total - len(updated)})
+
+async def batch_optimize_response(request, **card_filters):
+    """Stream a batch optimization of the cards matching card_filters"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    board_ids = await sync_to_async(get_accessible_board_ids)(user)
+    board_id = card_filters.get('board_id')
+    if board_id is None:
+        board_id = await List.objects.filter(pk=card_filters['list_id']).values_list('board_id', flat=True).afirst()
+    if board_id not in board_ids:
+        return JsonResponse({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    cards = [card async for card in batch_cards(**card_filters)]
+    return StreamingHttpResponse(
+        stream_batch_optimization(cards),
+        content_type='application/x-ndjson'
+    )
+
+@csrf_exempt
+async def optimize_list_descriptions(request, pk):
+    """Optimize the description of every card in a list"""
+    return await batch_optimize_response(request, list_id=pk)
+
+@csrf_exempt
+async def optimize_board_descriptions(request, pk):
+    """Optimize the description of every card on a board"""
+    return await batch_optimize_response(request, board_id=pk)
+
+class AIJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and result of queued AI optimization jobs"""
+    serializer_class = AIJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        return AIJob.objects.filter(requested_by=self.request.user)
+
+class BoardImportViewSet(viewsets.ReadOnlyModelViewSet):
+    """Progress of the user's Trello imports"""
+    serializer_class = BoardImportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        return BoardImport.objects.filter(owner=self.request.user)
+
 class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
-        return Comment.objects.filter(
-            card__list__board__members=self.request.user
-        )
+        queryset = Comment.objects.filter(
+            card__board_id__in=get_accessible_board_ids(self.request.user)
+        ).select_related('author')
+        if 'card_pk' in self.kwargs:
+            queryset = queryset.filter(card_id=self.kwargs['card_pk'])
+        return queryset
 
     def perform_create(self, serializer):
         card_id = self.kwargs.get('card_pk')
@@ -617,15 +1093,98 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(comment)
         return Response(serializer.data)
 
-class BoardViewSet(viewsets.ModelViewSet):
+class BoardViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = BoardSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def is_summary(self):
+        return self.action in ('list', 'retrieve') and self.request.query_params.get('view') == 'summary'
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return BoardSummarySerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
-        return Board.objects.filter(
-            Q(owner=self.request.user) | 
-            Q(board_members__user=self.request.user)
-        ).distinct()
+        queryset = Board.objects.filter(pk__in=get_accessible_board_ids(self.request.user))
+        if self.action == 'changes':
+            return queryset
+        if self.action == 'export':
+            return queryset.select_related('owner')
+        if self.is_summary():
+            return annotate_board_counts(queryset.select_related('owner'))
+        if self.action == 'retrieve':
+            # The tree is only loaded when the rendered board is not cached
+            return queryset.select_related('owner')
+        return prefetch_board_tree(queryset, self.get_field_spec())
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.headers.get('If-None-Match') and has_board_access(request.user, kwargs['pk']):
+            # One primary key lookup decides whether the board needs rendering at all
+            version = Board.objects.filter(pk=kwargs['pk']).values_list('version', flat=True).first()
+            etag = make_etag('board', kwargs['pk'], version, request)
+            if version is not None and etag_matches(request, etag):
+                return not_modified(etag)
+
+        board = self.get_object()
+        etag = make_etag('board', board.pk, board.version, request)
+        if request.accepted_renderer.format != 'json':
+            self.load_tree(board)
+            return tag_response(Response(self.get_serializer(board).data), etag)
+
+        def render():
+            if self.use_fast_render():
+                return JSONRenderer().render(render_board(board, request))
+            self.load_tree(board)
+            return JSONRenderer().render(self.get_serializer(board).data)
+
+        content = get_rendered_board(board, request, render)
+        return tag_response(HttpResponse(content, content_type='application/json'), etag)
+
+    def use_fast_render(self):
+        # The fast renderer only knows the full representation
+        return settings.FAST_BOARD_RENDER and not self.is_summary() and not self.get_field_spec()
+
+    def load_tree(self, board):
+        if not self.is_summary():
+            load_board_tree(board, self.get_field_spec())
+
+    @action(detail=False, methods=['GET'], permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        """Hit rate of the rendered board cache"""
+        return Response(cache_stats())
+
+    @action(detail=True, methods=['GET'], renderer_classes=[JSONRenderer, NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None):
+        """Stream the whole board as JSON, NDJSON or CSV (?format=)"""
+        board = self.get_object()
+        export_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(
+            stream_for(request, export_board(board, export_format)),
+            content_type=f'{EXPORT_FORMATS[export_format]}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="board-{board.id}.{export_format}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['POST'], parser_classes=[MultiPartParser, FormParser])
+    def import_trello(self, request):
+        """Queue the import of an uploaded Trello JSON export as a new board"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        board_import = BoardImport.objects.create(
+            owner=request.user,
+            file=upload,
+            map_members=str(request.data.get('map_members', '')).lower() in ('true', '1'),
+            bytes_total=upload.size,
+        )
+        enqueue_import(board_import)
+        return Response(BoardImportSerializer(board_import).data, status=status.HTTP_202_ACCEPTED)
 
     def perform_create(self, serializer):
         board = serializer.save(owner=self.request.user)
@@ -652,6 +1211,26 @@ class BoardViewSet(viewsets.ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=True, methods=['GET'])
+    def changes(self, request, pk=None):
+        """Everything that changed on the board since the ?since= cursor"""
+        board = self.get_object()
+        # An unencoded '+' in a UTC offset arrives as a space
+        since = parse_datetime(request.query_params.get('since', '').replace(' ', '+'))
+        if since is None:
+            return Response(
+                {'error': 'since must be a cursor or ISO 8601 timestamp'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if is_expired(since):
+            return Response(
+                {'error': 'Cursor is too old, refetch the whole board'},
+                status=status.HTTP_410_GONE
+            )
+        return Response(get_board_changes(board, since))
+
     @action(detail=True, methods=['get', 'post'])
     def members(self, request, pk=None):
         board = self.get_object()
@@ -9,10 +9,20 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 from django.core.asgi import get_asgi_application
-from channels.routing import ProtocolTypeRouter
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dragonlist_ai.settings')
 
+# Set up Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from boards.middleware import JWTAuthMiddleware  # noqa: E402
+from boards.routing import websocket_urlpatterns  # noqa: E402
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
+    "websocket": AllowedHostsOriginValidator(
+        JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+    ),
 })
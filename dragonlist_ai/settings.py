@@ -85,13 +85,111 @@ WSGI_APPLICATION = 'dragonlist_ai.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# SQLite is used by default. Set DB_ENGINE=postgresql (and the POSTGRES_*
+# variables) to serve concurrent writes from several workers. DB_POOL=true
+# switches to psycopg's built-in connection pool (requires psycopg[pool]);
+# otherwise connections are kept open for DB_CONN_MAX_AGE seconds.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'dragonlist'),
+            'USER': os.getenv('POSTGRES_USER', 'dragonlist'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+            'OPTIONS': {},
+        }
+    }
+    if os.getenv('DB_POOL', 'false').lower() == 'true':
+        # Pooled connections are returned to the pool after each request
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+
+    # The old SQLite file, readable by the copy_sqlite_data command
+    DATABASES['sqlite_source'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_SOURCE_PATH', BASE_DIR / 'db.sqlite3'),
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+
+# Caches
+# The default cache is in-process. Set REDIS_URL to share cached data (such as
+# board access sets) between workers, so invalidations reach every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+if os.getenv('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Rendered board payloads are large, so they get their own cache: in-process
+# by default, on disk with BOARD_RENDER_CACHE_DIR, or the shared Redis cache
+# when REDIS_URL is set. BOARD_RENDER_CACHE picks any other alias.
+if os.getenv('BOARD_RENDER_CACHE_DIR'):
+    CACHES['boards'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('BOARD_RENDER_CACHE_DIR'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+else:
+    CACHES['boards'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'board-render',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    }
+
+BOARD_RENDER_CACHE = os.getenv(
+    'BOARD_RENDER_CACHE',
+    'shared' if 'shared' in CACHES and not os.getenv('BOARD_RENDER_CACHE_DIR') else 'boards'
+)
+BOARD_RENDER_CACHE_TIMEOUT = int(os.getenv('BOARD_RENDER_CACHE_TIMEOUT', 3600))
+
+# Render full boards from values() rows instead of BoardSerializer (see fast_render.py)
+FAST_BOARD_RENDER = os.getenv('FAST_BOARD_RENDER', 'true').lower() == 'true'
+
+# Most items one bulk create, update or delete request may carry (see boards/bulk.py)
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 10000))
+
+# Cache alias and lifetime (seconds) of the per-user board access sets.
+# Membership changes only clear the cache of the process that made them, so
+# without a shared cache (REDIS_URL) each worker keeps its own copy and a
+# removed member could keep access through the others until it expires;
+# the lifetime is kept to a few seconds in that case.
+BOARD_ACCESS_CACHE = os.getenv('BOARD_ACCESS_CACHE', 'shared' if 'shared' in CACHES else 'default')
+BOARD_ACCESS_CACHE_TIMEOUT = int(os.getenv(
+    'BOARD_ACCESS_CACHE_TIMEOUT', 300 if BOARD_ACCESS_CACHE == 'shared' else 5
+))
+
+
+# Delta sync (/api/boards/<id>/changes/): seconds each request looks back
+# before its cursor, and how long deletions are remembered. Older cursors
+# get a 410 and must refetch the board.
+SYNC_CURSOR_OVERLAP = float(os.getenv('SYNC_CURSOR_OVERLAP', 2))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -155,8 +253,12 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
 ]
 
+# Let browser clients read the board/card version tag for conditional GETs
+CORS_EXPOSE_HEADERS = ['etag']
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -197,6 +299,61 @@ REST_FRAMEWORK = {
 
 # Add this to your settings.py
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')  # Get API key from environment variable
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # Optional OpenAI-compatible endpoint
+
+# Seconds allowed per AI request (including waiting for a free slot), and the
+# number of AI requests a process runs at the same time
+AI_REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', 30))
+AI_MAX_CONCURRENCY = int(os.getenv('AI_MAX_CONCURRENCY', 8))
+
+# AI provider: 'openai', or 'local' for a deterministic offline provider
+AI_PROVIDER = os.getenv('AI_PROVIDER', 'openai')
+AI_MODEL = os.getenv('AI_MODEL', 'gpt-3.5-turbo')
+AI_LOCAL_LATENCY = float(os.getenv('AI_LOCAL_LATENCY', 0))
+
+# Per-provider protection: requests per second (0 disables) and burst size,
+# retries with exponential backoff, and a circuit breaker that stops calling
+# the provider for AI_CIRCUIT_RESET_TIMEOUT seconds after repeated failures
+AI_RATE_LIMIT = float(os.getenv('AI_RATE_LIMIT', 10))
+AI_RATE_BURST = int(os.getenv('AI_RATE_BURST', 20))
+AI_RETRY_ATTEMPTS = int(os.getenv('AI_RETRY_ATTEMPTS', 3))
+AI_RETRY_BASE_DELAY = float(os.getenv('AI_RETRY_BASE_DELAY', 0.5))
+AI_RETRY_MAX_DELAY = float(os.getenv('AI_RETRY_MAX_DELAY', 8))
+AI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AI_CIRCUIT_FAILURE_THRESHOLD', 5))
+AI_CIRCUIT_RESET_TIMEOUT = float(os.getenv('AI_CIRCUIT_RESET_TIMEOUT', 30))
+
+# AI requests in flight per batch optimization (lists/boards)
+AI_BATCH_CONCURRENCY = int(os.getenv('AI_BATCH_CONCURRENCY', 4))
+
+# Cache of AI responses. By default an in-process LRU with AI_CACHE_MAX_ENTRIES
+# entries; set AI_CACHE_ALIAS to a CACHES alias to persist or share responses.
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', 86400))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', 1024))
+AI_CACHE_ALIAS = os.getenv('AI_CACHE_ALIAS') or None
+
+# Worker threads running queued AI optimization jobs (?mode=job)
+AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', 2))
+# Seconds after which an AI job still marked running, or an uploaded board
+# import still pending or running, is taken to belong to a worker that
+# died (e.g. in a restart) and is queued again
+AI_JOB_STALE_AFTER = int(os.getenv('AI_JOB_STALE_AFTER', 600))
 
 # Add these settings
 ASGI_APPLICATION = 'dragonlist_ai.asgi.application'
+
+# Channel layer for live board updates (ws/boards/<id>/). The in-memory layer
+# only reaches clients connected to the same process; set REDIS_URL (with
+# channels_redis installed) when running more than one worker.
+if os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.getenv('REDIS_URL')]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }